@@ -0,0 +1,385 @@
+# In-process stand-in for the Google Calendar API service returned by build(), for load testing
+# MyEventManager locally. It keeps events in memory and answers the same calls the client makes:
+#
+#   service = FakeCalendarService(events, latency=0.05, errorRate=0.01, requestsPerSecond=10)
+#   MyEventManager.global_api = service
+#
+# Requests behave like googleapiclient requests: nothing happens until execute(), failures are
+# raised as HttpError, and headers (If-None-Match / If-Match) and fields masks on list and get are
+# honoured. Latency is paid once per HTTP round trip, so a batch of 50 costs one latency, not 50.
+import datetime
+import json
+import random
+import re
+import string
+import threading
+import time
+
+import httplib2
+from googleapiclient.errors import BatchError, HttpError
+
+MAX_PAGE_SIZE = 2500
+MAX_BATCH_SIZE = 50
+DEFAULT_PAGE_SIZE = 250
+# statuses used for injected errors
+INJECTED_STATUSES = (500, 502, 503)
+
+def parse_time(value):
+    """ Returns POSIX seconds for an RFC 3339 date-time or a date (taken as midnight UTC). """
+    if 'T' not in value:
+        value += 'T00:00:00Z'
+    parsed = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.timestamp()
+
+def event_time(moment):
+    """ Returns POSIX seconds for an event's start or end. """
+    return parse_time(moment.get('dateTime', moment.get('date', '1970-01-01')))
+
+def parse_fields(mask):
+    """ Parses a fields mask such as 'nextPageToken,items(id,start/dateTime)' into a tree of
+    {field: subtree}, where a subtree of None keeps the whole value. """
+    tokens = re.findall(r'[^,()]+|[,()]', mask)
+
+    def selection(position):
+        tree = {}
+        while position < len(tokens) and tokens[position] != ')':
+            token = tokens[position].strip()
+            position += 1
+            if token in (',', ''):
+                continue
+            node = tree
+            *parents, leaf = token.split('/')
+            for parent in parents:
+                node = node.setdefault(parent, {})
+            subtree = None
+            if position < len(tokens) and tokens[position] == '(':
+                subtree, position = selection(position + 1)
+                position += 1
+            node[leaf] = subtree
+        return tree, position
+    return selection(0)[0]
+
+def project(value, tree):
+    """ Keeps the parts of a response selected by a parsed fields mask. """
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [project(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {key: project(value[key], subtree) for key, subtree in tree.items() if key in value}
+    return value
+
+def http_error(status, reason):
+    """ Builds the HttpError googleapiclient raises for an error response. """
+    content = json.dumps({'error': {'code': status, 'message': reason,
+                                    'errors': [{'domain': 'global', 'reason': reason}]}})
+    return HttpError(httplib2.Response({'status': status, 'reason': reason}), content.encode())
+
+class FakeRequest:
+    """ A request that runs operation when executed, after the service's latency and injected failures.
+    methodId names the API method, like googleapiclient's HttpRequest.methodId. """
+    def __init__(self, service, operation, methodId=None):
+        self.service = service
+        self.operation = operation
+        self.methodId = methodId
+        self.headers = {}
+
+    def execute(self, http=None, num_retries=0):
+        self.service.round_trip()
+        return self.service.call(self)
+
+class FakeBatch:
+    """ Batch of up to 50 requests sent in one round trip, answered through callbacks. """
+    def __init__(self, service, callback=None):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, callback=None, request_id=None):
+        if len(self.requests) >= MAX_BATCH_SIZE:
+            raise BatchError("Exceeded the maximum calls(" + str(MAX_BATCH_SIZE) + ") in a single batch request.")
+        if request_id is None:
+            request_id = str(len(self.requests))
+        self.requests.append((request_id, request, callback))
+
+    def execute(self, http=None):
+        self.service.round_trip()
+        self.service.call_batch(self)
+        for requestId, request, callback in self.requests:
+            try:
+                response, exception = self.service.call(request), None
+            except HttpError as error:
+                response, exception = None, error
+            for handler in (callback, self.callback):
+                if handler is not None:
+                    handler(requestId, response, exception)
+
+class FakeEvents:
+    """ events() collection of FakeCalendarService. """
+    def __init__(self, service):
+        self.service = service
+
+    def request(self, name, method, *args, **kwargs):
+        return FakeRequest(self.service, lambda headers: method(headers, *args, **kwargs), 'calendar.events.' + name)
+
+    def list(self, **kwargs):
+        return self.request('list', self.service.list_events, **kwargs)
+
+    def get(self, calendarId, eventId, fields=None, **kwargs):
+        return self.request('get', self.service.get_event, calendarId, eventId, fields)
+
+    def insert(self, calendarId, body, **kwargs):
+        return self.request('insert', self.service.insert_event, calendarId, body)
+
+    def import_(self, calendarId, body, **kwargs):
+        return self.request('import', self.service.import_event, calendarId, body)
+
+    def patch(self, calendarId, eventId, body, **kwargs):
+        return self.request('patch', self.service.patch_event, calendarId, eventId, body)
+
+    def update(self, calendarId, eventId, body, **kwargs):
+        return self.request('update', self.service.patch_event, calendarId, eventId, body, replace=True)
+
+    def move(self, calendarId, eventId, destination, **kwargs):
+        return self.request('move', self.service.move_event, calendarId, eventId, destination)
+
+    def delete(self, calendarId, eventId, **kwargs):
+        return self.request('delete', self.service.delete_event, calendarId, eventId)
+
+class FakeFreebusy:
+    """ freebusy() collection of FakeCalendarService. """
+    def __init__(self, service):
+        self.service = service
+
+    def query(self, body):
+        return FakeRequest(self.service, lambda headers: self.service.query_freebusy(body), 'calendar.freebusy.query')
+
+class FakeCalendarService:
+    """ In-memory Calendar API service.
+
+    latency is the delay of each round trip in seconds, or a (low, high) range to draw it from.
+    errorRate is the fraction of requests failing with a 5xx error, and batchErrorRate the fraction of
+    batches failing as a whole with one, before any of their requests run. requestsPerSecond and
+    dailyLimit are quotas; requests over them fail with 403 rateLimitExceeded / dailyLimitExceeded like
+    the real API. Events passed in are added to the owner's primary calendar. """
+    def __init__(self, events=(), owner='me@example.com', latency=0, errorRate=0,
+                 requestsPerSecond=None, dailyLimit=None, seed=None, batchErrorRate=0):
+        self.owner = owner
+        self.latency = latency
+        self.errorRate = errorRate
+        self.batchErrorRate = batchErrorRate
+        self.requestsPerSecond = requestsPerSecond
+        self.dailyLimit = dailyLimit
+        self.random = random.Random(seed)
+        self.lock = threading.RLock()
+        # calendarId -> {eventId: event}; deleted events stay as cancelled tombstones for sync
+        self.calendars = {owner: {}}
+        # (calendarId, iCalUID) -> eventId, for imports
+        self.uids = {}
+        # every change gets the next sequence number; sync tokens are the sequence at the last page
+        self.sequence = 0
+        # results of the last listing, so following its pages does not filter and sort again
+        self.listing = (None, [])
+        self.window = (0, 0)
+        self.stats = {'requests': 0, 'batches': 0, 'errors': 0, 'throttled': 0, 'notModified': 0}
+        for event in events:
+            self.store(owner, dict(event, id=event.get('id') or self.new_id()))
+
+    def events(self):
+        return FakeEvents(self)
+
+    def freebusy(self):
+        return FakeFreebusy(self)
+
+    def new_batch_http_request(self, callback=None):
+        return FakeBatch(self, callback)
+
+    # transport
+
+    def round_trip(self):
+        """ Sleeps for one round trip. """
+        latency = self.latency
+        if isinstance(latency, (tuple, list)):
+            latency = self.random.uniform(*latency)
+        if latency > 0:
+            time.sleep(latency)
+
+    def call_batch(self, batch):
+        """ Counts the batch and injects failures of the whole batch. """
+        with self.lock:
+            self.stats['batches'] += 1
+            if self.batchErrorRate and self.random.random() < self.batchErrorRate:
+                self.stats['errors'] += 1
+                raise http_error(self.random.choice(INJECTED_STATUSES), 'backendError')
+
+    def call(self, request):
+        """ Counts the request against the quotas, injects failures, then runs it. """
+        with self.lock:
+            self.stats['requests'] += 1
+            now = int(time.monotonic())
+            second, count = self.window
+            self.window = (now, count + 1) if now == second else (now, 1)
+            if self.dailyLimit is not None and self.stats['requests'] > self.dailyLimit:
+                self.stats['throttled'] += 1
+                raise http_error(403, 'dailyLimitExceeded')
+            if self.requestsPerSecond is not None and self.window[1] > self.requestsPerSecond:
+                self.stats['throttled'] += 1
+                raise http_error(403, 'rateLimitExceeded')
+            if self.errorRate and self.random.random() < self.errorRate:
+                self.stats['errors'] += 1
+                status = self.random.choice(INJECTED_STATUSES)
+                raise http_error(status, 'backendError')
+            return request.operation(request.headers)
+
+    # storage
+
+    def new_id(self):
+        return ''.join(self.random.choice(string.ascii_lowercase[:22] + string.digits) for i in range(26))
+
+    def resolve(self, calendarId):
+        return self.owner if calendarId == 'primary' else calendarId
+
+    def calendar(self, calendarId):
+        return self.calendars.setdefault(self.resolve(calendarId), {})
+
+    def store(self, calendarId, event):
+        """ Saves an event as a new version, giving it a new etag and sync sequence. Returns the stored event. """
+        self.sequence += 1
+        event['etag'] = '"' + str(self.sequence) + '"'
+        event['updated'] = datetime.datetime.now(datetime.timezone.utc).isoformat().replace('+00:00', 'Z')
+        event.setdefault('status', 'confirmed')
+        event.setdefault('iCalUID', event['id'] + '@example.com')
+        event.setdefault('organizer', {'email': self.owner if calendarId == 'primary' else calendarId})
+        event['sequenceNumber'] = self.sequence
+        self.calendar(calendarId)[event['id']] = event
+        self.uids[(self.resolve(calendarId), event['iCalUID'])] = event['id']
+        return event
+
+    def response(self, event):
+        result = json.loads(json.dumps(event))
+        del result['sequenceNumber']
+        return result
+
+    def find(self, calendarId, eventId):
+        event = self.calendar(calendarId).get(eventId)
+        if event is None:
+            raise http_error(404, 'notFound')
+        if event['status'] == 'cancelled':
+            raise http_error(410, 'deleted')
+        return event
+
+    # events()
+
+    def list_events(self, headers, calendarId='primary', maxResults=DEFAULT_PAGE_SIZE, pageToken=None,
+                    syncToken=None, timeMin=None, timeMax=None, q=None, showDeleted=False, fields=None, **ignored):
+        """ Pages of events ordered by start; the last page carries nextSyncToken. With syncToken,
+        only events changed since that sync are listed, deleted ones as cancelled. A fields mask
+        leaves out everything it does not select. """
+        maxResults = min(maxResults, MAX_PAGE_SIZE)
+        key = (calendarId, syncToken, timeMin, timeMax, q, showDeleted, self.sequence)
+        if self.listing[0] == key:
+            events = self.listing[1]
+        else:
+            events = self.find_events(calendarId, syncToken, timeMin, timeMax, q, showDeleted)
+            self.listing = (key, events)
+
+        offset = int(pageToken) if pageToken else 0
+        page = {'kind': 'calendar#events', 'items': [self.response(event) for event in events[offset:offset + maxResults]]}
+        if offset + maxResults < len(events):
+            page['nextPageToken'] = str(offset + maxResults)
+        else:
+            page['nextSyncToken'] = str(self.sequence)
+        return page if fields is None else project(page, parse_fields(fields))
+
+    def find_events(self, calendarId, syncToken, timeMin, timeMax, q, showDeleted):
+        events = self.calendar(calendarId).values()
+        if syncToken is not None:
+            if not syncToken.isdigit() or int(syncToken) > self.sequence:
+                raise http_error(410, 'fullSyncRequired')
+            events = [event for event in events if event['sequenceNumber'] > int(syncToken)]
+        else:
+            if not showDeleted:
+                events = [event for event in events if event['status'] != 'cancelled']
+            if timeMin is not None:
+                events = [event for event in events if event_time(event['end']) > parse_time(timeMin)]
+            if timeMax is not None:
+                events = [event for event in events if event_time(event['start']) < parse_time(timeMax)]
+            if q:
+                words = q.lower().split()
+                events = [event for event in events if all(word in json.dumps(event).lower() for word in words)]
+
+        return sorted(events, key=lambda event: (event_time(event.get('start', {})), event['id']))
+
+    def get_event(self, headers, calendarId, eventId, fields=None):
+        event = self.find(calendarId, eventId)
+        if headers.get('If-None-Match') == event['etag']:
+            self.stats['notModified'] += 1
+            raise http_error(304, 'notModified')
+        return self.response(event) if fields is None else project(self.response(event), parse_fields(fields))
+
+    def insert_event(self, headers, calendarId, body):
+        if 'start' not in body or 'end' not in body:
+            raise http_error(400, 'required')
+        return self.response(self.store(calendarId, dict(json.loads(json.dumps(body)), id=body.get('id') or self.new_id())))
+
+    def import_event(self, headers, calendarId, body):
+        """ Imports by iCalUID: an event already imported with the same iCalUID is updated. """
+        if 'iCalUID' not in body:
+            raise http_error(400, 'required')
+        eventId = self.uids.get((self.resolve(calendarId), body['iCalUID']))
+        if eventId is not None:
+            return self.response(self.store(calendarId, dict(json.loads(json.dumps(body)), id=eventId, status='confirmed')))
+        return self.insert_event(headers, calendarId, body)
+
+    def patch_event(self, headers, calendarId, eventId, body, replace=False):
+        event = self.find(calendarId, eventId)
+        if 'If-Match' in headers and headers['If-Match'] != event['etag']:
+            raise http_error(412, 'conditionNotMet')
+        if replace:
+            updated = dict(json.loads(json.dumps(body)), id=eventId)
+        else:
+            updated = dict(event, **json.loads(json.dumps(body)))
+        return self.response(self.store(calendarId, updated))
+
+    def move_event(self, headers, calendarId, eventId, destination):
+        event = self.find(calendarId, eventId)
+        self.store(calendarId, dict(event, status='cancelled'))
+        return self.response(self.store(destination, dict(event, organizer={'email': destination})))
+
+    def delete_event(self, headers, calendarId, eventId):
+        event = self.find(calendarId, eventId)
+        self.store(calendarId, dict(event, status='cancelled'))
+        return ''
+
+    # freebusy()
+
+    def query_freebusy(self, body):
+        """ Busy periods of each requested calendar between timeMin and timeMax. """
+        timeMin, timeMax = parse_time(body['timeMin']), parse_time(body['timeMax'])
+        # an event keeps its organizer's calendar and every attendee who has not declined busy
+        busy = {}
+        for calendarId, events in self.calendars.items():
+            for event in events.values():
+                if event['status'] == 'cancelled' or event.get('transparency') == 'transparent':
+                    continue
+                attendees = [attendee['email'] for attendee in event.get('attendees', [])
+                             if attendee.get('responseStatus') != 'declined' and 'email' in attendee]
+                overlaps = event_time(event['start']) < timeMax and event_time(event['end']) > timeMin
+                for email in set([calendarId] + attendees):
+                    periods = busy.setdefault(email, [])
+                    if overlaps:
+                        periods.append({'start': event['start'].get('dateTime', event['start'].get('date')),
+                                        'end': event['end'].get('dateTime', event['end'].get('date'))})
+
+        calendars = {}
+        for item in body.get('items', []):
+            calendarId = self.owner if item['id'] == 'primary' else item['id']
+            if calendarId not in busy and calendarId not in self.calendars:
+                calendars[item['id']] = {'busy': [], 'errors': [{'domain': 'global', 'reason': 'notFound'}]}
+            else:
+                periods = busy.get(calendarId, [])
+                calendars[item['id']] = {'busy': sorted(periods, key=lambda period: parse_time(period['start']))}
+        return {'kind': 'calendar#freeBusy', 'timeMin': body['timeMin'], 'timeMax': body['timeMax'],
+                'calendars': calendars}
@@ -11,12 +11,36 @@ from __future__ import print_function
 from calendar import calendar
 from multiprocessing.sharedctypes import Value
 from re import L
-from PyQt5 import QtGui, QtWidgets as qtw
+import codecs
+import contextlib
+import copy
+import cProfile
 import datetime
 from datetime import date
+import functools
+import gzip
+import io
+import itertools
 import pickle
 import os.path
-from googleapiclient.discovery import build
+import pstats
+import random
+from bisect import bisect_left, bisect_right
+import re
+import sqlite3
+import textwrap
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import httplib2
+import google_auth_httplib2
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
+from googleapiclient.version import __version__ as CLIENT_VERSION
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 import json
@@ -24,6 +48,60 @@ import json
 # If modifying these scopes, delete the file token.pickle.
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
+# Local copy of the Calendar v3 discovery document, so building the client needs no download
+DISCOVERY_CACHE_PATH = 'calendar_discovery.json'
+DISCOVERY_URL = 'https://www.googleapis.com/discovery/v1/apis/calendar/v3/rest'
+# Bump when the layout of the cache file changes
+DISCOVERY_CACHE_VERSION = 1
+
+# SQLite file holding the local copy of the primary calendar
+EVENT_STORE_PATH = 'events.db'
+
+# Largest page size accepted by events().list
+MAX_PAGE_SIZE = 2500
+
+# Most requests the Calendar API accepts in one batch
+MAX_BATCH_SIZE = 50
+
+# Suffix of the checkpoint journal kept next to a file while it is imported
+JOURNAL_SUFFIX = '.journal'
+
+# Statuses that are retried with backoff (403 is also retried for rate limit reasons)
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+# Largest UTC offset, so a window widened by it finds a date's events whatever their time zone
+TIMEZONE_SPREAD = datetime.timedelta(hours=14)
+
+# Partial response field masks, so each call only downloads what its caller reads
+EVENT_FIELDS = {
+    # printed listings (main, view_events)
+    'summary': 'id,status,summary,start,creator(email)',
+    # attendee edits read and write back the whole attendee list; the etag lets reads be revalidated
+    'attendees': 'etag,attendees',
+    # bulk attendee edits find the events an attendee is invited to
+    'attendance': 'id,attendees(email)',
+    # deleteEvent_UI only checks the end date
+    'deletion': 'id,end',
+    # local store: table rendering, search and export
+    'export': 'id,status,summary,description,location,organizer(email),start,end,attendees,iCalUID',
+}
+
+# Upper bounds of the API latency (seconds) and response size (bytes) histogram buckets
+LATENCY_BUCKETS = [0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+SIZE_BUCKETS = [256, 1024, 4096, 16384, 65536, 262144, 1048576]
+
+# Prometheus text format file written by the API stats window, and the environment variable
+# that makes the app write it on exit (for the node_exporter textfile collector)
+METRICS_PATH = 'api_metrics.prom'
+METRICS_ENV = 'MYEVENTMANAGER_METRICS'
+
+# Where profiles of UI actions and engine calls are written while profiling is on. Setting the
+# environment variable to a directory (or to 1 for this one) turns profiling on at startup.
+PROFILE_PATH = 'profiles'
+PROFILE_ENV = 'MYEVENTMANAGER_PROFILE'
+# Functions and allocation sites listed in each profile summary
+PROFILE_TOP = 25
+
 
 def get_calendar_api(): #pragma: no cover
     """
@@ -50,10 +128,357 @@ def get_calendar_api(): #pragma: no cover
         with open('token.pickle', 'wb') as token:
             pickle.dump(creds, token)
 
-    return build('calendar', 'v3', credentials=creds)
+    return build_calendar_service(creds)
 
-#Global api that are used for all transaction of events
-global_api = get_calendar_api()
+def fetch_discovery_document():
+    """ Downloads the Calendar v3 discovery document, or uses the copy shipped with googleapiclient
+    when there is no network. """
+    try:
+        response, content = httplib2.Http(timeout=10).request(DISCOVERY_URL)
+        if response.status == 200:
+            return json.loads(content)
+    except (httplib2.HttpLib2Error, OSError):
+        pass
+    return json.loads(discovery_cache.get_static_doc('calendar', 'v3'))
+
+def load_discovery_document(path=DISCOVERY_CACHE_PATH, refresh=False):
+    """ Returns the discovery document from the local cache file. It is (re)fetched when refresh is
+    set, the file is missing, or it was written by another cache or client library version. """
+    if not refresh and os.path.exists(path):
+        try:
+            with open(path) as file:
+                cached = json.load(file)
+            if (cached.get('version') == DISCOVERY_CACHE_VERSION
+                    and cached.get('clientVersion') == CLIENT_VERSION):
+                return cached['document']
+        except (ValueError, KeyError):
+            # unreadable cache, fetch a new one
+            pass
+
+    document = fetch_discovery_document()
+    cached = {
+        'version': DISCOVERY_CACHE_VERSION,
+        'clientVersion': CLIENT_VERSION,
+        'revision': document.get('revision'),
+        'document': document,
+    }
+    # write to a temporary file first so a crash never leaves half a cache behind
+    with open(path + '.tmp', 'w') as file:
+        json.dump(cached, file)
+    os.replace(path + '.tmp', path)
+    return document
+
+def build_calendar_service(creds, path=DISCOVERY_CACHE_PATH, refresh=False):
+    """ Builds the Calendar API client from the cached discovery document, without any request.
+    Its requests are InstrumentedRequests, so every call is counted in api_metrics. """
+    return build_from_document(load_discovery_document(path, refresh), credentials=creds,
+                               requestBuilder=InstrumentedRequest)
+
+#UI action the API requests made by the current thread are counted under
+_api_action = threading.local()
+
+@contextlib.contextmanager
+def api_action(name):
+    """ Counts the API requests this thread makes inside the block under the UI action name. """
+    previous = getattr(_api_action, 'name', None)
+    _api_action.name = name
+    try:
+        yield
+    finally:
+        _api_action.name = previous
+
+def current_action():
+    return getattr(_api_action, 'name', None) or 'other'
+
+def in_current_action(fn):
+    """ Wraps fn so it runs under the caller's API action on whichever thread calls it, e.g. a pool worker. """
+    action = getattr(_api_action, 'name', None)
+    def run(*args, **kwargs):
+        with api_action(action):
+            return fn(*args, **kwargs)
+    return run
+
+def request_method(request):
+    """ Returns the API method of a request, e.g. calendar.events.list. """
+    methodId = getattr(request, 'methodId', None)
+    return methodId if isinstance(methodId, str) else 'unknown'
+
+def error_status(error):
+    """ Returns the HTTP status of a failed request, or 0 if it never got a response. """
+    if isinstance(error, HttpError) and error.resp is not None:
+        return error.resp.status
+    return 0
+
+class Histogram:
+    """ Prometheus style histogram: how many observations fell at or below each bucket bound. """
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0
+        self.count = 0
+        self.max = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def cumulative(self):
+        """ Returns (bound, observations at or below it) for each bucket, the last bound being infinity. """
+        return list(zip(self.bounds + [float('inf')], itertools.accumulate(self.counts)))
+
+    def mean(self):
+        return self.sum / self.count if self.count else 0
+
+    def quantile(self, fraction):
+        """ Estimates a quantile as the upper bound of the bucket it falls in (at most the largest observation). """
+        for bound, count in self.cumulative():
+            if count and count >= fraction * self.count:
+                return min(bound, self.max)
+        return 0
+
+def prometheus_labels(**labels):
+    """ Formats labels as {name="value",...}, escaped the way the Prometheus text format requires. """
+    return '{' + ','.join(name + '="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+                          for name, value in labels.items()) + '}'
+
+class ApiMetrics:
+    """ Counters and histograms of the Calendar API requests the app makes: requests by UI action,
+    method and HTTP status (0 when there was no response), retries, latency and response size. """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = {}
+            self.retries = {}
+            self.latency = {}
+            self.sizes = {}
+
+    def record(self, method, status, latency=None, size=None):
+        """ Counts one request. Requests sent inside a batch have no latency or size of their own. """
+        key = (current_action(), method, status)
+        with self.lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+            if latency is not None:
+                self.latency.setdefault(method, Histogram(LATENCY_BUCKETS)).observe(latency)
+            if size is not None:
+                self.sizes.setdefault(method, Histogram(SIZE_BUCKETS)).observe(size)
+
+    def retry(self, method, count=1):
+        """ Counts requests that are about to be sent again. """
+        key = (current_action(), method)
+        with self.lock:
+            self.retries[key] = self.retries.get(key, 0) + count
+
+    def summary(self):
+        """ Returns a row per API method with its calls, errors, retries, mean and 95th percentile
+        latency in seconds and bytes received, busiest first. """
+        rows = {}
+        def row(method):
+            return rows.setdefault(method, {'method': method, 'calls': 0, 'errors': 0, 'retries': 0,
+                                            'mean': 0, 'p95': 0, 'bytes': 0})
+        with self.lock:
+            for (action, method, status), count in self.requests.items():
+                row(method)['calls'] += count
+                if status == 0 or status >= 400:
+                    row(method)['errors'] += count
+            for (action, method), count in self.retries.items():
+                row(method)['retries'] += count
+            for method, histogram in self.latency.items():
+                row(method).update(mean=histogram.mean(), p95=histogram.quantile(0.95))
+            for method, histogram in self.sizes.items():
+                row(method)['bytes'] = histogram.sum
+        return sorted(rows.values(), key=lambda row: (-row['calls'], row['method']))
+
+    def actions(self):
+        """ Returns {UI action: API requests it made}. """
+        calls = {}
+        with self.lock:
+            for (action, method, status), count in self.requests.items():
+                calls[action] = calls.get(action, 0) + count
+        return calls
+
+    def prometheus(self):
+        """ Returns the metrics in the Prometheus text exposition format. """
+        lines = []
+        with self.lock:
+            lines.append('# HELP myeventmanager_api_requests_total Calendar API requests by UI action, method and HTTP status.')
+            lines.append('# TYPE myeventmanager_api_requests_total counter')
+            for (action, method, status), count in sorted(self.requests.items()):
+                lines.append('myeventmanager_api_requests_total'
+                             + prometheus_labels(action=action, method=method, status=status) + ' ' + str(count))
+            lines.append('# HELP myeventmanager_api_retries_total Calendar API requests sent again after a failure.')
+            lines.append('# TYPE myeventmanager_api_retries_total counter')
+            for (action, method), count in sorted(self.retries.items()):
+                lines.append('myeventmanager_api_retries_total'
+                             + prometheus_labels(action=action, method=method) + ' ' + str(count))
+            for name, description, histograms in [
+                    ('myeventmanager_api_request_duration_seconds', 'Calendar API request latency.', self.latency),
+                    ('myeventmanager_api_response_size_bytes', 'Calendar API response body size.', self.sizes)]:
+                lines.append('# HELP ' + name + ' ' + description)
+                lines.append('# TYPE ' + name + ' histogram')
+                for method, histogram in sorted(histograms.items()):
+                    for bound, count in histogram.cumulative():
+                        le = '+Inf' if bound == float('inf') else str(bound)
+                        lines.append(name + '_bucket' + prometheus_labels(method=method, le=le) + ' ' + str(count))
+                    lines.append(name + '_sum' + prometheus_labels(method=method) + ' ' + str(histogram.sum))
+                    lines.append(name + '_count' + prometheus_labels(method=method) + ' ' + str(histogram.count))
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path=METRICS_PATH):
+        """ Writes the metrics to path in the Prometheus text format. """
+        # write to a temporary file first so a scraper never reads half a file
+        with open(path + '.tmp', 'w') as file:
+            file.write(self.prometheus())
+        os.replace(path + '.tmp', path)
+
+api_metrics = ApiMetrics()
+
+class InstrumentedRequest(HttpRequest):
+    """ HttpRequest that counts each execute() in api_metrics, with its latency, status and response size. """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lastResponse = None
+        self.add_response_callback(self.keep_response)
+
+    def keep_response(self, resp):
+        self.lastResponse = resp
+
+    def execute(self, http=None, num_retries=0):
+        self.lastResponse = None
+        started = time.perf_counter()
+        try:
+            return super().execute(http=http, num_retries=num_retries)
+        finally:
+            status = size = 0
+            if self.lastResponse is not None:
+                status = self.lastResponse.status
+                try:
+                    size = int(self.lastResponse.get('content-length', 0))
+                except ValueError:
+                    pass
+            api_metrics.record(request_method(self), status, time.perf_counter() - started, size)
+
+class Profiler:
+    """ Profiles UI actions and engine calls with cProfile and tracemalloc while enabled. Each profiled
+    call leaves a cProfile file (.prof, for pstats or snakeviz), a tracemalloc snapshot (.snapshot) and
+    a readable summary of both (.txt) in directory. """
+    def __init__(self, directory=PROFILE_PATH):
+        self.directory = directory
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.count = 0
+        # held while a call is profiled; Python 3.12+ allows one profiler at a time, and tracemalloc is process wide
+        self.session = threading.Lock()
+
+    def enable(self, directory=None):
+        if directory is not None:
+            self.directory = directory
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    @contextlib.contextmanager
+    def profile(self, action):
+        """ Profiles the block as action. One block is profiled at a time: calls made while another
+        is being profiled run unprofiled (on the same thread they are part of its profile), and so
+        do calls made while another profiling tool is active. """
+        if not self.enabled or not self.session.acquire(blocking=False):
+            yield
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+            enabled = True
+        except ValueError:
+            # "Another profiling tool is already active"
+            enabled = False
+        if not enabled:
+            # yielded outside the handler, so errors of the block are not chained to the ValueError
+            self.session.release()
+            yield
+            return
+
+        startedTracing = not tracemalloc.is_tracing()
+        if startedTracing:
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - started
+            snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+            peak = tracemalloc.get_traced_memory()[1]
+            if startedTracing:
+                tracemalloc.stop()
+            self.session.release()
+            try:
+                self.write(action, profile, snapshot, elapsed, peak)
+            except OSError as error:
+                # a full disk should not break the action being profiled
+                print('Could not write the profile of ' + action + ': ' + str(error))
+
+    def write(self, action, profile, snapshot, elapsed, peak):
+        """ Writes the files of one profiled call and returns their path without the extension. """
+        with self.lock:
+            self.count += 1
+            number = self.count
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, time.strftime('%Y%m%d-%H%M%S') + '-' + str(number).zfill(4) + '-'
+                            + re.sub(r'\W+', '_', action).strip('_'))
+        profile.dump_stats(path + '.prof')
+        snapshot.dump(path + '.snapshot')
+
+        summary = io.StringIO()
+        summary.write(action + ': ' + str(round(elapsed, 3)) + ' s, peak traced memory '
+                      + str(round(peak / 2 ** 20, 1)) + ' MiB\n\n')
+        pstats.Stats(profile, stream=summary).sort_stats('cumulative').print_stats(PROFILE_TOP)
+        summary.write('Largest allocations still held at the end:\n')
+        for statistic in snapshot.statistics('lineno')[:PROFILE_TOP]:
+            summary.write(str(statistic) + '\n')
+        with open(path + '.txt', 'w') as file:
+            file.write(summary.getvalue())
+        return path
+
+profiler = Profiler()
+
+def profiled(fn):
+    """ Decorator profiling each call of fn, under its qualified name, while the profiler is enabled. """
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        with profiler.profile(fn.__qualname__):
+            return fn(*args, **kwargs)
+    return run
+
+def configure_profiler(directory=None):
+    """ Turns profiling on if directory is given or MYEVENTMANAGER_PROFILE is set. Returns whether it is on. """
+    if directory is None:
+        directory = os.environ.get(PROFILE_ENV) or None
+        if directory is not None and directory.lower() in ('1', 'true', 'yes', 'on'):
+            directory = PROFILE_PATH
+    if directory is not None:
+        profiler.enable(directory)
+    return profiler.enabled
+
+#Global api that are used for all transaction of events, built on first use
+#so that importing this module does not authenticate
+global_api = None
+global_api_lock = threading.Lock()
+
+def get_global_api():
+    """ Returns the shared Calendar API client, authenticating and building it on first use. """
+    global global_api
+    if global_api is None:
+        with global_api_lock:
+            # another thread may have built it while we waited
+            if global_api is None:
+                global_api = get_calendar_api()
+    return global_api
 
 def get_upcoming_events(api, starting_time, number_of_events):
     """
@@ -65,51 +490,1270 @@ def get_upcoming_events(api, starting_time, number_of_events):
     
     events_result = api.events().list(calendarId='primary', timeMin=starting_time,
                                       maxResults=number_of_events, singleEvents=True,
-                                      orderBy='startTime').execute()
+                                      orderBy='startTime', fields=list_fields('summary')).execute()
     return events_result.get('items', [])
 
+def event_fields(projection):
+    """ Returns the fields mask for reading a single event. """
+    return EVENT_FIELDS[projection]
+
+def list_fields(projection):
+    """ Returns the fields mask for an events().list call, keeping the paging and sync tokens. """
+    return 'nextPageToken,nextSyncToken,items(' + EVENT_FIELDS[projection] + ')'
+
+def list_event_pages(service, maxResults=MAX_PAGE_SIZE, **query):
+    """ Yields every page of an events().list query, following nextPageToken to the last page. """
+    if not (1 <= maxResults <= MAX_PAGE_SIZE):
+        raise ValueError("Page size must be between 1 and " + str(MAX_PAGE_SIZE) + ".")
+
+    params = dict(query, maxResults=maxResults)
+    params.setdefault('calendarId', 'primary')
+
+    while True:
+        page = service.events().list(**params).execute()
+        yield page
+
+        pageToken = page.get('nextPageToken')
+        if pageToken is None:
+            return
+        params['pageToken'] = pageToken
+
+def iter_events(service, maxResults=MAX_PAGE_SIZE, **query):
+    """ Yields the events of an events().list query one at a time, as each page arrives. """
+    for page in list_event_pages(service, maxResults, **query):
+        for event in page.get('items', []):
+            yield event
+
+class EventCache:
+    """ Events read by id, kept with their etag. A cached event is revalidated with If-None-Match,
+    so an unchanged event costs a 304 with no body instead of the full resource. """
+    def __init__(self, maxSize=1000):
+        self.maxSize = maxSize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, service, eventId, projection):
+        """ Returns a copy of the event read with the given field projection (which must include etag). """
+        key = (eventId, projection)
+        with self.lock:
+            cached = self.entries.get(key)
+        request = service.events().get(calendarId='primary', eventId=eventId, fields=event_fields(projection))
+        if cached is not None:
+            request.headers['If-None-Match'] = cached['etag']
+        try:
+            event = request.execute()
+        except HttpError as error:
+            if cached is None or error.resp.status != 304:
+                raise
+            # not modified, the copy we have is current
+            with self.lock:
+                self.hits += 1
+                self.entries.move_to_end(key)
+            return copy.deepcopy(cached)
+
+        with self.lock:
+            self.misses += 1
+        if event.get('etag') is not None:
+            self.put(eventId, projection, event)
+        return event
+
+    def put(self, eventId, projection, event):
+        """ Caches an event we already have, e.g. the response to a write. """
+        with self.lock:
+            self.entries[(eventId, projection)] = copy.deepcopy(event)
+            self.entries.move_to_end((eventId, projection))
+            while len(self.entries) > self.maxSize:
+                self.entries.popitem(last=False)
+
+    def discard(self, eventId):
+        """ Forgets every cached copy of an event, e.g. after changing it. """
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == eventId]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+event_cache = EventCache()
+
+def get_event(service, eventId, projection='attendees'):
+    """ Reads an event through the shared EventCache. """
+    return event_cache.get(service, eventId, projection)
+
+class WriteStats:
+    """ Counts of conditional writes: how many went through, how many had to be redone because the
+    event changed after it was read (412 Precondition Failed), and how many gave up. """
+    def __init__(self):
+        self.writes = 0
+        self.retries = 0
+        self.failures = 0
+        self.lock = threading.Lock()
+
+    def add(self, writes=0, retries=0, failures=0):
+        with self.lock:
+            self.writes += writes
+            self.retries += retries
+            self.failures += failures
+
+attendee_write_stats = WriteStats()
+
+def is_precondition_failed(error):
+    """ Returns True if a conditional (If-Match) write was refused because the event has changed. """
+    return isinstance(error, HttpError) and error.resp.status == 412
+
+def update_attendees(service, eventId, change, retries=5):
+    """ Reads an event's attendees, passes them to change and patches the event with the list it returns
+    (None leaves the event alone). The patch only applies if the event still has the etag that was read;
+    otherwise it is read again and change is redone, up to retries times. Returns the patched event. """
+    attempt = 0
+    while True:
+        event = get_event(service, eventId, 'attendees')
+        update = change(event.get('attendees', []))
+        if update is None:
+            return event
+
+        request = service.events().patch(calendarId='primary', eventId=eventId, sendUpdates='all',
+                                         body={'attendees': update})
+        if event.get('etag') is not None:
+            request.headers['If-Match'] = event['etag']
+        try:
+            patched = request.execute()
+        except HttpError as error:
+            event_cache.discard(eventId)
+            if not is_precondition_failed(error) or attempt >= retries:
+                attendee_write_stats.add(failures=1)
+                raise
+            attempt += 1
+            attendee_write_stats.add(retries=1)
+            api_metrics.retry(request_method(request))
+            continue
+
+        attendee_write_stats.add(writes=1)
+        # the response is the new version, so the next read can be revalidated against it
+        if isinstance(patched, dict) and patched.get('etag') is not None:
+            event_cache.put(eventId, 'attendees', {'etag': patched['etag'], 'attendees': patched.get('attendees', [])})
+        else:
+            event_cache.discard(eventId)
+        return patched
+
+class OperationCancelled(Exception):
+    """ Raised by long running operations when their cancel event is set. """
+
+def check_cancelled(cancel):
+    """ Raises OperationCancelled if the (optional) threading.Event has been set. """
+    if cancel is not None and cancel.is_set():
+        raise OperationCancelled("Operation cancelled.")
+
+class EventStore:
+    """ Local copy of the primary calendar, kept fresh with incremental sync. """
+    def __init__(self, path=EVENT_STORE_PATH):
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS events (id TEXT PRIMARY KEY, start TEXT, body TEXT NOT NULL)")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)")
+        # in-memory indexes kept up to date with every change saved here
+        self.indexes = []
+
+    def attach(self, index):
+        """ Loads every stored event into index, then keeps it updated on every sync. """
+        with self.lock:
+            self.indexes.append(index)
+            rows = self.connection.execute("SELECT body FROM events").fetchall()
+            index.clear()
+            index.apply(json.loads(body) for body, in rows)
+        return index
+
+    def get_sync_token(self):
+        """ Returns the token from the last completed sync, or None before the first one. """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT value FROM sync_state WHERE key = 'syncToken'").fetchone()
+        return row[0] if row else None
+
+    def clear(self):
+        """ Forgets every stored event and the sync token, forcing a full sync next time. """
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM events")
+            self.connection.execute("DELETE FROM sync_state")
+            for index in self.indexes:
+                index.clear()
+
+    def apply_changes(self, events, syncToken=None):
+        """ Saves changed events and drops cancelled ones, in a single transaction. """
+        with self.lock, self.connection:
+            for event in events:
+                if event.get('status') == 'cancelled':
+                    self.connection.execute("DELETE FROM events WHERE id = ?", (event['id'],))
+                else:
+                    start = event.get('start', {})
+                    self.connection.execute(
+                        "INSERT OR REPLACE INTO events (id, start, body) VALUES (?, ?, ?)",
+                        (event['id'], start.get('dateTime', start.get('date', '')), json.dumps(event)))
+            if syncToken is not None:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO sync_state (key, value) VALUES ('syncToken', ?)", (syncToken,))
+            for index in self.indexes:
+                index.apply(events)
+
+    def sync(self, service, progress=None, cancel=None):
+        """ Downloads only the events changed since the last sync (everything on the first run).
+        progress is called with the number of changes received so far; setting the cancel event
+        stops the sync between pages. """
+        received = 0
+        syncToken = self.get_sync_token()
+        if syncToken is None:
+            self.clear()
+
+        while True:
+            query = {'singleEvents': True, 'fields': list_fields('export')}
+            if syncToken is not None:
+                query['syncToken'] = syncToken
+
+            try:
+                for page in list_event_pages(service, **query):
+                    # the sync token only arrives with the last page
+                    self.apply_changes(page.get('items', []), page.get('nextSyncToken'))
+                    received += len(page.get('items', []))
+                    if progress is not None:
+                        progress(received)
+                    if page.get('nextPageToken') is not None:
+                        check_cancelled(cancel)
+                return
+            except HttpError as error:
+                # the server expired our sync token, start over with a full sync
+                if error.resp.status == 410 and syncToken is not None:
+                    self.clear()
+                    syncToken = None
+                    continue
+                raise
+
+    def iter_events(self, pageSize=500):
+        """ Yields the stored events ordered by start time, reading pageSize rows at a time. """
+        lastStart, lastId = '', ''
+        while True:
+            with self.lock:
+                rows = self.connection.execute(
+                    "SELECT start, id, body FROM events WHERE (start, id) > (?, ?) ORDER BY start, id LIMIT ?",
+                    (lastStart, lastId, pageSize)).fetchall()
+            for lastStart, lastId, body in rows:
+                yield json.loads(body)
+            if len(rows) < pageSize:
+                return
+
+    def get_events(self):
+        """ Returns the stored events ordered by start time. """
+        return list(self.iter_events())
+
+#Opened on first use so that importing the module does not create the database
+event_store = None
+event_store_lock = threading.Lock()
+
+def get_event_store():
+    global event_store
+    if event_store is None:
+        with event_store_lock:
+            if event_store is None:
+                event_store = EventStore()
+    return event_store
+
+@profiled
+def sync_event_store(progress=None, cancel=None):
+    """ Brings the local store up to date with the primary calendar and returns it. """
+    store = get_event_store()
+    store.sync(get_global_api(), progress, cancel)
+    return store
+
+def iter_all_events():
+    """ Yields every event on the primary calendar, syncing the local store first. """
+    return sync_event_store().iter_events()
+
 def get_all_events():
-    events_result = global_api.events().list(calendarId='primary',
-                                    singleEvents=True,
-                                    orderBy='startTime').execute()
-    return events_result.get('items', [])
+    """ Returns every event on the primary calendar, syncing the local store first. """
+    return list(iter_all_events())
+
+def search_tokens(text):
+    """ Splits text into the lower case words used by EventIndex. """
+    return re.findall(r"\w+", text.lower())
+
+class EventIndex:
+    """ In-memory inverted index of the events that searchEvent_UI can find.
+    Title, type and venue words are indexed by every prefix, and every day an event spans by
+    each combination of its year, month and day, so a search is a few set intersections. """
+    FIELDS = {'title': 'summary', 'eventType': 'description', 'location': 'location'}
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.events = {}
+            self.postings = {}
+            # keys of every event, so an update can remove its old postings
+            self.keys = {}
+
+    def __len__(self):
+        return len(self.events)
+
+    def event_keys(self, event):
+        """ Returns the posting keys of an event, or None if it cannot be searched
+        (events without a title, type, venue or start time, like all day events). """
+        try:
+            fields = [(name, event[key]) for name, key in self.FIELDS.items()]
+            start = wall_clock({'dateTime': event['start']['dateTime']})
+            end = wall_clock({'dateTime': event['end']['dateTime']})
+        except (KeyError, ValueError):
+            return None
+        keys = set()
+        for name, text in fields:
+            for token in search_tokens(text):
+                for length in range(1, len(token) + 1):
+                    keys.add((name, token[:length]))
+        # the end is excluded, so an event ending at midnight is not on the next day
+        day = start.date()
+        lastDay = max(day, (end - datetime.timedelta(microseconds=1)).date())
+        while day <= lastDay:
+            parts = ('%04d' % day.year, '%02d' % day.month, '%02d' % day.day)
+            for mask in range(1, 8):
+                keys.add(('date',) + tuple(part if mask >> bit & 1 else None for bit, part in enumerate(parts)))
+            day += datetime.timedelta(days=1)
+        return keys
+
+    def apply(self, events):
+        """ Adds, replaces or (for cancelled events) removes events. """
+        with self.lock:
+            for event in events:
+                self.remove(event['id'])
+                keys = None if event.get('status') == 'cancelled' else self.event_keys(event)
+                if keys is None:
+                    continue
+                self.events[event['id']] = event
+                self.keys[event['id']] = keys
+                for key in keys:
+                    self.postings.setdefault(key, set()).add(event['id'])
+
+    def remove(self, eventId):
+        self.events.pop(eventId, None)
+        for key in self.keys.pop(eventId, ()):
+            ids = self.postings[key]
+            ids.discard(eventId)
+            if not ids:
+                del self.postings[key]
+
+    def match(self, keys):
+        """ Returns the ids posted under every key, smallest posting first. """
+        postings = sorted((self.postings.get(key, set()) for key in keys), key=len)
+        if not postings:
+            return None
+        return set.intersection(*postings)
+
+    def search(self, title='', eventType='', location='', day='', month='', year=''):
+        """ Returns the events whose title, type and venue contain words starting with each word
+        searched for, on a day the event spans, ordered by start time. Empty fields match anything. """
+        with self.lock:
+            ids = self.match([(name, token) for name, text in
+                              (('title', title), ('eventType', eventType), ('location', location))
+                              for token in search_tokens(text)])
+            dateKey = tuple(value.strip().zfill(width) if value.strip() else None
+                            for value, width in ((year, 4), (month, 2), (day, 2)))
+            if dateKey != (None, None, None):
+                onDate = self.postings.get(('date',) + dateKey, set())
+                ids = onDate if ids is None else ids & onDate
+            if ids is None:
+                ids = self.events.keys()
+            events = [self.events[eventId] for eventId in ids]
+        return sorted(events, key=lambda event: (event['start']['dateTime'], event['id']))
+
+def to_timestamp(value):
+    """ Converts a datetime, an ISO 8601 date or date-time string, or an event's start/end
+    ({'dateTime': ...} or {'date': ...}) to POSIX seconds. Values without a time zone are taken as UTC. """
+    if isinstance(value, dict):
+        value = value.get('dateTime', value.get('date'))
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    elif isinstance(value, date) and not isinstance(value, datetime.datetime):
+        value = datetime.datetime(value.year, value.month, value.day)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.timestamp()
+
+def date_window(year, month='', day=''):
+    """ Returns the start and end of a year, or of a month or day of it, as datetimes without a time zone.
+    Raises ValueError for a date that does not exist. """
+    start = datetime.datetime(int(year), int(month or 1), int(day or 1))
+    if day:
+        end = start + datetime.timedelta(days=1)
+    elif month:
+        end = start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+    else:
+        end = start.replace(year=start.year + 1)
+    return start, end
+
+def wall_clock(moment):
+    """ Returns an event's start or end as a datetime without a time zone, in the event's own time zone. """
+    value = moment.get('dateTime', moment.get('date'))
+    return datetime.datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+
+class IntervalIndex:
+    """ Index of event start/end instants for date range, point and overlap queries.
+    Intervals are kept sorted by start, and an implicit balanced tree over that order records
+    the latest end in each subtree, so a query skips every subtree that ends too early. """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.intervals = {}
+            self.sorted = None
+
+    def __len__(self):
+        return len(self.intervals)
+
+    def apply(self, events):
+        """ Adds, replaces or (for cancelled events) removes events. Events without a start or end are left out. """
+        with self.lock:
+            for event in events:
+                self.intervals.pop(event['id'], None)
+                if event.get('status') == 'cancelled':
+                    continue
+                try:
+                    start = to_timestamp(event['start'])
+                    end = max(to_timestamp(event['end']), start)
+                except (KeyError, TypeError, ValueError, AttributeError):
+                    continue
+                self.intervals[event['id']] = (start, end, event)
+            # rebuilt on the next query, so a sync pays for at most one sort
+            self.sorted = None
+
+    def build(self):
+        """ Sorts the intervals and fills maxEnds, where maxEnds[mid] is the latest end among the
+        intervals of the subtree rooted at mid (the middle of [low, high)). """
+        entries = sorted(self.intervals.values(), key=lambda entry: (entry[0], entry[1], entry[2]['id']))
+        self.starts = [entry[0] for entry in entries]
+        self.ends = [entry[1] for entry in entries]
+        self.events = [entry[2] for entry in entries]
+        self.maxEnds = [0] * len(entries)
+
+        def fill(low, high):
+            if low >= high:
+                return float('-inf')
+            mid = (low + high) // 2
+            self.maxEnds[mid] = max(self.ends[mid], fill(low, mid), fill(mid + 1, high))
+            return self.maxEnds[mid]
+        fill(0, len(entries))
+        self.sorted = True
+
+    def scan(self, count, instant, startingAt=True):
+        """ Returns the events among the first count (by start) that end after instant or, if
+        startingAt, start at or after it, in start order. """
+        found = []
+
+        def visit(low, high):
+            if low >= high or low >= count:
+                return
+            mid = (low + high) // 2
+            if self.maxEnds[mid] < instant or (not startingAt and self.maxEnds[mid] == instant):
+                return
+            visit(low, mid)
+            if mid < count:
+                if self.ends[mid] > instant or (startingAt and self.starts[mid] >= instant):
+                    found.append(self.events[mid])
+                visit(mid + 1, high)
+        visit(0, len(self.events))
+        return found
+
+    def overlapping(self, start, end):
+        """ Returns the events that overlap [start, end), ordered by start. """
+        start, end = to_timestamp(start), to_timestamp(end)
+        with self.lock:
+            if self.sorted is None:
+                self.build()
+            return self.scan(bisect_left(self.starts, end), start)
+
+    def at(self, instant):
+        """ Returns the events in progress at instant (starting at or before it and ending after it),
+        so an event that takes no time is never in progress. """
+        instant = to_timestamp(instant)
+        with self.lock:
+            if self.sorted is None:
+                self.build()
+            return self.scan(bisect_right(self.starts, instant), instant, startingAt=False)
+
+    def starting_between(self, start, end):
+        """ Returns the events that start in [start, end), ordered by start. """
+        start, end = to_timestamp(start), to_timestamp(end)
+        with self.lock:
+            if self.sorted is None:
+                self.build()
+            return self.events[bisect_left(self.starts, start):bisect_left(self.starts, end)]
+
+#Indexes are built from the local store on first use, then updated by every sync
+event_indexes = {}
+event_index_lock = threading.Lock()
+
+def get_index(indexClass):
+    """ Returns the store's index of the given class, syncing the store if it has never synced. """
+    index = event_indexes.get(indexClass)
+    if index is None:
+        with event_index_lock:
+            index = event_indexes.get(indexClass)
+            if index is None:
+                store = get_event_store()
+                if store.get_sync_token() is None:
+                    sync_event_store()
+                index = event_indexes[indexClass] = store.attach(indexClass())
+    return index
+
+def get_event_index():
+    """ Returns the search index. """
+    return get_index(EventIndex)
+
+def get_interval_index():
+    """ Returns the date range index. """
+    return get_index(IntervalIndex)
+
+@profiled
+def search_calendar(title='', eventType='', location='', day='', month='', year=''):
+    """ Searches the indexes with the fields of the search window. A year (with an optional month,
+    and a day only if the month is given) selects the events overlapping that period; otherwise the
+    date fields are matched against every day an event spans, so both pick the same events. Either
+    way dates are read in each event's own time zone, as the calendar shows them. A date that does
+    not exist matches nothing. """
+    if not year.strip() or (day.strip() and not month.strip()):
+        return get_event_index().search(title, eventType, location, day, month, year)
 
+    try:
+        start, end = date_window(year, month, day)
+        found = get_interval_index().overlapping(start - TIMEZONE_SPREAD, end + TIMEZONE_SPREAD)
+    except (ValueError, OverflowError):
+        return []
+    index = get_event_index()
+    if title.strip() or eventType.strip() or location.strip():
+        matches = {event['id'] for event in index.search(title, eventType, location)}
+    else:
+        matches = index.events
+    found = [(wall_clock(event['start']), wall_clock(event['end']), event) for event in found
+             if event['id'] in matches]
+    return [event for eventStart, eventEnd, event in found
+            if eventStart < end and (eventEnd > start or eventStart >= start)]
+
+@profiled
+def stream_search(emit, cancel=None, chunkSize=200, **criteria):
+    """ Runs search_calendar and passes the results to emit chunkSize events at a time, so a results
+    table can fill in while the rest are delivered. Setting the cancel event abandons a stale search
+    between chunks. Returns the number of events found. """
+    found = search_calendar(**criteria)
+    for chunk in chunked(found, chunkSize):
+        check_cancelled(cancel)
+        emit(chunk)
+    return len(found)
+
+def refresh_event_index():
+    """ Syncs the local store so the search indexes pick up changes made elsewhere. """
+    index = get_event_index()
+    get_interval_index()
+    sync_event_store()
+    return index
+
+def iter_json_array(file, offset=0, chunkSize=65536):
+    """ Yields (offset, item) for each element of a top-level JSON array in a binary file, reading
+    chunkSize bytes at a time. offset is the byte position just after the item; passing it back in
+    resumes parsing from there. """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    file.seek(offset)
+    buffer = ''
+    eof = False
+    # byte offset of buffer[0]
+    position = offset
+    # what comes next: 'start' ([), 'first' (item or ]), 'item', 'separator' (, or ]), 'done'
+    state = 'separator' if offset else 'start'
+
+    while state != 'done':
+        stripped = buffer.lstrip()
+        # whitespace is ascii, so characters and bytes agree
+        position += len(buffer) - len(stripped)
+        buffer = stripped
+
+        if not buffer:
+            if eof:
+                raise ValueError("Unexpected end of import file.")
+            chunk = file.read(chunkSize)
+            eof = not chunk
+            buffer += utf8.decode(chunk, final=eof)
+            continue
+
+        if state == 'start':
+            if buffer[0] != '[':
+                raise ValueError("Import file must contain a JSON array.")
+            position += 1
+            buffer = buffer[1:]
+            state = 'first'
+        elif state == 'separator':
+            if buffer[0] == ',':
+                position += 1
+                buffer = buffer[1:]
+                state = 'item'
+            elif buffer[0] == ']':
+                state = 'done'
+            else:
+                raise ValueError("Expected ',' or ']' at byte " + str(position) + " of import file.")
+        elif state == 'first' and buffer[0] == ']':
+            state = 'done'
+        else:
+            try:
+                item, end = decoder.raw_decode(buffer)
+                # a value running to the end of the buffer may continue in the next chunk, and a number
+                # may also be the start of a longer one (1 of 1.5 or 1e5) until a delimiter follows it
+                number = isinstance(item, (int, float)) and not isinstance(item, bool)
+                complete = eof or (end < len(buffer) and (not number or buffer[end] in ' \t\r\n,]'))
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+            if not complete:
+                chunk = file.read(chunkSize)
+                eof = not chunk
+                buffer += utf8.decode(chunk, final=eof)
+                continue
+
+            position += len(buffer[:end].encode('utf-8'))
+            buffer = buffer[end:]
+            state = 'separator'
+            yield position, item
+
+def iter_ndjson(file, offset=0):
+    """ Yields (offset, item) for each line of a newline delimited JSON binary file. offset is the
+    byte position just after the line. """
+    file.seek(offset)
+    for line in file:
+        offset += len(line)
+        if line.strip():
+            yield offset, json.loads(line)
+
+def import_parser(txtfile):
+    """ Returns the streaming parser matching the import file's extension. """
+    extension = os.path.splitext(txtfile)[1].lower()
+    if extension == ".json":
+        return iter_json_array
+    if extension in (".ndjson", ".jsonl"):
+        return iter_ndjson
+    raise Exception("Incorrect File extension")
+
+def iter_import_file(txtfile, offset=0):
+    """ Yields (offset, event) pairs from an import file, keeping only one event in memory at a time. """
+    # checked straight away rather than on the first read
+    parser = import_parser(txtfile)
+
+    def records():
+        empty = True
+        with open(txtfile, 'rb') as file:
+            for record in parser(file, offset):
+                empty = False
+                yield record
+        if empty and offset == 0:
+            raise Exception("Empty Records of import File")
+
+    return records()
+
+def iter_import_events(txtfile):
+    """ Yields the events of an import file one at a time. """
+    for offset, event in iter_import_file(txtfile):
+        yield event
+
+class InvalidEvent(ValueError):
+    """ Raised for an exported event that cannot be imported, such as one without a start time. """
+
+def import_body(event):
+    """ Builds the events().import_ body for an exported event. Google leaves empty fields out of the
+    events it returns, so only the start, end and iCalUID are required; InvalidEvent is raised without them. """
+    missing = [field for field in ('start', 'end', 'iCalUID') if field not in event]
+    if missing:
+        raise InvalidEvent("Event " + str(event.get("iCalUID", event.get("summary", ""))) + " has no "
+                           + ", ".join(missing) + ".")
+    body = {
+        'start': {
+            'dateTime': event["start"].get("dateTime")
+        },
+        'end': {
+            'dateTime': event["end"].get("dateTime")
+        },
+        'iCalUID': event["iCalUID"]
+        }
+    for field in ('summary', 'location', 'description', 'status', 'attendees'):
+        if field in event:
+            body[field] = event[field]
+    if 'organizer' in event:
+        body['organizer'] = {'email': event["organizer"].get("email")}
+    return body
+
+@profiled
 def import_Event(service, txtfile):
-    if(txtfile[-5:] != ".json"):
-        raise Exception("Incorrect File extension")
-    file = open(txtfile)
-    event_list = json.load(file)
-    if(len(event_list) <= 0):
-        raise Exception("Empty Records of import File")
-
-    for event in event_list:
-        event = {
-            'summary': event["summary"],  
-            'location': event["location"],   
-             'organizer': {
-                 'email': event["organizer"].get("email"),
-             },
-            'start': {
-                'dateTime': event["start"].get("dateTime") 
-            },
-            'end': {
-                'dateTime': event["end"].get("dateTime")    
-            },
-            'description': event["description"],
-            'status': event["status"],
-            'attendees': event["attendees"],
-            'iCalUID': event["iCalUID"]
-            }
-        service.events().import_(calendarId='primary', body=event).execute()
-    
-    
+    for event in iter_import_events(txtfile):
+        service.events().import_(calendarId='primary', body=import_body(event)).execute()
+
+class OperationReport:
+    """ Outcome of each item in a bulk operation. """
+    def __init__(self):
+        self.succeeded = []
+        self.failed = []
+        self.retries = 0
+        self.skipped = 0
+        self.elapsed = 0
+        self.lock = threading.Lock()
+
+    def record(self, key, exception=None):
+        with self.lock:
+            if exception is None:
+                self.succeeded.append(key)
+            else:
+                self.failed.append((key, exception))
+
+    def add_retry(self):
+        with self.lock:
+            self.retries += 1
+
+    def throughput(self):
+        """ Successful items per second. """
+        if self.elapsed <= 0:
+            return 0
+        return len(self.succeeded) / self.elapsed
+
+    def summary(self):
+        return str(len(self.succeeded)) + " succeeded, " + str(len(self.failed)) + " failed"
+
+def chunked(items, size):
+    """ Yields lists of up to size items, reading the iterable lazily. """
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def send_batch(service, requests, http=None):
+    """ Sends up to 50 requests as one batch request, returning (response, error) for each in order. """
+    results = {}
+
+    # request ids must be unique within a batch, so use the position of the request
+    def callback(requestId, response, exception):
+        results[int(requestId)] = (response, exception)
+
+    batch = service.new_batch_http_request(callback=callback)
+    methods = []
+    for request in requests:
+        batch.add(request, request_id=str(len(methods)))
+        methods.append(request_method(request))
+
+    started = time.perf_counter()
+    status = 0
+    try:
+        if http is None:
+            batch.execute()
+        else:
+            batch.execute(http=http)
+        status = 200
+    except HttpError as error:
+        status = error_status(error)
+        raise
+    finally:
+        api_metrics.record('batch', status, time.perf_counter() - started)
+
+    answers = [results.get(number, (None, None)) for number in range(len(methods))]
+    for method, (response, error) in zip(methods, answers):
+        api_metrics.record(method, 200 if error is None else error_status(error))
+    return answers
+
+def send_import_batch(service, events, http=None):
+    """ Sends one batch request importing events, returning each event's error (or None) in order.
+    Events import_body rejects are not sent; their error is the InvalidEvent. """
+    errors = []
+    requests = []
+    for event in events:
+        try:
+            requests.append(service.events().import_(calendarId='primary', body=import_body(event)))
+            errors.append(None)
+        except InvalidEvent as error:
+            errors.append(error)
+    if requests:
+        answers = iter(send_batch(service, requests, http))
+        errors = [next(answers)[1] if error is None else error for error in errors]
+    return errors
+
+def conditional_patch(service, eventId, update, etag):
+    """ Builds an attendee patch that only applies while the event still has etag. """
+    request = service.events().patch(calendarId='primary', eventId=eventId, sendUpdates='all',
+                                     body={'attendees': update})
+    if etag is not None:
+        request.headers['If-Match'] = etag
+    return request
+
+@profiled
+def bulk_update_attendees(service, eventIds, change, batchSize=MAX_BATCH_SIZE, retries=5):
+    """ Rewrites the attendee list of many events. change is given an event's attendees and returns
+    the new list, or None to leave the event alone. Attendees are read with batched GETs of only the
+    attendees field, and the changes are sent as batched PATCHes conditional on the etag read. Events
+    changed by someone else in between are read and changed again, up to retries times. The report is
+    keyed by event id; events left alone are counted as skipped. """
+    if not (1 <= batchSize <= MAX_BATCH_SIZE):
+        raise ValueError("Batch size must be between 1 and " + str(MAX_BATCH_SIZE) + ".")
+
+    report = OperationReport()
+    started = time.monotonic()
+    for chunk in chunked(eventIds, batchSize):
+        for attempt in range(retries + 1):
+            # read the attendees of the whole chunk
+            gets = (service.events().get(calendarId='primary', eventId=eventId, fields=event_fields('attendees'))
+                    for eventId in chunk)
+            patches = []
+            for eventId, (event, error) in zip(chunk, send_batch(service, gets)):
+                if error is not None:
+                    report.record(eventId, error)
+                    continue
+                update = change(event.get('attendees', []))
+                if update is None:
+                    report.skipped += 1
+                else:
+                    patches.append((eventId, update, event.get('etag')))
+
+            # write back only the events that changed, then go round again for those that lost a race
+            requests = (conditional_patch(service, eventId, update, etag) for eventId, update, etag in patches)
+            chunk = []
+            if patches:
+                for (eventId, update, etag), (response, error) in zip(patches, send_batch(service, requests)):
+                    event_cache.discard(eventId)
+                    if is_precondition_failed(error) and attempt < retries:
+                        report.add_retry()
+                        api_metrics.retry('calendar.events.patch')
+                        chunk.append(eventId)
+                    else:
+                        report.record(eventId, error)
+            if not chunk:
+                break
+    report.elapsed = time.monotonic() - started
+    attendee_write_stats.add(writes=len(report.succeeded), retries=report.retries, failures=len(report.failed))
+
+    print('Attendee update finished: ' + report.summary() + ', ' + str(report.skipped) + ' unchanged, '
+          + str(report.retries) + ' retries')
+    return report
+
+def bulk_add_attendee(service, eventIds, email, displayName=None, batchSize=MAX_BATCH_SIZE):
+    """ Invites email to every event that does not already have them. """
+    validate_email(email)
+    attendee = {"email": email, "responseStatus": "needsAction"}
+    if displayName is not None:
+        attendee["displayName"] = displayName
+
+    def change(attendees):
+        if any(existing.get('email') == email for existing in attendees):
+            return None
+        return attendees + [attendee]
+    return bulk_update_attendees(service, eventIds, change, batchSize)
+
+def bulk_remove_attendee(service, eventIds, email, batchSize=MAX_BATCH_SIZE):
+    """ Removes email from every event that has them. """
+    validate_email(email)
+
+    def change(attendees):
+        update = [existing for existing in attendees if existing.get('email') != email]
+        return None if len(update) == len(attendees) else update
+    return bulk_update_attendees(service, eventIds, change, batchSize)
+
+def bulk_replace_attendee(service, eventIds, oldEmail, newEmail, batchSize=MAX_BATCH_SIZE):
+    """ Replaces oldEmail with newEmail in every event that has oldEmail, keeping the other attendees as they are. """
+    validate_email(oldEmail)
+    validate_email(newEmail)
+
+    def change(attendees):
+        if not any(existing.get('email') == oldEmail for existing in attendees):
+            return None
+        update = []
+        for existing in attendees:
+            if existing.get('email') == oldEmail:
+                existing = {"email": newEmail, "responseStatus": "needsAction"}
+            # newEmail may already have been invited
+            if all(attendee.get('email') != existing.get('email') for attendee in update):
+                update.append(existing)
+        return update
+    return bulk_update_attendees(service, eventIds, change, batchSize)
+
+def events_with_attendee(service, email, **query):
+    """ Returns the ids of the events email is invited to, optionally narrowed by an events().list query. """
+    query.setdefault('fields', list_fields('attendance'))
+    return [event['id'] for event in iter_events(service, q=email, **query)
+            if any(attendee.get('email') == email for attendee in event.get('attendees', []))]
+
+def is_retryable(error):
+    """ Returns True for rate limit and server errors, which are worth retrying after a pause. """
+    if not isinstance(error, HttpError):
+        return False
+    if error.resp.status in RETRYABLE_STATUSES:
+        return True
+    # quota errors come back as 403 with a (user)rateLimitExceeded reason
+    return error.resp.status == 403 and 'ratelimitexceeded' in str(error.content).lower()
+
+def is_rejected(error):
+    """ Returns True for errors caused by the request itself, such as an invalid event, which sending it
+    again would not fix. Quota, authorization, server and connection errors are not rejections. """
+    if isinstance(error, InvalidEvent):
+        return True
+    if not isinstance(error, HttpError) or not 400 <= error.resp.status < 500:
+        return False
+    if error.resp.status in (401, 408, 429):
+        return False
+    content = str(error.content).lower()
+    return not (error.resp.status == 403 and ('limitexceeded' in content or 'quotaexceeded' in content))
+
+def backoff_delay(attempt, baseDelay=1, maxDelay=32):
+    """ Exponential backoff with full jitter: a random pause of up to baseDelay * 2^attempt seconds. """
+    return random.uniform(0, min(maxDelay, baseDelay * 2 ** attempt))
+
+def execute_with_backoff(request, retries=5, baseDelay=1, http=None, limiter=None, onRetry=None):
+    """ Executes a request, retrying rate limit and server errors with exponential backoff. """
+    attempt = 0
+    while True:
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            if http is None:
+                return request.execute()
+            return request.execute(http=http)
+        except HttpError as error:
+            if attempt >= retries or not is_retryable(error):
+                raise
+            time.sleep(backoff_delay(attempt, baseDelay))
+            attempt += 1
+            api_metrics.retry(request_method(request))
+            if onRetry is not None:
+                onRetry()
+
+class TokenBucket:
+    """ Rate limiter shared between threads: rate requests per second, with bursts up to capacity. """
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError("Rate must be positive.")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """ Blocks until tokens are available, then takes them. A request for more than the capacity
+        waits for a full bucket and leaves it in debt, so later requests wait for the remainder. """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                needed = min(tokens, self.capacity)
+                if self.tokens >= needed:
+                    self.tokens -= tokens
+                    return
+                delay = (needed - self.tokens) / self.rate
+            time.sleep(delay)
+
+#httplib2 connections are not thread-safe, so every worker thread gets its own
+_thread_state = threading.local()
+
+def thread_http(service):
+    """ Returns an authorized http object owned by the calling thread, or None to use the service's own. """
+    http = getattr(service, '_http', None)
+    if not isinstance(http, google_auth_httplib2.AuthorizedHttp):
+        return None
+    if not hasattr(_thread_state, 'http'):
+        _thread_state.http = {}
+    if id(service) not in _thread_state.http:
+        _thread_state.http[id(service)] = google_auth_httplib2.AuthorizedHttp(
+            http.credentials, http=httplib2.Http())
+    return _thread_state.http[id(service)]
+
+class ImportEngine:
+    """ Imports events over a bounded pool of worker threads, with shared rate limiting and backoff. """
+    def __init__(self, service, concurrency=4, batchSize=MAX_BATCH_SIZE, requestsPerSecond=10,
+                 retries=5, baseDelay=1):
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1.")
+        if not (1 <= batchSize <= MAX_BATCH_SIZE):
+            raise ValueError("Batch size must be between 1 and " + str(MAX_BATCH_SIZE) + ".")
+        self.service = service
+        self.concurrency = concurrency
+        self.batchSize = batchSize
+        self.limiter = TokenBucket(requestsPerSecond)
+        self.retries = retries
+        self.baseDelay = baseDelay
+
+    def send(self, events, report):
+        """ Imports a chunk of events, returning each event's error (or None). A batch request that fails
+        as a whole on a rate limit, server or connection error is sent again with backoff. """
+        http = thread_http(self.service)
+        if self.batchSize > 1:
+            attempt = 0
+            while True:
+                self.limiter.acquire(len(events))
+                try:
+                    return send_import_batch(self.service, events, http)
+                except (HttpError, httplib2.HttpLib2Error, OSError) as error:
+                    if attempt >= self.retries or (isinstance(error, HttpError) and not is_retryable(error)):
+                        raise
+                time.sleep(backoff_delay(attempt, self.baseDelay))
+                attempt += 1
+                report.add_retry()
+                api_metrics.retry('calendar.events.import', len(events))
 
-def export_event(eventList):
-    if len(eventList) == 0:
+        try:
+            request = self.service.events().import_(calendarId='primary', body=import_body(events[0]))
+        except InvalidEvent as error:
+            return [error]
+        try:
+            execute_with_backoff(request, self.retries, self.baseDelay, http, self.limiter, report.add_retry)
+        except HttpError as error:
+            return [error]
+        return [None]
+
+    def import_chunk(self, events, report):
+        """ Worker task: imports a chunk, resending the events that hit rate limits or server errors.
+        Returns each event's final error (or None), in order. """
+        errors = [None] * len(events)
+        unsent = list(range(len(events)))
+        attempt = 0
+        while unsent:
+            retry = []
+            for number, error in zip(unsent, self.send([events[number] for number in unsent], report)):
+                # single requests were already retried by execute_with_backoff
+                if self.batchSize > 1 and is_retryable(error) and attempt < self.retries:
+                    retry.append(number)
+                else:
+                    errors[number] = error
+                    report.record(events[number].get("iCalUID"), error)
+            if retry:
+                time.sleep(backoff_delay(attempt, self.baseDelay))
+                attempt += 1
+                report.add_retry()
+                api_metrics.retry('calendar.events.import', len(retry))
+            unsent = retry
+        return errors
+
+    def run(self, events):
+        """ Imports an iterable of events, keeping at most twice the pool size of chunks in memory. """
+        return self.run_records((None, event) for event in events)
+
+    def run_records(self, records, journal=None, progress=None, cancel=None):
+        """ Imports (offset, event) pairs from a streaming parser. With a journal, events it already
+        confirmed are skipped, and progress is written to it as chunks finish. The checkpoint only moves
+        over events that were imported or rejected for good, so a rerun resends the events that failed
+        on quotas or server errors. progress is called with the number of events processed so far.
+        Setting the cancel event stops new chunks from being sent; chunks already sent are finished
+        and journaled, then OperationCancelled is raised. """
+        report = OperationReport()
+        started = time.monotonic()
+        # chunks are numbered in file order; the checkpoint only moves past a chunk once every
+        # chunk before it has finished too, and stops for good at the first event left to resend
+        finished = {}
+        nextChunk = 0
+        stalled = False
+        pending = {}
+
+        def collect(futures):
+            nonlocal nextChunk, stalled
+            failure = None
+            for future in futures:
+                number, chunk = pending.pop(future)
+                try:
+                    errors = future.result()
+                except Exception as error:
+                    failure = failure or error
+                    continue
+                if journal is not None:
+                    journal.confirm((event.get("iCalUID"), offset)
+                                    for (offset, event), error in zip(chunk, errors) if error is None)
+                settled = 0
+                while settled < len(chunk) and (errors[settled] is None or is_rejected(errors[settled])):
+                    settled += 1
+                if not stalled:
+                    finished[number] = (chunk[settled - 1][0] if settled else None, settled == len(chunk))
+
+            checkpoint = None
+            while not stalled and nextChunk in finished:
+                offset, complete = finished.pop(nextChunk)
+                checkpoint = offset if offset is not None else checkpoint
+                nextChunk += 1
+                if not complete:
+                    stalled = True
+                    finished.clear()
+            if journal is not None and checkpoint is not None:
+                journal.checkpoint(checkpoint)
+            if progress is not None:
+                progress(len(report.succeeded) + len(report.failed) + report.skipped)
+            if failure is not None:
+                raise failure
+
+        def unconfirmed(records):
+            for offset, event in records:
+                if journal is not None and event.get("iCalUID") in journal.confirmed:
+                    report.skipped += 1
+                    continue
+                yield offset, event
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for number, chunk in enumerate(chunked(unconfirmed(records), self.batchSize)):
+                if cancel is not None and cancel.is_set():
+                    break
+                if len(pending) >= self.concurrency * 2:
+                    collect(wait(pending, return_when=FIRST_COMPLETED).done)
+                future = pool.submit(in_current_action(self.import_chunk), [event for offset, event in chunk], report)
+                pending[future] = (number, chunk)
+            collect(wait(pending).done)
+        report.elapsed = time.monotonic() - started
+        check_cancelled(cancel)
+
+        print('Import finished: ' + report.summary() + ', ' + str(report.skipped) + ' already imported, '
+              + str(report.retries) + ' retries, ' + str(round(report.throughput(), 1)) + ' events/sec')
+        return report
+
+class ImportJournal:
+    """ Checkpoint journal of an import file: the byte offset up to which every event has been
+    processed, plus the iCalUIDs confirmed beyond it. Lets an interrupted import resume where it stopped.
+    Only the confirmed iCalUIDs beyond the checkpoint are kept in memory, mapped to their offsets. """
+    def __init__(self, path, importFile):
+        self.path = path
+        self.offset = 0
+        self.confirmed = {}
+        size = os.path.getsize(importFile)
+
+        resuming = os.path.exists(path)
+        if resuming:
+            with open(path) as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # the last line may have been cut off by the interruption
+                        break
+                    if 'size' in entry and entry['size'] != size:
+                        raise Exception("Import file changed since the interrupted import.")
+                    if 'iCalUID' in entry:
+                        self.confirmed[entry['iCalUID']] = entry['end']
+                    elif 'offset' in entry:
+                        self.offset = entry['offset']
+            self.forget(self.offset)
+
+        self.file = open(path, 'a')
+        if not resuming:
+            self.write({'file': importFile, 'size': size})
+
+    def write(self, entry):
+        self.file.write(json.dumps(entry) + '\n')
+        self.file.flush()
+
+    def confirm(self, records):
+        """ Records (iCalUID, offset) pairs of imported events. """
+        for uid, offset in records:
+            self.confirmed[uid] = offset
+            self.write({'iCalUID': uid, 'end': offset})
+
+    def checkpoint(self, offset):
+        self.offset = offset
+        self.write({'offset': offset})
+        self.forget(offset)
+
+    def forget(self, offset):
+        """ Drops the confirmed iCalUIDs at or before offset, which a resumed import never reads again. """
+        for uid in [uid for uid, end in self.confirmed.items() if end <= offset]:
+            del self.confirmed[uid]
+
+    def close(self):
+        self.file.close()
+
+    def remove(self):
+        """ Deletes the journal once the import has finished. """
+        self.close()
+        os.remove(self.path)
+
+@profiled
+def import_file(service, txtfile, concurrency=4, batchSize=MAX_BATCH_SIZE, progress=None, cancel=None):
+    """ Imports an exported json or ndjson file with the concurrent import engine. If a previous
+    import of the same file was interrupted (or cancelled), it carries on from its journal. """
+    import_parser(txtfile)
+    journal = ImportJournal(txtfile + JOURNAL_SUFFIX, txtfile)
+    try:
+        report = ImportEngine(service, concurrency, batchSize).run_records(
+            iter_import_file(txtfile, journal.offset), journal, progress, cancel)
+    except BaseException:
+        journal.close()
+        raise
+    if report.failed:
+        # keep the journal so that a rerun only resends what did not go through
+        journal.close()
+        print('Run the import again to retry the events that were not imported.')
+    else:
+        journal.remove()
+    return report
+
+
+def write_events(events, outfile, format='json'):
+    """ Writes events to an open text file one at a time and returns how many were written.
+    'json' is an indented array, 'compact' an array without whitespace, 'ndjson' one event per line. """
+    if format not in ('json', 'compact', 'ndjson'):
+        raise ValueError("Unknown export format: " + str(format))
+
+    count = 0
+    if format == 'ndjson':
+        for event in events:
+            outfile.write(json.dumps(event) + '\n')
+            count += 1
+        return count
+
+    # same layout as json.dumps(eventList, indent=4), without building the whole string
+    outfile.write('[')
+    for event in events:
+        if format == 'json':
+            item = '\n' + textwrap.indent(json.dumps(event, indent=4), '    ')
+        else:
+            item = json.dumps(event, separators=(',', ':'))
+        outfile.write(item if count == 0 else ',' + item)
+        count += 1
+    outfile.write('\n]' if (format == 'json' and count) else ']')
+    return count
+
+def export_format(path):
+    """ Guesses the export format and compression from a file name, e.g. events.ndjson.gz. """
+    compress = path.lower().endswith('.gz')
+    name = path[:-3] if compress else path
+    if os.path.splitext(name)[1].lower() in ('.ndjson', '.jsonl'):
+        return 'ndjson', compress
+    return 'json', compress
+
+@profiled
+def export_event(eventList, path='export.json', format='json', compress=False):
+    """ Writes a list or any iterable of events to path, optionally gzip compressed. """
+    events = iter(eventList)
+    first = next(events, None)
+    if first is None:
         raise Exception("Empty List Provided")
-    jsonObject = json.dumps(eventList,indent=4)
-    with open('export.json','w') as outfile:
-       outfile.write(jsonObject)
+
+    if compress:
+        outfile = gzip.open(path, 'wt', encoding='utf-8')
+    else:
+        outfile = open(path, 'w', encoding='utf-8')
+    with outfile:
+        return write_events(itertools.chain([first], events), outfile, format)
+
+@profiled
+def export_calendar(service, path='export.json', format='json', compress=False, **query):
+    """ Exports the primary calendar page by page, so the whole calendar is never held in memory. """
+    events = iter_events(service, singleEvents=True, fields=list_fields('export'), **query)
+    return export_event(events, path, format, compress)
 
 
 #Validates the date given
@@ -137,6 +1781,54 @@ def addressValidation(address):
             valid = True
         return valid
 
+@profiled
+def delete_past_event(service, eventId):
+    """ Deletes an event that has already ended. """
+    time_now = datetime.datetime.utcnow().isoformat() + 'Z' 
+    event = service.events().get(calendarId='primary', eventId = eventId,
+                                 fields=event_fields('deletion')).execute()
+    if not event:
+        raise Exception("No Event Records Found. Please Check Again")
+    endDate = event['end'].get('dateTime')
+    if (endDate > time_now):
+        raise Exception("Cannot Delete events that have not yet passed.")
+    service.events().delete(calendarId='primary', eventId= eventId).execute()
+
+class EventConflict(Exception):
+    """ Raised by Calendar.add_event when the organizer or an attendee is busy during the event.
+    conflicts maps each busy calendar (email, or 'primary' for the organizer) to its merged busy periods. """
+    def __init__(self, conflicts):
+        super().__init__("Scheduling conflict for: " + ", ".join(conflicts))
+        self.conflicts = conflicts
+
+def merge_busy(periods):
+    """ Merges overlapping or touching busy periods ({'start': ..., 'end': ...}), ordered by start. """
+    merged = []
+    for period in sorted(periods, key=lambda period: to_timestamp(period['start'])):
+        if merged and to_timestamp(period['start']) <= to_timestamp(merged[-1]['end']):
+            if to_timestamp(period['end']) > to_timestamp(merged[-1]['end']):
+                merged[-1]['end'] = period['end']
+        else:
+            merged.append(dict(period))
+    return merged
+
+def find_conflicts(service, timeMin, timeMax, calendars):
+    """ Returns the merged busy periods of each calendar that is busy between timeMin and timeMax,
+    using a single freebusy query for every calendar. Calendars that cannot be checked (e.g. not
+    shared with us) are left out. """
+    response = service.freebusy().query(body={
+        'timeMin': timeMin,
+        'timeMax': timeMax,
+        'items': [{'id': calendar} for calendar in calendars],
+    }).execute()
+
+    conflicts = {}
+    for calendar, result in response.get('calendars', {}).items():
+        busy = merge_busy(result.get('busy', []))
+        if busy:
+            conflicts[calendar] = busy
+    return conflicts
+
 #Change the event status from confirmed/tentatively etc.. to cancelled
 def eventCancellation(service, eventID):
     event = {
@@ -190,13 +1882,14 @@ class Calendar:
         
         return isValid
 
-    def add_event(self, service):
+    def event_body(self):
+        """ Returns the request body for inserting the event. """
         if (len(self.attendeesList) > 20):
             raise Exception('Maximum number of attendees exceeded.')
         else:
             attendeesBody = [{'displayName':attendees.displayName,'email':attendees.email, 'comment':attendees.comment} for attendees in self.attendeesList]
 
-        event = {
+        return {
             'summary': self.Title,
             'description': self.meetingType,
             'location': self.address,
@@ -213,6 +1906,17 @@ class Calendar:
             'guestsCanModify' : False,
         }
 
+    def add_event(self, service, checkConflicts=False):
+        """ Inserts the event. With checkConflicts, raises EventConflict instead if the organizer
+        or any attendee is already busy during it. """
+        event = self.event_body()
+
+        if checkConflicts:
+            conflicts = find_conflicts(service, self.startDate, self.endDate,
+                                       ['primary'] + [attendee['email'] for attendee in event['attendees']])
+            if conflicts:
+                raise EventConflict(conflicts)
+
         addedEvent = service.events().insert(calendarId='primary', body=event, sendUpdates='all').execute()
         print('Event Added Successfully')
         
@@ -301,7 +2005,7 @@ class Calendar:
         
         # check count provided
         if 0 <= count <= 20:
-            event = service.events().get(calendarId='primary', eventId=eventId).execute()
+            event = get_event(service, eventId, 'attendees')
             attendees = event['attendees']
             
             info = []
@@ -327,26 +2031,18 @@ class Calendar:
         validate_email(attendeeEmail)
         validate_event_id(eventId)
         
-        # get event
-        event = service.events().get(calendarId='primary', eventId=eventId).execute()
-        
-        # get all existing attendees
-        attendees = event['attendees']
-        
-        update = []
-        
-        for attendee in attendees:
-            update.append(attendee)
+        # read the attendees and write back the change, redone if the event changed meanwhile
+        def change(attendees):
+            update = []
 
-        # add new attendee to event
-        update.append({"email": attendeeEmail, "displayName": attendeeName, "responseStatus": "needsAction"})
-        
-        event = { 
-            'attendees': update
-            }
-        
-        # execute change
-        service.events().patch(calendarId='primary', eventId=eventId, sendUpdates='all', body=event).execute()
+            for attendee in attendees:
+                update.append(attendee)
+
+            # add new attendee to event
+            update.append({"email": attendeeEmail, "displayName": attendeeName, "responseStatus": "needsAction"})
+            return update
+
+        update_attendees(service, eventId, change)
     
     def delete_attendee(self, service, eventId=None, attendeeEmail=None):
         """ Removes an attendee from the event, given their email. """
@@ -357,25 +2053,17 @@ class Calendar:
         validate_email(attendeeEmail)
         validate_event_id(eventId)
         
-        # get event
-        event = service.events().get(calendarId='primary', eventId=eventId).execute()
-        
-        # get all existing attendees
-        attendees = event['attendees']
-        
-        update = []
-        
-        # decide who is being removed
-        for attendee in attendees:
-            if attendee.get('email') != attendeeEmail:
-                update.append(attendee)
-                
-        event = { 
-            'attendees': update
-            }
+        # read the attendees and write back the change, redone if the event changed meanwhile
+        def change(attendees):
+            update = []
+
+            # decide who is being removed
+            for attendee in attendees:
+                if attendee.get('email') != attendeeEmail:
+                    update.append(attendee)
+            return update
 
-        # execute change
-        service.events().patch(calendarId='primary', eventId=eventId, sendUpdates='all', body=event).execute()
+        update_attendees(service, eventId, change)
         
         return attendeeEmail
     
@@ -389,31 +2077,19 @@ class Calendar:
         validate_email(oldAttendeeEmail)
         validate_email(newAttendeeEmail)
         
-        # get event
-        event = service.events().get(calendarId='primary', eventId=eventId).execute()
-        
-        # get all existing attendees
-        attendees = event['attendees']
-        
-        update = []
-        
-        # check info being updated
-        for i in range(len(attendees)):
-            if attendees[i]['email'] != oldAttendeeEmail:
-                print(f"Appended: {attendees[i]['email']}")
-                update.append({"email": attendees[i]['email']})
-            else:
-                print(f"Updated {attendees[i]['displayName']}")
-                update.append({"email": newAttendeeEmail})
-
-        print(update)
-        
-        event = { 
-            'attendees': update
-            }
-        
-        # execute change
-        service.events().patch(calendarId='primary', eventId=eventId, sendUpdates='all', body=event).execute()
+        # read the attendees and write back the change, redone if the event changed meanwhile
+        def change(attendees):
+            update = []
+
+            # check info being updated
+            for i in range(len(attendees)):
+                if attendees[i]['email'] != oldAttendeeEmail:
+                    update.append({"email": attendees[i]['email']})
+                else:
+                    update.append({"email": newAttendeeEmail})
+            return update
+
+        update_attendees(service, eventId, change)
         
         return newAttendeeEmail
         
@@ -429,30 +2105,70 @@ class Calendar:
         validate_event_id(eventId)
         validate_email(email)
         
-        # get event
-        event = service.events().get(calendarId='primary', eventId=eventId).execute()
-        
-        # get all existing attendees
-        attendees = event['attendees']
-        
-        update = []
-        
-        # decide who is being removed
-        for attendee in attendees:
-            if attendee.get('email') != email:
-                update.append(attendee)
-            else:
-                update.append({"email": email, "responseStatus": response})
-                
-        event = { 
-            'attendees': update
-            }
-        
-        # execute change
-        service.events().patch(calendarId='primary', eventId=eventId, sendUpdates='all', body=event).execute()
+        # read the attendees and write back the change, redone if the event changed meanwhile
+        def change(attendees):
+            update = []
+
+            # decide who is being removed
+            for attendee in attendees:
+                if attendee.get('email') != email:
+                    update.append(attendee)
+                else:
+                    update.append({"email": email, "responseStatus": response})
+            return update
+
+        update_attendees(service, eventId, change)
         
         return response
     
+@profiled
+def bulk_create_on_behalf(service, calendars, newOrganizer, batchSize=MAX_BATCH_SIZE):
+    """ Creates many events and hands each one to newOrganizer, like Calendar.create_on_behalf.
+    Inserts and moves are sent in batches, and the two stages overlap: while one batch of new events
+    is being moved on a second thread, the next batch is inserted. The report is keyed by each
+    calendar's position in calendars. """
+    if not (1 <= batchSize <= MAX_BATCH_SIZE):
+        raise ValueError("Batch size must be between 1 and " + str(MAX_BATCH_SIZE) + ".")
+    validate_email(newOrganizer)
+
+    report = OperationReport()
+    started = time.monotonic()
+
+    def move_batch(inserted):
+        # runs on the move thread, which needs its own http connection
+        requests = (service.events().move(calendarId='primary', eventId=eventId, destination=newOrganizer,
+                                          sendUpdates='all') for number, eventId in inserted)
+        for (number, eventId), (response, error) in zip(inserted, send_batch(service, requests, thread_http(service))):
+            report.record(number, error)
+
+    with ThreadPoolExecutor(max_workers=1) as mover:
+        moves = []
+        for chunk in chunked(enumerate(calendars), batchSize):
+            bodies = []
+            for number, calendar in chunk:
+                try:
+                    bodies.append((number, calendar.event_body()))
+                except Exception as error:
+                    report.record(number, error)
+
+            requests = (service.events().insert(calendarId='primary', body=body, sendUpdates='all')
+                        for number, body in bodies)
+            inserted = []
+            for (number, body), (event, error) in zip(bodies, send_batch(service, requests)):
+                if error is not None:
+                    report.record(number, error)
+                else:
+                    inserted.append((number, event['id']))
+            if inserted:
+                moves.append(mover.submit(in_current_action(move_batch), inserted))
+        for move in moves:
+            move.result()
+    report.elapsed = time.monotonic() - started
+
+    print('Created on behalf of ' + newOrganizer + ': ' + report.summary() + ', '
+          + str(round(report.throughput(), 1)) + ' events/sec')
+    return report
+
 def view_events(service):
     """ Allows attendees to view events 5 years before and after the current date """
     # get current, past, and future date.
@@ -460,16 +2176,12 @@ def view_events(service):
     past = str(str(int(current[:4])-5) + current[4:])
     future = str(str(int(current[:4])+5) + current[4:])
     
-    # get events
-    events_result = service.events().list(calendarId='primary', timeMin=past,
-                                      timeMax=future, singleEvents=True,
-                                      orderBy='startTime').execute()
-    
-    # as list
-    eventsList = events_result.get('items', [])
+    # get events, page by page
+    events = iter_events(service, timeMin=past, timeMax=future, singleEvents=True, orderBy='startTime',
+                         fields=list_fields('summary'))
     
     # print each event
-    for event in eventsList:
+    for event in events:
         start = event['start'].get('dateTime', event['start'].get('date'))
         print(start, event['summary'], event['status'], ',Event ID : ' + event['id'])
         print(event['creator']['email'])
@@ -483,637 +2195,31 @@ def validate_event_id(eventId):
     if (len(eventId) != 26) or (" " in eventId):
         raise ValueError("Invalid Event ID.")
 
-class addAttendees_UI(qtw.QWidget):
-    def __init__(self): #pragma: no cover
-        super().__init__()
-        self.attendeesList = []
-        self.setWindowTitle('Add Attendees')
-        self.setGeometry(0, 0, 400, 300)
-
-        self.name = qtw.QLabel("Full Name : ",self)
-        self.name.setFont(QtGui.QFont('Arial',9))
-        self.name.move(85, 20)
-        self.name.resize(80,20)
-
-        self.name_field = qtw.QLineEdit(self)
-        self.name_field.move(170,20)
-        self.name_field.resize(150,20)
-
-        self.email = qtw.QLabel("Email Address:",self)
-        self.email.setFont(QtGui.QFont('Arial',9))
-        self.email.move(85, 50)
-        self.email.resize(80,20)
-
-        self.email_field = qtw.QLineEdit(self)
-        self.email_field.move(170,50)
-        self.email_field.resize(150,20)
-
-        self.comments = qtw.QLabel("Comments:",self)
-        self.comments.setFont(QtGui.QFont('Arial',9))
-        self.comments.move(85, 80)
-        self.comments.resize(80,20)
-
-        self.comments_field = qtw.QLineEdit(self)
-        self.comments_field.move(170,80)
-        self.comments_field.resize(150,20)
-
-        self.attendeesButton = qtw.QPushButton("Add Attendees", self)
-        self.attendeesButton.move(105,110)
-        self.attendeesButton.resize(90,35)
-        self.attendeesButton.clicked.connect(self.addAttendees)
-
-    def addAttendees(self): #pragma: no cover
-        attendees = Attendees(self.name_field.text(),self.email_field.text(),self.comments_field.text())
-        self.attendeesList.append(attendees)
-
-        msgBox = qtw.QMessageBox()
-        msgBox.setIcon(qtw.QMessageBox.Information)
-        msgBox.setText("Add more attendees?")
-        msgBox.setWindowTitle("Add Attendees")
-        msgBox.setStandardButtons(qtw.QMessageBox.Yes | qtw.QMessageBox.No)
-
-        returnValue = msgBox.exec()
-        if returnValue == qtw.QMessageBox.Yes:
-            self.name_field.setText("")
-            self.email_field.setText("")
-            self.comments_field.setText("")
-        else:
-            self.close()
-
-#All the UI and operation for creation of new event
-class createEvent_UI(qtw.QWidget): 
-    def __init__(self): #pragma: no cover
-        super().__init__()
-        self.setWindowTitle('Add an event')
-        self.setGeometry(0, 0, 400, 300)
-
-        self.title = qtw.QLabel("Event Title:",self)
-        self.title.setFont(QtGui.QFont('Arial',9))
-        self.title.move(85, 20)
-        self.title.resize(80,20)
-
-        self.title_field = qtw.QLineEdit(self)
-        self.title_field.move(170,20)
-        self.title_field.resize(150,20)
-
-        self.title = qtw.QLabel("Event Type:",self)
-        self.title.setFont(QtGui.QFont('Arial',9))
-        self.title.move(85, 50)
-        self.title.resize(80,20)
-
-        self.type_field = qtw.QComboBox(self)
-        self.type_field.addItems(["Official Meeting","Online Meeting","Physical Event"])
-        self.type_field.move(170,50)
-        self.type_field.resize(150,20)
-
-        self.startDate = qtw.QLabel("Start Date:",self)
-        self.startDate.setFont(QtGui.QFont('Arial',9))
-        self.startDate.move(85, 80)
-        self.startDate.resize(80,20)
-
-        self.startField = qtw.QLineEdit(self)
-        self.startField.move(170,80)
-        self.startField.setPlaceholderText("YYYY-mm-dd or dd-Mon-YYYY")
-        self.startField.resize(150,20)
-
-        self.startTime = qtw.QLabel("Start Time:", self)
-        self.startTime.setFont(QtGui.QFont('Arial',9))
-        self.startTime.move(85, 110)
-        self.startTime.resize(80,20)
-
-        self.startHour = qtw.QLineEdit(self)
-        self.startHour.move(170,110)
-        self.startHour.setPlaceholderText("Hour")
-        self.startHour.resize(50,20)
-
-        self.startMinute = qtw.QLineEdit(self)
-        self.startMinute.move(230,110)
-        self.startMinute.setPlaceholderText("Minute")
-        self.startMinute.resize(50,20)
-
-        self.timeField = qtw.QComboBox(self)
-        self.timeField.addItems(["AM","PM"])
-        self.timeField.move(290,110)
-        self.timeField.resize(50,20)
-
-        self.endDate = qtw.QLabel("End Date:",self)
-        self.endDate.setFont(QtGui.QFont('Arial',9))
-        self.endDate.move(85, 140)
-        self.endDate.resize(80,20)
-
-        self.endField = qtw.QLineEdit(self)
-        self.endField.move(170,140)
-        self.endField.setPlaceholderText("YYYY-mm-dd or dd-Mon-YYYY")
-        self.endField.resize(150,20)
-
-        self.endTime = qtw.QLabel("End Time:", self)
-        self.endTime.setFont(QtGui.QFont('Arial',9))
-        self.endTime.move(85, 170)
-        self.endTime.resize(80,20)
-
-        self.endHour = qtw.QLineEdit(self)
-        self.endHour.move(170,170)
-        self.endHour.setPlaceholderText("Hour")
-        self.endHour.resize(50,20)
-
-        self.endMinute = qtw.QLineEdit(self)
-        self.endMinute.move(230,170)
-        self.endMinute.setPlaceholderText("Minute")
-        self.endMinute.resize(50,20)
-
-        self.timeField2 = qtw.QComboBox(self)
-        self.timeField2.addItems(["AM","PM"])
-        self.timeField2.move(290,170)
-        self.timeField2.resize(50,20)
-
-        self.lblLocation = qtw.QLabel("Venue : ",self)
-        self.lblLocation.setFont(QtGui.QFont('Arial',9))
-        self.lblLocation.move(85, 200)
-        self.lblLocation.resize(80,20)
-
-        self.locationField = qtw.QLineEdit(self)
-        self.locationField.move(170,200)
-        self.locationField.setPlaceholderText("Address of Venue")
-        self.locationField.resize(150,20)
-
-        self.attendeesButton = qtw.QPushButton("Add Attendees", self)
-        self.attendeesButton.move(105,230)
-        self.attendeesButton.resize(100,35)
-        self.attendeesButton.clicked.connect(self.addAttendees)
-
-        self.createButton = qtw.QPushButton("Create Event", self)
-        self.createButton.move(210,230)
-        self.createButton.resize(100,35)
-        self.createButton.clicked.connect(self.createEvent)
-
-    def addAttendees(self): #pragma: no cover
-        self.attendeesWindow = addAttendees_UI()
-        self.attendeesWindow.show()
-    
-    def createEvent(self): #pragma: no cover
-        try:
-            attendeesList = self.attendeesWindow.attendeesList
-        except AttributeError:
-            qtw.QMessageBox.about(self, "Empty Attendees Record", "Please Add Attendees to the event.")
-            return
-
-        if(self.validateTime(self.startHour.text(),self.startMinute.text()) and self.validateTime(self.endHour.text(),self.endMinute.text())):
-
-            startHour = self.startHour.text()
-            endHour = self.endHour.text()
-        else:
-            qtw.QMessageBox.about(self, "Invalid Event Time", "Please enter Valid Event Time.")
-            return
-
-        if(self.timeField.currentText() == "AM" and startHour == "12"):
-            startHour = "00"
-        if(self.timeField.currentText() == "AM" and endHour == "12"):
-            endHour = "00"
-
-        startTime = startHour + ":" + self.startMinute.text()
-        endTime = endHour + ":" + self.endMinute.text()
-        
-        if(self.timeField.currentText() == 'PM'):
-            if (self.startHour.text() != "12"):
-                startHour = int(self.startHour.text()) + 12
-            
-            startTime = str(startHour) + ":" + self.startMinute.text()
-        if(self.timeField2.currentText() == 'PM' and self.endHour.text() != "12"):
-            endHour = int(self.endHour.text()) + 12
-            endTime = str(endHour) + ":" + self.endMinute.text()
-        
-        calendar = Calendar(self.title_field.text(),self.type_field.currentText(),self.startField.text(), startTime,
-        self.endField.text(), endTime ,self.locationField.text(),"confirmed",attendeesList)
-        calendar.add_event(global_api)
-    
-    def validateTime(self, hour, minute): #pragma: no cover
-        valid = False
-        hourValidate = QtGui.QIntValidator()
-        hourValidate.setRange(0,12)
-        hourValidate.validate(hour,0)
-
-        minuteValidate = QtGui.QIntValidator()
-        minuteValidate.setRange(0,60)
-
-        if(minuteValidate.validate(minute,0)[0] == QtGui.QValidator.State.Acceptable
-        and hourValidate.validate(hour,0)[0] == QtGui.QValidator.State.Acceptable):
-            valid = True
-        
-        if not valid: #if the format is not valid raise error
-            raise ValueError("Incorrect Time format")
-
-        return valid
-
-class viewEvent_UI(qtw.QWidget):
-    def __init__(self): #pragma: no cover
-        super().__init__()
-        self.setWindowTitle('View event')
-        self.setGeometry(0, 0, 900, 300)
-        self.createTable()
-
-        # Add box layout, add table to box layout and add box layout to widget
-        self.layout = qtw.QVBoxLayout()
-        self.layout.addWidget(self.tableWidget) 
-        self.setLayout(self.layout) 
-
-        # Show widget
-        self.show()
-
-    def createTable(self): #pragma: no cover
-        self.tableWidget = qtw.QTableWidget()
-
-        self.tableWidget.resizeColumnsToContents()
-        events = get_all_events()
-        #time_now = datetime.datetime.utcnow().isoformat() + 'Z' 
-        #events = get_upcoming_events(global_api,time_now,10)
-        self.tableWidget.setColumnCount(6)
-        self.tableWidget.setRowCount(len(events))
-        self.tableWidget.setHorizontalHeaderLabels(["Event ID","Event Title","Event Venue","Attendees","Start Date","End Date"])
-
-        #Loop through the records of events
-        for records in range(0,len(events)):
-            attendees = ""
-            attendeesList = events[records]['attendees']
-            for i in attendeesList:
-                try:
-                    attendees += i['displayName'] + ", "
-                except KeyError:
-                    attendees = ""
-            try:
-                self.tableWidget.setItem(records,0, qtw.QTableWidgetItem(events[records]['id']))
-                self.tableWidget.setItem(records,1, qtw.QTableWidgetItem(events[records]['summary']))
-                self.tableWidget.setItem(records,2, qtw.QTableWidgetItem(events[records]['location']))
-                self.tableWidget.setItem(records,3, qtw.QTableWidgetItem(attendees))          
-                self.tableWidget.setItem(records,4, qtw.QTableWidgetItem(events[records]['start'].get('dateTime')))
-                self.tableWidget.setItem(records,5, qtw.QTableWidgetItem(events[records]['end'].get('dateTime')))
-            except KeyError:
-                pass
-        
-        #Resize table content
-        self.resizeTable()
-
-    def resizeTable(self): #pragma: no cover
-        #Resize the table to follow content size
-        header = self.tableWidget.horizontalHeader()
-        header.setSectionResizeMode(0,qtw.QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(1,qtw.QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(2,qtw.QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(3,qtw.QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(4,qtw.QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(5,qtw.QHeaderView.ResizeMode.ResizeToContents)
-
-class searchResult_UI(qtw.QWidget):
-    def __init__(self): #pragma: no cover
-        super().__init__()
-        self.setWindowTitle('View event')
-        self.setGeometry(0, 0, 900, 300)
-        self.events = []
-        
-
-    def createTable(self):#pragma: no cover
-        self.tableWidget = qtw.QTableWidget()
-
-        self.tableWidget.resizeColumnsToContents()
-        events = self.events
-        self.tableWidget.setColumnCount(6)
-        self.tableWidget.setRowCount(len(events))
-        self.tableWidget.setHorizontalHeaderLabels(["Event ID","Event Title","Event Venue","Attendees","Start Date","End Date"])
-
-        #Loop through the records of events
-        for records in range(0,len(events)):
-            attendees = ""
-            attendeesList = events[records]['attendees']
-            for i in attendeesList:
-                try:
-                    attendees += i['displayName'] + ", "
-                except KeyError:
-                    attendees = ""
-            try:
-                self.tableWidget.setItem(records,0, qtw.QTableWidgetItem(events[records]['id']))
-                self.tableWidget.setItem(records,1, qtw.QTableWidgetItem(events[records]['summary']))
-                self.tableWidget.setItem(records,2, qtw.QTableWidgetItem(events[records]['location']))
-                self.tableWidget.setItem(records,3, qtw.QTableWidgetItem(attendees))          
-                self.tableWidget.setItem(records,4, qtw.QTableWidgetItem(events[records]['start'].get('dateTime')))
-                self.tableWidget.setItem(records,5, qtw.QTableWidgetItem(events[records]['end'].get('dateTime')))
-            except KeyError:
-                pass
-        
-        #Resize table content
-        self.resizeTable()
-        # Add box layout, add table to box layout and add box layout to widget
-        self.layout = qtw.QVBoxLayout()
-        self.layout.addWidget(self.tableWidget) 
-        self.setLayout(self.layout) 
-
-    def resizeTable(self):#pragma: no cover
-        #Resize the table to follow content size
-        header = self.tableWidget.horizontalHeader()
-        header.setSectionResizeMode(0,qtw.QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(1,qtw.QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(2,qtw.QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(3,qtw.QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(4,qtw.QHeaderView.ResizeMode.ResizeToContents)
-        header.setSectionResizeMode(5,qtw.QHeaderView.ResizeMode.ResizeToContents)
-
-class searchEvent_UI(qtw.QWidget):
-    def __init__(self): #pragma: no cover
-        super().__init__()
-        self.setWindowTitle('Search event')
-        self.setGeometry(0, 0, 400, 300)
-        self.filtered_event = []
-
-        self.title = qtw.QLabel("Event Title:",self)
-        self.title.setFont(QtGui.QFont('Arial',9))
-        self.title.move(85, 20)
-        self.title.resize(80,20)
-
-        self.title_field = qtw.QLineEdit(self)
-        self.title_field.move(170,20)
-        self.title_field.resize(150,20)
-
-        self.title = qtw.QLabel("Event Type:",self)
-        self.title.setFont(QtGui.QFont('Arial',9))
-        self.title.move(85, 50)
-        self.title.resize(80,20)
-
-        self.type_field = qtw.QComboBox(self)
-        self.type_field.addItems(["","Official Meeting","Online Meeting","Physical Event"])
-        self.type_field.move(170,50)
-        self.type_field.resize(150,20)
-
-        self.year = qtw.QLabel("Year:",self)
-        self.year.setFont(QtGui.QFont('Arial',9))
-        self.year.move(85, 80)
-        self.year.resize(80,20)
-
-        self.yearField = qtw.QLineEdit(self)
-        self.yearField.move(170,80)
-        self.yearField.setPlaceholderText("YYYY")
-        self.yearField.resize(150,20)
-
-        self.month = qtw.QLabel("Month:",self)
-        self.month.setFont(QtGui.QFont('Arial',9))
-        self.month.move(85, 110)
-        self.month.resize(80,20)
-
-        self.MonthField = qtw.QComboBox(self)
-        self.MonthField.move(170,110)
-        self.MonthField.addItems(["","01","02","03","04","05","06","07","08","09","10","11","12"])
-        self.MonthField.resize(80,20)
-
-        self.day = qtw.QLabel("Day: ",self)
-        self.day.setFont(QtGui.QFont('Arial',9))
-        self.day.move(85, 140)
-        self.day.resize(80,20)
-
-        self.dayField = qtw.QLineEdit(self)
-        self.dayField.move(170,140)
-        self.dayField.setPlaceholderText("Day")
-        self.dayField.resize(150,20)
-
-        self.lblLocation = qtw.QLabel("Venue : ",self)
-        self.lblLocation.setFont(QtGui.QFont('Arial',9))
-        self.lblLocation.move(85, 170)
-        self.lblLocation.resize(80,20)
-
-        self.locationField = qtw.QLineEdit(self)
-        self.locationField.move(170,170)
-        self.locationField.setPlaceholderText("Address of Venue")
-        self.locationField.resize(150,20)
-
-        self.searchButton = qtw.QPushButton("Search Records", self)
-        self.searchButton.move(190,200)
-        self.searchButton.resize(100,35)
-        self.searchButton.clicked.connect(self.searchEvent)
-
-        self.searchButton = qtw.QPushButton("Export Event", self)
-        self.searchButton.move(85,200)
-        self.searchButton.resize(100,35)
-        self.searchButton.clicked.connect(self.exportEvent)
-
-    def searchEvent(self): # pragma: no cover
-        events = get_all_events()
-        
-        for event in events:
-            title = self.title_field.text()
-            eventType = self.type_field.currentText()
-            location = self.locationField.text()
-            day = self.dayField.text()
-            month = self.MonthField.currentText()
-            year = self.yearField.text()
-            try:
-                if(title in event['summary'] and eventType in event['description'] and
-                 location in event['location']):
-                    startDate = event['start'].get('dateTime')
-                    endDate = event['end'].get('dateTime')
-                    if(startDate is not None):
-                        startYear = startDate[:4]
-                        endYear = endDate[:4]
-                        startMonth = startDate[5:7]
-                        endMonth = endDate[5:7]
-                        startDay = startDate[8:10]
-                        endDay = endDate[8:10]
-                        if(day in startDay and month in startMonth and year in startYear) or (day in endDay and month in endMonth and year in endYear):
-                            self.filtered_event.append(event)
-            except KeyError:
-                pass
-        self.searchResult = searchResult_UI()
-        self.searchResult.events = self.filtered_event
-        self.searchResult.createTable()
-        
-        self.searchResult.show()
-    
-    def exportEvent(self): #pragma: no cover
-        eventList = self.filtered_event
-        if len(eventList) != 0:
-            export_event(eventList)
-            qtw.QMessageBox.about(self, "Export Done", "Event Exported Successfully.")
-        else:
-            qtw.QMessageBox.about(self, "No records", "Search for a event First.")
-
-class deleteEvent_UI(qtw.QWidget):
-    def __init__(self): #pragma: no cover
-        super().__init__()
-        self.setWindowTitle('Delete an event')
-        self.setGeometry(0, 0, 400, 300)
-
-        self.searchLbl = qtw.QLabel("Enter Event ID:",self)
-        self.searchLbl.setFont(QtGui.QFont('Arial',9))
-        self.searchLbl.move(85, 20)
-        self.searchLbl.resize(80,20)
-
-        self.id_field = qtw.QLineEdit(self)
-        self.id_field.move(170,20)
-        self.id_field.resize(150,20)
-
-        self.deleteBtn = qtw.QPushButton("Delete Event", self)
-        self.deleteBtn.move(165,70)
-        self.deleteBtn.resize(70,25)
-        self.deleteBtn.clicked.connect(self.deleteEvent)
-
-    def deleteEvent(self): #pragma: no cover
-        time_now = datetime.datetime.utcnow().isoformat() + 'Z' 
-        evt_ID = self.id_field.text()
-        event = global_api.events().get(calendarId='primary', eventId = evt_ID).execute()
-        if not event:
-            qtw.QMessageBox.about(self, "No Records", "No Event Records Found. Please Check Again")
-        else:
-            endDate = event['end'].get('dateTime')
-            if (endDate > time_now):
-                qtw.QMessageBox.about(self, "Deletion Prohibited","Cannot Delete events that have not yet passed.")
-            else:
-                global_api.events().delete(calendarId='primary', eventId= evt_ID).execute()
-
-
-class importEvent_UI(qtw.QWidget):
-    def __init__(self): #pragma: no cover
-        super().__init__()
-        self.setWindowTitle('Delete an event')
-        self.setGeometry(0, 0, 400, 300)
-        self.filepath = ""
-
-        self.File = qtw.QLabel("File Name:",self)
-        self.File.setFont(QtGui.QFont('Arial',9))
-        self.File.move(85, 20)
-        self.File.resize(80,20)
-
-        self.name_field = qtw.QLineEdit(self)
-        self.name_field.move(170,20)
-        self.name_field.resize(150,20)
-
-        self.fileBtn = qtw.QPushButton("Select File", self)
-        self.fileBtn.move(125,70)
-        self.fileBtn.resize(70,25)
-        self.fileBtn.clicked.connect(self.selectFile)
-
-        self.importBtn = qtw.QPushButton("Import File", self)
-        self.importBtn.move(200,70)
-        self.importBtn.resize(70,25)
-        self.importBtn.clicked.connect(self.importFile)
-
-    def selectFile(self): #pragma: no cover
-        self.filepath = qtw.QFileDialog.getOpenFileName(self, 'Open file')
-        self.name_field.setText(self.filepath[0])
-        txt = self.filepath[0]
-
-    def importFile(self): #pragma: no cover
-        if len(self.filepath) != 0:
-            import_Event(global_api,self.filepath[0])
-            qtw.QMessageBox.about(self, "Import Done", "Imported Successfully.")
-        else:
-            qtw.QMessageBox.about(self, "No Records", "No Event Records Found. Please Check Again")
-
-
-#Controlling UI for the whole program
-class Main_UI(qtw.QWidget): 
-    def __init__(self): #pragma: no cover
-        super().__init__()
-        self.setWindowTitle('Main UI')
-        self.email = ""
-        self.setGeometry(0, 0, 300, 400)
-
-        self.createButton = qtw.QPushButton("Add Event", self)
-        self.createButton.move(105,60)
-        self.createButton.resize(90,35)
-        self.createButton.clicked.connect(self.addEvent)
-
-        self.viewButton = qtw.QPushButton("View Events", self)
-        self.viewButton.move(105,100)
-        self.viewButton.resize(90,35)
-        self.viewButton.clicked.connect(self.viewEvent)
-
-        self.searchButton = qtw.QPushButton("Search Events", self)
-        self.searchButton.move(105,140)
-        self.searchButton.resize(90,35)
-        self.searchButton.clicked.connect(self.searchEvent)
-
-        self.deleteButton = qtw.QPushButton("Delete Events", self)
-        self.deleteButton.move(105,180)
-        self.deleteButton.resize(90,35)
-        self.deleteButton.clicked.connect(self.deleteEvent)
-
-        self.importButton = qtw.QPushButton("Import Events", self)
-        self.importButton.move(105,220)
-        self.importButton.resize(90,35)
-        self.importButton.clicked.connect(self.importEvent)
-
-        self.show()
-
-    def addEvent(self): #pragma: no cover
-        self.createWindow = createEvent_UI()
-        self.createWindow.show()
-    
-    def viewEvent(self): #pragma: no cover
-        self.createWindow = viewEvent_UI()
-        self.createWindow.show()
-    
-    def searchEvent(self): #pragma: no cover
-        self.createWindow = searchEvent_UI()
-        self.createWindow.show()
-     
-    def deleteEvent(self): #pragma: no cover
-        self.createWindow = deleteEvent_UI()
-        self.createWindow.show()
-    
-    def importEvent(self): #pragma: no cover
-        self.createWindow = importEvent_UI()
-        self.createWindow.show()
-
-#Login page for email to verify event organizer either true/false
-class Login_UI(qtw.QWidget):
-    def __init__(self): #pragma: no cover
-        super().__init__()
-        self.setWindowTitle('Login UI')
-        self.setGeometry(0, 0, 600, 300)
-          
-
-        self.label_1 = qtw.QLabel("Email:",self)
-        
-        self.label_1.setFont(QtGui.QFont('Helvetica',12))
-        self.label_1.move(180, 100)
-
-        self.email_field = qtw.QLineEdit(self)
-        self.email_field.move(260,100)
-        self.email_field.resize(150,20)
-        self.login = qtw.QPushButton("Login", self)
-        self.login.move(250,220)
-        self.login.resize(100,40)
-        self.login.clicked.connect(self.openMainWindow)
-
-        self.show()
-
-    def openMainWindow(self): #pragma: no cover
-        self.close()
-        self.MainWindow = Main_UI()
-        self.MainWindow.email = self.email_field.text()
-        self.MainWindow.show()
-
-    def openMainWindow(self): #pragma: no cover
-        self.close()
-        self.MainWindow = Main_UI()
-        self.MainWindow.email = self.email_field.text()
-        self.MainWindow.show()
-
-def main(): #pragma: no cover
-    api = get_calendar_api()
-    
-    time_now = datetime.datetime.utcnow().isoformat() + 'Z'  # 'Z' indicates UTC time
-    
-    events = get_upcoming_events(api, time_now, 10)
-    
-    # display upcoming events
-    if not events:
-        print('No upcoming events found.')
-    for event in events:
-        start = event['start'].get('dateTime', event['start'].get('date'))
-        print(start, event['summary'], event['status'], ',Event ID : ' + event['id'])
-    
-    # launch UI
-    app = qtw.QApplication([])
-    UI = Main_UI()
-    app.exec_()
+# Columns shown by the event tables
+EVENT_COLUMNS = ["Event ID","Event Title","Event Venue","Attendees","Start Date","End Date"]
+
+def event_cell(event, column):
+    """ Returns the text shown for an event in the given table column. """
+    if column == 0:
+        return event.get('id', '')
+    if column == 1:
+        return event.get('summary', '')
+    if column == 2:
+        return event.get('location', '')
+    if column == 3:
+        return ", ".join(attendee['displayName'] for attendee in event.get('attendees', [])
+                         if 'displayName' in attendee)
+    if column == 4:
+        return event.get('start', {}).get('dateTime', '')
+    if column == 5:
+        return event.get('end', {}).get('dateTime', '')
+    raise IndexError("No such column: " + str(column))
+
+def main(argv=None): #pragma: no cover
+    """ Launches the desktop app. The windows live in MyEventManagerUI, so that importing this
+    module (from the tests or MyEventManagerCLI) never loads Qt. """
+    from MyEventManagerUI import main as launch
+    launch(argv)
 
 if __name__ == "__main__":  # Prevents the main() function from being called by the test suite runner
     main()
-
-
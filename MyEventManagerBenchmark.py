@@ -0,0 +1,302 @@
+# Scale benchmarks for MyEventManager, run against FakeCalendarAPI so no Google account is needed.
+#
+#   python MyEventManagerBenchmark.py                                # 1k and 10k events, every operation
+#   python MyEventManagerBenchmark.py --sizes 100000 1000000 --operations search export --repeat 1
+#   python MyEventManagerBenchmark.py --save-baseline                # record the results as the baseline
+#   python MyEventManagerBenchmark.py --check                        # exit with 1 on a regression
+#
+# Each operation is timed --repeat times per size and reported as latency percentiles, throughput
+# (events handled per second at the median) and peak memory (from tracemalloc, in a separate run
+# so tracing does not slow the timed runs). benchmark_baselines.json holds the results of the default run;
+# timings depend on the machine, so save your own baseline before comparing against it. The generated
+# calendars are streamed to an ndjson file, so even the largest sizes are never held in memory whole.
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import MyEventManager
+from MyEventManager import (EventStore, ImportEngine, export_event, get_all_events, get_event_index,
+                            get_interval_index, import_Event, iter_import_events, iter_import_file,
+                            search_calendar, validateDateFormat)
+from FakeCalendarAPI import FakeCalendarService
+
+BASELINE_PATH = 'benchmark_baselines.json'
+DEFAULT_SIZES = [1000, 10000]
+# a run slower (or using more memory) than the baseline by more than this fraction is a regression
+DEFAULT_TOLERANCE = 0.25
+# smallest differences in median latency (seconds) and peak memory (bytes) that count as a regression
+NOISE = {'p50': 0.001, 'peakMemory': 2 ** 20}
+# command line options, replaced by main()
+options = argparse.Namespace(latency=0)
+# directory for the files written by the import and export benchmarks
+workspace = tempfile.gettempdir()
+
+TITLE_WORDS = ["Weekly", "Project", "Team", "Client", "Budget", "Design", "Sprint", "Planning", "Review",
+               "Standup", "Lunch", "Training", "Workshop", "Interview", "Quarterly", "Board", "Product",
+               "Marketing", "Retrospective", "Onboarding", "Demo", "Strategy", "Sync", "Kickoff"]
+EVENT_TYPES = ["Official Meeting", "Online Meeting", "Physical Event"]
+STREETS = ["Fake Street", "Wellington Road", "Princes Highway", "Collins Street", "Swanston Street",
+           "Chapel Street", "High Street", "Station Street", "Burke Road", "Dandenong Road"]
+SUBURBS = [("Clayton", "VIC", "3168"), ("Melbourne", "VIC", "3000"), ("Caulfield", "VIC", "3145"),
+           ("Sydney", "NSW", "2000"), ("Parramatta", "NSW", "2150"), ("Brisbane", "QLD", "4000"),
+           ("Adelaide", "SA", "5000"), ("Perth", "WA", "6000"), ("Hobart", "TAS", "7000")]
+FIRST_NAMES = ["John", "Jane", "Alex", "Sam", "Priya", "Wei", "Maria", "Ahmed", "Olivia", "Liam",
+               "Noah", "Emma", "Chen", "Fatima", "Lucas", "Mia", "Arjun", "Sofia", "Kai", "Zoe"]
+LAST_NAMES = ["Smith", "Nguyen", "Patel", "Brown", "Wilson", "Taylor", "Li", "Kumar", "Jones", "Martin"]
+
+def generate_events(count, seed=0, startYear=2020, years=4):
+    """ Yields count synthetic events in the shape the Calendar API returns: mixed titles, venues and
+    types, 0 to 20 attendees, 30 minute to 3 hour meetings (5% all day) spread over several years. """
+    generator = random.Random(seed)
+    people = [(first + " " + last, first.lower() + "." + last.lower() + "@example.com")
+              for first in FIRST_NAMES for last in LAST_NAMES]
+    for n in range(count):
+        offset = generator.randrange(years * 365)
+        day = date_from(startYear, offset)
+        suburb, state, postcode = generator.choice(SUBURBS)
+        event = {
+            'id': 'bench' + str(n).zfill(21),
+            'iCalUID': 'bench' + str(n) + '@example.com',
+            'status': 'confirmed',
+            'summary': " ".join(generator.sample(TITLE_WORDS, generator.randint(1, 3))),
+            'description': generator.choice(EVENT_TYPES),
+            'location': str(generator.randint(1, 999)) + " " + generator.choice(STREETS) + " " + suburb
+                        + " " + state + " " + postcode,
+            'organizer': {'email': 'me@example.com'},
+            'attendees': [{'displayName': name, 'email': email, 'responseStatus': 'needsAction'}
+                          for name, email in generator.sample(people, generator.randint(0, 20))],
+        }
+        if generator.random() < 0.05:
+            # the end date of an all day event is exclusive
+            event['start'] = {'date': day}
+            event['end'] = {'date': date_from(startYear, offset + 1)}
+        else:
+            minutes = generator.randrange(7 * 60, 18 * 60, 15)
+            length = generator.choice([30, 45, 60, 60, 90, 120, 180])
+            event['start'] = {'dateTime': day + 'T' + clock(minutes) + ':00Z'}
+            event['end'] = {'dateTime': day + 'T' + clock(min(minutes + length, 23 * 60 + 59)) + ':00Z'}
+        yield event
+
+def write_dataset(path, count, seed=0):
+    """ Writes count generated events to an ndjson file as they are generated. """
+    with open(path, 'w') as file:
+        for event in generate_events(count, seed):
+            file.write(json.dumps(event) + '\n')
+    return path
+
+def date_from(startYear, days):
+    """ Returns the YYYY-MM-DD date days after the start of startYear. """
+    return (datetime.date(startYear, 1, 1) + datetime.timedelta(days)).isoformat()
+
+def clock(minutes):
+    return str(minutes // 60).zfill(2) + ':' + str(minutes % 60).zfill(2)
+
+def search_queries(events, count=20, seed=0):
+    """ Returns search form values like a user would type, taken from a random sample of the events. """
+    generator = random.Random(seed)
+    sample = []
+    for n, event in enumerate(events):
+        if n < count:
+            sample.append(event)
+        else:
+            slot = generator.randrange(n + 1)
+            if slot < count:
+                sample[slot] = event
+    queries = []
+    for n in range(count):
+        event = sample[n % len(sample)]
+        start = event['start'].get('dateTime', event['start'].get('date'))
+        query = {'title': event['summary'].split()[0], 'eventType': '', 'location': '',
+                 'day': '', 'month': '', 'year': ''}
+        if n % 2:
+            query.update(month=start[5:7], year=start[:4])
+        if n % 3 == 0:
+            query.update(eventType=event['description'])
+        queries.append(query)
+    return queries
+
+# Each benchmark is (setup, run): setup(dataset) builds the state outside the timing from the ndjson
+# file of generated events, and run(state) is the operation being timed, which handles every event.
+
+def setup_listing(dataset):
+    MyEventManager.global_api = FakeCalendarService(iter_import_events(dataset), latency=options.latency)
+    MyEventManager.event_store = EventStore(':memory:')
+    MyEventManager.event_indexes.clear()
+
+def run_listing(state):
+    get_all_events()
+
+def setup_search(dataset):
+    # the search window's indexes, built from a synced store
+    setup_listing(dataset)
+    get_event_index()
+    get_interval_index()
+    return {'queries': search_queries(iter_import_events(dataset)), 'next': 0}
+
+def run_search(state):
+    query = state['queries'][state['next'] % len(state['queries'])]
+    state['next'] += 1
+    search_calendar(**query)
+
+def setup_import(dataset):
+    return {'service': FakeCalendarService(latency=options.latency), 'path': dataset}
+
+def run_import(state):
+    # the original one request per event import
+    import_Event(state['service'], state['path'])
+
+def run_import_engine(state):
+    # the concurrent batch import behind import_file, without its rate limit so the engine itself is measured
+    engine = ImportEngine(state['service'], requestsPerSecond=10 ** 9)
+    engine.run_records(iter_import_file(state['path']))
+
+def setup_export(dataset):
+    return {'events': list(iter_import_events(dataset)), 'path': os.path.join(workspace, 'export.json')}
+
+def run_export(state):
+    export_event(state['events'], state['path'])
+
+def setup_validate(dataset):
+    return [event['start'].get('dateTime', event['start'].get('date'))[:10] for event in iter_import_events(dataset)]
+
+def run_validate(dates):
+    for date in dates:
+        validateDateFormat(date)
+
+BENCHMARKS = {
+    'list': (setup_listing, run_listing),
+    'search': (setup_search, run_search),
+    'import': (setup_import, run_import),
+    'import_engine': (setup_import, run_import_engine),
+    'export': (setup_export, run_export),
+    'validate': (setup_validate, run_validate),
+}
+
+def percentile(samples, fraction):
+    """ Returns the sample at the given fraction (0 to 1) of the sorted samples, interpolating between neighbours. """
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def measure(operation, dataset, count, repeat):
+    """ Times one operation on the count events of a dataset file, returning its latency percentiles,
+    throughput and peak memory. """
+    setup, run = BENCHMARKS[operation]
+    samples = []
+    # the operations print their own success messages, which would swamp the report
+    with open(os.devnull, 'w') as quiet, contextlib.redirect_stdout(quiet):
+        for n in range(repeat):
+            state = setup(dataset)
+            started = time.perf_counter()
+            run(state)
+            samples.append(time.perf_counter() - started)
+
+        state = setup(dataset)
+        tracemalloc.start()
+        try:
+            run(state)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    median = percentile(samples, 0.5)
+    return {
+        'p50': median,
+        'p95': percentile(samples, 0.95),
+        'p99': percentile(samples, 0.99),
+        'max': max(samples),
+        'throughput': count / median if median > 0 else 0,
+        'peakMemory': peak,
+    }
+
+def run_benchmarks(sizes, operations, repeat=5, seed=0, report=print):
+    """ Runs every operation at every size. Returns {operation: {size: measurements}}. """
+    global workspace
+    results = {operation: {} for operation in operations}
+    with tempfile.TemporaryDirectory() as workspace:
+        for size in sizes:
+            dataset = write_dataset(os.path.join(workspace, 'events.ndjson'), size, seed)
+            for operation in operations:
+                # a single search is quick, so take more samples of it
+                samples = repeat * 10 if operation == 'search' else repeat
+                results[operation][str(size)] = measure(operation, dataset, size, samples)
+                report(format_result(operation, size, results[operation][str(size)]))
+    return results
+
+def format_result(operation, size, result):
+    return (operation.ljust(14) + str(size).rjust(9) + " events  p50 " + format_seconds(result['p50'])
+            + "  p95 " + format_seconds(result['p95']) + "  p99 " + format_seconds(result['p99'])
+            + "  " + str(int(result['throughput'])).rjust(10) + " events/s  peak "
+            + str(round(result['peakMemory'] / 2 ** 20, 1)) + " MiB")
+
+def format_seconds(seconds):
+    if seconds < 1e-3:
+        return (str(round(seconds * 1e6, 1)) + "us").rjust(9)
+    if seconds < 1:
+        return (str(round(seconds * 1e3, 1)) + "ms").rjust(9)
+    return (str(round(seconds, 2)) + "s").rjust(9)
+
+def load_baselines(path=BASELINE_PATH):
+    """ Returns the saved baseline results, or an empty dict if there are none yet. """
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file).get('results', {})
+
+def save_baselines(results, path=BASELINE_PATH):
+    """ Merges results into the baseline file, keeping baselines of sizes and operations not rerun. """
+    baselines = load_baselines(path)
+    for operation, sizes in results.items():
+        baselines.setdefault(operation, {}).update(sizes)
+    with open(path, 'w') as file:
+        json.dump({'version': 1, 'results': baselines}, file, indent=2, sort_keys=True)
+
+def compare(results, baselines, tolerance=DEFAULT_TOLERANCE):
+    """ Returns a message for each result whose median latency or peak memory is worse than its
+    baseline by more than tolerance. Differences within the measurement noise are ignored. """
+    regressions = []
+    for operation, sizes in results.items():
+        for size, result in sizes.items():
+            baseline = baselines.get(operation, {}).get(size)
+            if baseline is None:
+                continue
+            for metric, noise in NOISE.items():
+                if (baseline[metric] > 0 and result[metric] > baseline[metric] * (1 + tolerance)
+                        and result[metric] - baseline[metric] > noise):
+                    regressions.append(operation + " at " + size + " events: " + metric + " "
+                                       + str(round(result[metric] / baseline[metric], 2)) + "x the baseline")
+    return regressions
+
+def main(argv=None):
+    global options
+    parser = argparse.ArgumentParser(description="Benchmark MyEventManager against a fake Calendar API.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="calendar sizes to run")
+    parser.add_argument('--operations', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs of each operation")
+    parser.add_argument('--latency', type=float, default=0, help="fake API round trip time in seconds")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="baseline file")
+    parser.add_argument('--save-baseline', action='store_true', help="save these results as the baseline")
+    parser.add_argument('--check', action='store_true', help="exit with status 1 if any result regressed")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    options = parser.parse_args(argv)
+
+    results = run_benchmarks(options.sizes, options.operations, options.repeat, options.seed)
+    regressions = compare(results, load_baselines(options.baseline), options.tolerance)
+    for regression in regressions:
+        print("REGRESSION: " + regression)
+    if options.save_baseline:
+        save_baselines(results, options.baseline)
+        print("Baseline saved to " + options.baseline)
+    return 1 if options.check and regressions else 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,226 @@
+# Headless command line for MyEventManager, for cron jobs and scripted migrations. It only uses
+# MyEventManager.py, which never imports Qt. Results are written to stdout as JSON (or NDJSON with
+# --output ndjson); the progress messages of the underlying functions go to stderr.
+#
+#   python MyEventManagerCLI.py list --from 2022-10-01 --to 2022-11-01 --output ndjson
+#   python MyEventManagerCLI.py search --title standup --year 2022
+#   python MyEventManagerCLI.py export events.ndjson.gz --from 2022-01-01
+#   python MyEventManagerCLI.py import events.ndjson          (rerun to resume an interrupted import)
+#   python MyEventManagerCLI.py cancel EVENT_ID [EVENT_ID ...]
+#   python MyEventManagerCLI.py attendees list EVENT_ID
+#   python MyEventManagerCLI.py attendees add new@example.com --event EVENT_ID --event EVENT_ID
+#   python MyEventManagerCLI.py attendees replace old@example.com new@example.com
+#
+# Dates are taken as UTC unless they carry a time zone, e.g. 2022-10-01T09:00:00+11:00.
+# Exit status: 0 on success, 1 if anything failed, 2 for invalid arguments, 130 if interrupted.
+import argparse
+import contextlib
+import datetime
+import itertools
+import json
+import os
+import sys
+
+from MyEventManager import *
+
+def rfc3339(value):
+    """ argparse type: converts a date or date-time to the RFC 3339 UTC form the API expects. """
+    try:
+        instant = to_timestamp(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("not a date or date-time: " + value)
+    return datetime.datetime.fromtimestamp(instant, datetime.timezone.utc).isoformat().replace('+00:00', 'Z')
+
+def write_records(records, out, format):
+    """ Writes events (or any JSON objects) as a JSON array or one per line. """
+    write_events(records, out, format)
+    if format != 'ndjson':
+        out.write('\n')
+
+def write_report(report, out, format, **extra):
+    """ Writes the outcome of a bulk operation: a line per item for ndjson, otherwise a summary
+    object with the items in it. Returns the exit status. """
+    items = ([{'id': key, 'ok': True} for key in report.succeeded]
+             + [{'id': key, 'ok': False, 'error': str(error)} for key, error in report.failed])
+    if format == 'ndjson':
+        write_records(items, out, format)
+    else:
+        summary = {'succeeded': len(report.succeeded), 'failed': len(report.failed), 'skipped': report.skipped,
+                   'retries': report.retries, 'elapsed': round(report.elapsed, 3)}
+        summary.update(extra)
+        summary['items'] = items
+        out.write(json.dumps(summary, indent=4) + '\n')
+    return 1 if report.failed else 0
+
+def list_events(args, out):
+    if args.start is None and args.end is None:
+        # syncs the store itself
+        events = iter_all_events()
+    else:
+        sync_event_store()
+        events = get_interval_index().overlapping(args.start or '0001-01-01', args.end or '9999-12-31')
+    if args.limit is not None:
+        events = itertools.islice(events, args.limit)
+    write_records(events, out, args.output)
+    return 0
+
+def search(args, out):
+    sync_event_store()
+    events = search_calendar(args.title, args.type, args.location, args.day, args.month, args.year)
+    write_records(events, out, args.output)
+    return 0
+
+def export(args, out):
+    format, compress = export_format(args.path)
+    query = {}
+    if args.start is not None:
+        query['timeMin'] = args.start
+    if args.end is not None:
+        query['timeMax'] = args.end
+    count = export_calendar(get_global_api(), args.path, args.format or format, compress, **query)
+    out.write(json.dumps({'path': args.path, 'exported': count}) + '\n')
+    return 0
+
+def import_events(args, out):
+    report = import_file(get_global_api(), args.path, args.concurrency, args.batch_size)
+    return write_report(report, out, args.output)
+
+def cancel(args, out):
+    report = OperationReport()
+    for eventId in args.eventIds:
+        try:
+            eventCancellation(get_global_api(), eventId)
+        except Exception as error:
+            report.record(eventId, error)
+        else:
+            report.record(eventId)
+    return write_report(report, out, args.output)
+
+def list_attendees(args, out):
+    event = get_event(get_global_api(), args.eventId)
+    write_records(event.get('attendees', []), out, args.output)
+    return 0
+
+def target_events(args, email):
+    """ The events an attendee command applies to: the --event ids, or else every event email is invited to. """
+    if args.eventIds:
+        return args.eventIds
+    query = {}
+    if args.start is not None:
+        query['timeMin'] = args.start
+    if args.end is not None:
+        query['timeMax'] = args.end
+    return events_with_attendee(get_global_api(), email, **query)
+
+def add_attendee(args, out):
+    if not args.eventIds and args.withEmail is None:
+        raise ValueError("Give the events to invite " + args.email + " to with --event or --with.")
+    eventIds = target_events(args, args.withEmail)
+    report = bulk_add_attendee(get_global_api(), eventIds, args.email, args.name, args.batch_size)
+    return write_report(report, out, args.output)
+
+def remove_attendee(args, out):
+    report = bulk_remove_attendee(get_global_api(), target_events(args, args.email), args.email, args.batch_size)
+    return write_report(report, out, args.output)
+
+def replace_attendee(args, out):
+    report = bulk_replace_attendee(get_global_api(), target_events(args, args.oldEmail), args.oldEmail,
+                                   args.newEmail, args.batch_size)
+    return write_report(report, out, args.output)
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='MyEventManagerCLI',
+                                     description="Manage your Google Calendar events without the desktop app.")
+    parser.add_argument('--profile', metavar='DIR', help="profile the command into DIR")
+    parser.add_argument('--metrics', metavar='PATH', default=os.environ.get(METRICS_ENV),
+                        help="write the API metrics to PATH in the Prometheus text format")
+    commands = parser.add_subparsers(dest='command', required=True)
+    # options every command takes after its name
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--output', choices=['json', 'ndjson'], default='json', help="format of the results (default json)")
+
+    def add_range(command):
+        command.add_argument('--from', dest='start', type=rfc3339, help="events ending after this date")
+        command.add_argument('--to', dest='end', type=rfc3339, help="events starting before this date")
+
+    command = commands.add_parser('list', parents=[common], help="list the events on the primary calendar")
+    add_range(command)
+    command.add_argument('--limit', type=int)
+    command.set_defaults(run=list_events)
+
+    command = commands.add_parser('search', parents=[common], help="search events like the search window does")
+    command.add_argument('--title', default='')
+    command.add_argument('--type', default='', help="Official Meeting, Online Meeting or Physical Event")
+    command.add_argument('--location', default='')
+    command.add_argument('--day', default='')
+    command.add_argument('--month', default='')
+    command.add_argument('--year', default='')
+    command.set_defaults(run=search)
+
+    command = commands.add_parser('export', parents=[common], help="export events to a file (.json, .ndjson, optionally .gz)")
+    command.add_argument('path')
+    command.add_argument('--format', choices=['json', 'compact', 'ndjson'], help="overrides the format guessed from path")
+    add_range(command)
+    command.set_defaults(run=export)
+
+    command = commands.add_parser('import', parents=[common], help="import an exported file, resuming an interrupted import of it")
+    command.add_argument('path')
+    command.add_argument('--concurrency', type=int, default=4)
+    command.add_argument('--batch-size', type=int, default=MAX_BATCH_SIZE)
+    command.set_defaults(run=import_events)
+
+    command = commands.add_parser('cancel', parents=[common], help="cancel events")
+    command.add_argument('eventIds', nargs='+', metavar='EVENT_ID')
+    command.set_defaults(run=cancel)
+
+    attendees = commands.add_parser('attendees', help="list or change attendees").add_subparsers(dest='action', required=True)
+    command = attendees.add_parser('list', parents=[common], help="list the attendees of an event")
+    command.add_argument('eventId', metavar='EVENT_ID')
+    command.set_defaults(run=list_attendees)
+
+    def add_targets(command, help):
+        command.add_argument('--event', dest='eventIds', action='append', default=[], metavar='EVENT_ID', help=help)
+        add_range(command)
+        command.add_argument('--batch-size', type=int, default=MAX_BATCH_SIZE)
+
+    command = attendees.add_parser('add', parents=[common], help="invite someone to events")
+    command.add_argument('email')
+    command.add_argument('--name')
+    command.add_argument('--with', dest='withEmail', metavar='EMAIL', help="every event EMAIL is invited to")
+    add_targets(command, "event to invite them to (repeatable)")
+    command.set_defaults(run=add_attendee)
+
+    command = attendees.add_parser('remove', parents=[common], help="remove someone from events")
+    command.add_argument('email')
+    add_targets(command, "event to remove them from (repeatable, default every event they are invited to)")
+    command.set_defaults(run=remove_attendee)
+
+    command = attendees.add_parser('replace', parents=[common], help="replace one attendee with another")
+    command.add_argument('oldEmail', metavar='OLD_EMAIL')
+    command.add_argument('newEmail', metavar='NEW_EMAIL')
+    add_targets(command, "event to change (repeatable, default every event OLD_EMAIL is invited to)")
+    command.set_defaults(run=replace_attendee)
+    return parser
+
+def main(argv=None, out=None):
+    """ Runs a command and returns the exit status. """
+    args = build_parser().parse_args(argv)
+    out = out or sys.stdout
+    configure_profiler(args.profile)
+    name = 'cli ' + args.command + (' ' + args.action if args.command == 'attendees' else '')
+    try:
+        # the library functions print progress, which must not end up in the results
+        with contextlib.redirect_stdout(sys.stderr), api_action(name), profiler.profile(name):
+            return args.run(args, out)
+    except KeyboardInterrupt:
+        print("Interrupted." + (" Run the import again to resume it." if args.command == 'import' else ""), file=sys.stderr)
+        return 130
+    except Exception as error:
+        print("Error: " + str(error), file=sys.stderr)
+        return 1
+    finally:
+        if args.metrics:
+            api_metrics.dump(args.metrics)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,19 @@
 from calendar import Calendar
 import unittest
 from unittest.mock import MagicMock, Mock, patch
+import gzip
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
 import MyEventManager
 from MyEventManager import *
+from FakeCalendarAPI import FakeCalendarService
+from googleapiclient import discovery_cache
+from googleapiclient.http import HttpMockSequence
 # Add other imports here if needed
 
 class MyEventManagerTest(unittest.TestCase):
@@ -110,6 +121,120 @@ class MyEventManagerTest(unittest.TestCase):
                       "123 Fake Street Clayton VIC 3400", "confirmed", attendees)
             event.add_event(mock_api)
 
+    def test_add_event_conflicts(self):
+        """ Tests add_event with checkConflicts. One free/busy query covers every attendee, and the event
+        is only inserted when nobody is busy. """
+        mock_api = MagicMock()
+        query = mock_api.freebusy.return_value.query
+        attendees = [Attendees("John","jsmith@gmail.com"), Attendees("Jane","jane@gmail.com")]
+        event = Calendar("An event", "Official Meeting",'2022-10-10','08:00','2022-10-10','10:00', 
+                      "123 Fake Street Clayton VIC 3400", "confirmed", attendees)
+
+        # TC1: nobody busy -> inserted after one query for the organizer and every attendee
+        query.return_value.execute.return_value = {'calendars': {
+            'primary': {'busy': []}, 'jsmith@gmail.com': {'busy': []}, 'jane@gmail.com': {'busy': []}}}
+        event.add_event(mock_api, checkConflicts=True)
+
+        body = query.call_args[1]['body']
+        self.assertEqual(query.call_count, 1)
+        self.assertEqual([item['id'] for item in body['items']], ['primary', 'jsmith@gmail.com', 'jane@gmail.com'])
+        self.assertEqual((body['timeMin'], body['timeMax']), ('2022-10-10T08:00:00Z', '2022-10-10T10:00:00Z'))
+        self.assertEqual(mock_api.events.return_value.insert.call_count, 1)
+
+        # TC2: busy attendee -> EventConflict with merged periods, nothing inserted
+        query.return_value.execute.return_value = {'calendars': {
+            'primary': {'busy': []},
+            'jsmith@gmail.com': {'busy': [
+                {'start': '2022-10-10T09:00:00Z', 'end': '2022-10-10T09:30:00Z'},
+                {'start': '2022-10-10T08:00:00Z', 'end': '2022-10-10T09:00:00Z'},
+                {'start': '2022-10-10T09:15:00Z', 'end': '2022-10-10T09:20:00Z'}]},
+            'jane@gmail.com': {'errors': [{'domain': 'global', 'reason': 'notFound'}]}}}
+        with self.assertRaises(EventConflict) as context:
+            event.add_event(mock_api, checkConflicts=True)
+
+        self.assertEqual(context.exception.conflicts, {'jsmith@gmail.com': [
+            {'start': '2022-10-10T08:00:00Z', 'end': '2022-10-10T09:30:00Z'}]})
+        self.assertEqual(mock_api.events.return_value.insert.call_count, 1)
+
+        # TC3: without the check -> inserted, no query
+        event.add_event(mock_api)
+        self.assertEqual(query.call_count, 2)
+        self.assertEqual(mock_api.events.return_value.insert.call_count, 2)
+
+        # TC4: separate periods are not merged
+        self.assertEqual(len(merge_busy([{'start': '2022-10-10T08:00:00Z', 'end': '2022-10-10T09:00:00Z'},
+                                         {'start': '2022-10-10T09:01:00Z', 'end': '2022-10-10T10:00:00Z'}])), 2)
+
+    def test_bulk_attendees(self):
+        """ Tests bulk_add_attendee, bulk_remove_attendee and bulk_replace_attendee. Attendees are read and
+        written back in batches, and only events that change are patched. """
+        calendars = {
+            'event' + str(n): [{'email': 'old@gmail.com', 'responseStatus': 'accepted'},
+                               {'email': 'keep@gmail.com', 'displayName': 'Keep', 'responseStatus': 'accepted'}]
+            for n in range(60)}
+        calendars['event1'] = [{'email': 'keep@gmail.com'}]
+        calendars['event2'] = [{'email': 'old@gmail.com'}, {'email': 'new@gmail.com'}]
+        patched = {}
+
+        # gets are answered from calendars and patches are recorded, unknown events are not found
+        mock_api = MagicMock()
+        events = mock_api.events.return_value
+        batches = self.mock_batches(mock_api)
+
+        def make_get(calendarId, eventId, fields):
+            def execute():
+                if eventId not in calendars:
+                    raise HttpError(MagicMock(status=404), b'')
+                return {'attendees': calendars[eventId]}
+            return self.mock_request(execute)
+
+        def make_patch(calendarId, eventId, sendUpdates, body):
+            def execute():
+                patched[eventId] = body['attendees']
+                return body
+            return self.mock_request(execute)
+        events.get.side_effect = make_get
+        events.patch.side_effect = make_patch
+
+        # TC1: replace across 60 events and one missing event -> 2 batches of gets, 2 of patches
+        report = bulk_replace_attendee(mock_api, list(calendars) + ['missing'], 'old@gmail.com', 'new@gmail.com')
+
+        self.assertEqual([len(batch) for batch in batches], [50, 49, 11, 10])
+        self.assertEqual(events.get.call_args[1]['fields'], event_fields('attendees'))
+        self.assertEqual(len(report.succeeded), 59)
+        self.assertEqual([eventId for eventId, error in report.failed], ['missing'])
+        self.assertEqual(report.skipped, 1)
+        self.assertEqual(patched['event0'], [{'email': 'new@gmail.com', 'responseStatus': 'needsAction'},
+                                             {'email': 'keep@gmail.com', 'displayName': 'Keep', 'responseStatus': 'accepted'}])
+        self.assertEqual(patched['event2'], [{'email': 'new@gmail.com', 'responseStatus': 'needsAction'}])
+
+        # TC2: add skips events the attendee is already invited to
+        patched.clear()
+        report = bulk_add_attendee(mock_api, ['event0', 'event1'], 'keep@gmail.com', 'Keep')
+        self.assertEqual(report.skipped, 2)
+        self.assertEqual(patched, {})
+        report = bulk_add_attendee(mock_api, ['event1'], 'extra@gmail.com', 'Extra', batchSize=1)
+        self.assertEqual(patched['event1'][-1], {'email': 'extra@gmail.com', 'responseStatus': 'needsAction',
+                                                 'displayName': 'Extra'})
+
+        # TC3: remove
+        patched.clear()
+        report = bulk_remove_attendee(mock_api, ['event0', 'event1'], 'old@gmail.com')
+        self.assertEqual(report.succeeded, ['event0'])
+        self.assertEqual(patched['event0'], [calendars['event0'][1]])
+
+        # TC4: invalid input
+        with self.assertRaises(ValueError):
+            bulk_remove_attendee(mock_api, ['event0'], 'not an email')
+        with self.assertRaises(ValueError):
+            bulk_add_attendee(mock_api, ['event0'], 'a@gmail.com', batchSize=51)
+
+        # TC5: events found by a query are the ones the attendee is invited to
+        events.list.return_value.execute.return_value = {'items': [
+            {'id': 'a', 'attendees': [{'email': 'old@gmail.com'}]}, {'id': 'b', 'attendees': [{'email': 'x@gmail.com'}]}]}
+        self.assertEqual(events_with_attendee(mock_api, 'old@gmail.com'), ['a'])
+        self.assertEqual(events.list.call_args[1]['q'], 'old@gmail.com')
+
     def test_create_on_behalf(self):
         """ Tests create_on_behalf(). Tests if an event was successfully created on someone's behalf. """
         # mock api
@@ -141,6 +266,63 @@ class MyEventManagerTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             event.create_on_behalf(mock_api, "other @gmail.com")
             
+    def test_bulk_create_on_behalf(self):
+        """ Tests bulk_create_on_behalf. Events are inserted and moved in batches, and the next batch is
+        inserted while the previous one is being moved. """
+        mock_api = MagicMock()
+        events = mock_api.events.return_value
+        log = []
+        second_insert = threading.Event()
+
+        # inserts answer with an id, except for events titled "Broken"; moves of batch 0 wait for the next insert
+        def make_insert(calendarId, body, sendUpdates):
+            def execute():
+                if body['summary'] == "Broken":
+                    raise HttpError(MagicMock(status=400), b'')
+                return {'id': 'id-' + body['summary']}
+            return self.mock_request(execute, 'calendar.events.insert')
+
+        def make_move(calendarId, eventId, destination, sendUpdates):
+            return self.mock_request(lambda: {'id': eventId}, 'calendar.events.move')
+
+        def before(requests):
+            kind = requests[0].methodId.split('.')[-1]
+            number = len([entry for entry in log if entry[0] == kind])
+            log.append((kind, number, 'start'))
+            if kind == 'insert' and number == 1:
+                second_insert.set()
+            if kind == 'move' and number == 0:
+                # only returns early if the next insert overlaps this move
+                log.append(('overlapped', second_insert.wait(5)))
+        events.insert.side_effect = make_insert
+        events.move.side_effect = make_move
+        self.mock_batches(mock_api, before)
+
+        def make_calendar(title, attendees=1):
+            return Calendar(title, "Official Meeting",'2022-10-10','08:00','2022-10-10','09:00',
+                            "123 Fake Street Clayton VIC 3400", "confirmed",
+                            [Attendees("John","jsmith@gmail.com")] * attendees)
+
+        calendars = [make_calendar("Event " + str(n)) for n in range(5)]
+        calendars[1] = make_calendar("Broken")
+        calendars[3] = make_calendar("Too many", attendees=21)
+
+        # TC1: 5 events in batches of 2 -> 3 insert batches, moves overlap the next insert
+        report = bulk_create_on_behalf(mock_api, calendars, 'other@gmail.com', batchSize=2)
+
+        self.assertIn(('overlapped', True), log)
+        self.assertEqual(len([entry for entry in log if entry[0] == 'insert']), 3)
+        self.assertEqual(sorted(report.succeeded), [0, 2, 4])
+        self.assertEqual(sorted(number for number, error in report.failed), [1, 3])
+        self.assertEqual(events.move.call_args[1]['destination'], 'other@gmail.com')
+        self.assertEqual(events.move.call_args[1]['eventId'], 'id-Event 4')
+
+        # TC2: invalid organizer or batch size
+        with self.assertRaises(ValueError):
+            bulk_create_on_behalf(mock_api, calendars, 'not an email')
+        with self.assertRaises(ValueError):
+            bulk_create_on_behalf(mock_api, calendars, 'other@gmail.com', batchSize=0)
+
     def test_change_organizer(self):
         """ Tests change_organizer. Tests if an organizer of an event is successfully changed. """
         # mock api
@@ -621,12 +803,13 @@ class MyEventManagerTest(unittest.TestCase):
         
         # mock api
         mock_api = MagicMock()
+        mock_api.events.return_value.list.return_value.execute.return_value = {'items': []}
         
         view_events(mock_api)
         
-        # api call
+        # api call (single page)
         self.assertEqual(
-            mock_api.events.return_value.list.return_value.execute.return_value.get.call_count, 1)
+            mock_api.events.return_value.list.return_value.execute.call_count, 1)
         
         # assert times are correct
         list_call = mock_api.events.return_value.list.call_args_list[0]
@@ -752,6 +935,1346 @@ class MyEventManagerTest(unittest.TestCase):
         empty_list = []
         with self.assertRaises(Exception):
             export_event(empty_list)
+
+    def test_event_store_sync(self):
+        """ Tests EventStore.sync. Only changes since the last sync are downloaded and applied. """
+        store = EventStore(':memory:')
+        mock_api = MagicMock()
+        list_call = mock_api.events.return_value.list
+
+        # TC1: first sync downloads every page
+        list_call.return_value.execute.side_effect = [
+            {'items': [{'id': 'a', 'start': {'dateTime': '2022-10-11T08:00:00Z'}}], 'nextPageToken': 'p2'},
+            {'items': [{'id': 'b', 'start': {'dateTime': '2022-10-10T08:00:00Z'}}], 'nextSyncToken': 's1'},
+        ]
+        store.sync(mock_api)
+
+        self.assertNotIn('syncToken', list_call.call_args_list[0][1])
+        self.assertEqual(list_call.call_args_list[1][1]['pageToken'], 'p2')
+        self.assertEqual([event['id'] for event in store.get_events()], ['b', 'a'])
+
+        # TC2: incremental sync sends the token and applies changes and deletions
+        list_call.return_value.execute.side_effect = [
+            {'items': [{'id': 'a', 'status': 'cancelled'},
+                       {'id': 'c', 'start': {'dateTime': '2022-10-12T08:00:00Z'}}], 'nextSyncToken': 's2'},
+        ]
+        store.sync(mock_api)
+
+        self.assertEqual(list_call.call_args_list[2][1]['syncToken'], 's1')
+        self.assertEqual([event['id'] for event in store.get_events()], ['b', 'c'])
+        self.assertEqual([event['id'] for event in store.iter_events(pageSize=1)], ['b', 'c'])
+        self.assertEqual(store.get_sync_token(), 's2')
+
+        # TC3: an expired token (410 Gone) falls back to a full sync
+        gone = HttpError(MagicMock(status=410), b'')
+        list_call.return_value.execute.side_effect = [
+            gone,
+            {'items': [{'id': 'd', 'start': {'dateTime': '2022-10-13T08:00:00Z'}}], 'nextSyncToken': 's3'},
+        ]
+        store.sync(mock_api)
+
+        self.assertNotIn('syncToken', list_call.call_args_list[4][1])
+        self.assertEqual([event['id'] for event in store.get_events()], ['d'])
+
+        # TC4: other errors are raised
+        list_call.return_value.execute.side_effect = [HttpError(MagicMock(status=500), b'')]
+        with self.assertRaises(HttpError):
+            store.sync(mock_api)
+
+
+    def test_iter_events(self):
+        """ Tests iter_events. Every page of a listing is walked and events are yielded in order. """
+        mock_api = MagicMock()
+        list_call = mock_api.events.return_value.list
+        list_call.return_value.execute.side_effect = [
+            {'items': [{'id': 'a'}, {'id': 'b'}], 'nextPageToken': 'p2'},
+            {'items': [{'id': 'c'}]},
+        ]
+
+        # TC1: both pages are read
+        events = iter_events(mock_api, 2, singleEvents=True)
+        self.assertEqual([event['id'] for event in events], ['a', 'b', 'c'])
+
+        # second request continues from the first page
+        self.assertEqual(list_call.call_args_list[0][1]['maxResults'], 2)
+        self.assertEqual(list_call.call_args_list[0][1]['calendarId'], 'primary')
+        self.assertNotIn('pageToken', list_call.call_args_list[0][1])
+        self.assertEqual(list_call.call_args_list[1][1]['pageToken'], 'p2')
+        self.assertEqual(list_call.call_args_list[1][1]['singleEvents'], True)
+
+        # TC2: nothing is requested until the generator is consumed
+        list_call.reset_mock()
+        events = iter_events(mock_api)
+        self.assertEqual(list_call.call_count, 0)
+
+        # TC3, TC4: page size outside 1 to 2500
+        with self.assertRaises(ValueError):
+            list(iter_events(mock_api, 0))
+        with self.assertRaises(ValueError):
+            list(iter_events(mock_api, 2501))
+
+
+    def test_field_projections(self):
+        """ Tests that list and get calls request partial responses with the named field masks. """
+        mock_api = MagicMock()
+        EVENT_ID = "jabsdr03t8fb3ph1aet2hsilro"
+
+        # TC1: attendee edits only read the attendee list
+        realEvent = Calendar("A real event",'Official Meeting','10-OCT-2022','08:00','10-OCT-2022','08:00',
+                          '123 Fake Street Clayton VIC 3400','confirmed',[])
+        realEvent.add_attendee(mock_api, EVENT_ID, "me@gmail.com", "Me")
+        get_call = mock_api.events.return_value.get.call_args_list[0]
+        self.assertEqual(get_call[1]['fields'], 'etag,attendees')
+
+        # TC2: listings keep the paging and sync tokens around the item mask
+        get_upcoming_events(mock_api, "2020-08-03T00:00:00.000000Z", 1)
+        list_call = mock_api.events.return_value.list.call_args_list[0]
+        self.assertEqual(list_call[1]['fields'], list_fields('summary'))
+        self.assertTrue(list_call[1]['fields'].startswith('nextPageToken,nextSyncToken,items('))
+
+        # TC3: the local store downloads everything the table, search and export need
+        store = EventStore(':memory:')
+        mock_api.events.return_value.list.return_value.execute.return_value = {'items': []}
+        store.sync(mock_api)
+        list_call = mock_api.events.return_value.list.call_args_list[-1]
+        self.assertEqual(list_call[1]['fields'], list_fields('export'))
+        for field in ['summary', 'description', 'location', 'start', 'end', 'attendees', 'iCalUID']:
+            self.assertIn(field, event_fields('export'))
+
+        # TC4: unknown projection
+        with self.assertRaises(KeyError):
+            event_fields('everything')
+
+
+    def test_stream_search(self):
+        """ Tests stream_search. Results are delivered in chunks, and a cancelled search stops delivering. """
+        index = EventIndex()
+        index.apply([{'id': 'e' + str(n).zfill(3), 'summary': 'Team ' + str(n) if n % 2 else 'Lunch', 'description': 'Casual',
+                      'location': 'Online', 'start': {'dateTime': '2022-10-10T08:00:00Z'},
+                      'end': {'dateTime': '2022-10-10T09:00:00Z'}} for n in range(25)])
+        chunks = []
+
+        with patch.dict(MyEventManager.event_indexes, {EventIndex: index}):
+            # TC1: 12 matches in chunks of 5
+            self.assertEqual(stream_search(chunks.append, chunkSize=5, title='team'), 12)
+            self.assertEqual([len(chunk) for chunk in chunks], [5, 5, 2])
+            self.assertTrue(all(event['summary'].startswith('Team') for chunk in chunks for event in chunk))
+
+            # TC2: no matches -> nothing delivered
+            del chunks[:]
+            self.assertEqual(stream_search(chunks.append, title='dinner'), 0)
+            self.assertEqual(chunks, [])
+
+            # TC3: cancelled after the first chunk
+            cancel = threading.Event()
+
+            def emit(chunk):
+                chunks.append(chunk)
+                cancel.set()
+            with self.assertRaises(OperationCancelled):
+                stream_search(emit, cancel, chunkSize=5, title='team')
+            self.assertEqual(len(chunks), 1)
+
+    def test_fake_calendar_service(self):
+        """ Tests the client against FakeCalendarService: paging, sync, batches, free/busy, etags and
+        injected failures behave the way the client expects of the real API. """
+        events = [{'summary': 'Event ' + str(n), 'description': 'Casual', 'location': 'Online',
+                   'start': {'dateTime': '2022-10-%02dT08:00:00Z' % (n % 28 + 1)},
+                   'end': {'dateTime': '2022-10-%02dT09:00:00Z' % (n % 28 + 1)}} for n in range(600)]
+        service = FakeCalendarService(events, seed=1)
+
+        # TC1: listing follows every page in start order, timeMin/timeMax narrow it
+        listed = list(iter_events(service, maxResults=100))
+        self.assertEqual(len(listed), 600)
+        self.assertEqual(listed, sorted(listed, key=lambda event: (event['start']['dateTime'], event['id'])))
+        self.assertEqual(len(list(iter_events(service, timeMin='2022-10-02T00:00:00Z',
+                                              timeMax='2022-10-03T00:00:00Z'))), 22)
+
+        # TC2: incremental sync picks up inserts and deletes only
+        store = EventStore(':memory:')
+        store.sync(service)
+        self.assertEqual(len(store.get_events()), 600)
+        added = Calendar("New", "Official Meeting", '2022-10-01', '08:30', '2022-10-01', '10:00',
+                         "123 Fake Street Clayton VIC 3400", "confirmed", [Attendees("John", "jsmith@gmail.com")])
+        with self.assertRaises(EventConflict):
+            added.add_event(service, checkConflicts=True)
+        new = added.add_event(service)
+        service.events().delete(calendarId='primary', eventId=listed[0]['id']).execute()
+        requests = service.stats['requests']
+        store.sync(service)
+        self.assertEqual(service.stats['requests'] - requests, 1)
+        self.assertEqual(len(store.get_events()), 600)
+        self.assertIn(new['id'], [event['id'] for event in store.get_events()])
+
+        # TC3: the attendee is now busy, and unknown calendars cannot be checked
+        conflicts = find_conflicts(service, '2022-10-01T09:00:00Z', '2022-10-01T09:30:00Z',
+                                   ['jsmith@gmail.com', 'nobody@gmail.com'])
+        self.assertEqual(list(conflicts), ['jsmith@gmail.com'])
+
+        # TC4: unchanged reads are 304s, conditional writes see other writers
+        cache = EventCache()
+        cache.get(service, new['id'], 'attendees')
+        cache.get(service, new['id'], 'attendees')
+        self.assertEqual(service.stats['notModified'], 1)
+        stale = service.events().patch(calendarId='primary', eventId=new['id'], body={'attendees': []})
+        stale.headers['If-Match'] = new['etag']
+        service.events().patch(calendarId='primary', eventId=new['id'], body={'summary': 'Renamed'}).execute()
+        with self.assertRaises(HttpError) as context:
+            stale.execute()
+        self.assertEqual(context.exception.resp.status, 412)
+
+        # TC5: batched imports through the engine land in the calendar, by iCalUID
+        report = ImportEngine(service, concurrency=2, requestsPerSecond=1000).run(self.make_export(120))
+        self.assertEqual(len(report.succeeded), 120)
+        self.assertEqual(service.stats['batches'], 3)
+        self.assertEqual(len(list(iter_events(service, q='uid119'))), 1)
+
+        # TC6: expired sync token, injected errors and quota are retryable the way the client expects
+        with self.assertRaises(HttpError) as context:
+            service.events().list(calendarId='primary', syncToken='999999').execute()
+        self.assertEqual(context.exception.resp.status, 410)
+        failing = FakeCalendarService(errorRate=1, seed=1)
+        with self.assertRaises(HttpError) as context:
+            failing.events().list(calendarId='primary').execute()
+        self.assertTrue(is_retryable(context.exception))
+        throttled = FakeCalendarService(requestsPerSecond=2)
+        with self.assertRaises(HttpError) as context:
+            for n in range(5):
+                throttled.events().list(calendarId='primary').execute()
+        self.assertTrue(is_retryable(context.exception))
+        self.assertEqual(throttled.stats['throttled'], 1)
+
+        # TC7: requests carry their API method, fields masks leave out what they do not select, and a
+        # batch can fail as a whole before any of its requests run
+        self.assertEqual(request_method(service.events().list(calendarId='primary')), 'calendar.events.list')
+        self.assertEqual(request_method(service.freebusy().query(body={})), 'calendar.freebusy.query')
+        page = service.events().list(calendarId='primary', maxResults=2,
+                                     fields='nextPageToken,items(id,start/dateTime)').execute()
+        self.assertEqual(sorted(page), ['items', 'nextPageToken'])
+        self.assertEqual([sorted(item) for item in page['items']], [['id', 'start'], ['id', 'start']])
+        self.assertEqual(sorted(page['items'][0]['start']), ['dateTime'])
+        read = service.events().get(calendarId='primary', eventId=new['id'], fields=event_fields('deletion')).execute()
+        self.assertEqual(sorted(read), ['end', 'id'])
+        broken = FakeCalendarService(batchErrorRate=1, seed=1)
+        with self.assertRaises(HttpError) as context:
+            send_batch(broken, [broken.events().insert(calendarId='primary', body=events[0])])
+        self.assertTrue(is_retryable(context.exception))
+        self.assertEqual((broken.stats['batches'], broken.stats['requests'], broken.stats['errors']), (1, 0, 1))
+
+    def test_api_metrics(self):
+        """ Tests the API instrumentation: InstrumentedRequest, batches, retries, actions and the Prometheus dump. """
+        document = json.loads(discovery_cache.get_static_doc('calendar', 'v3'))
+        http = HttpMockSequence([
+            ({'status': '200', 'content-length': '13'}, '{"items": []}'),
+            ({'status': '503'}, '{"error": {"code": 503, "message": "Backend Error"}}'),
+            ({'status': '200', 'content-length': '12'}, '{"id": "e1"}'),
+            ({'status': '404', 'content-length': '50'}, '{"error": {"code": 404, "message": "Not Found"}}')])
+        service = build_from_document(document, http=http, requestBuilder=InstrumentedRequest)
+        api_metrics.reset()
+
+        # TC1: every execute() is counted with its method, status, action and size; retries are counted
+        with api_action("View events"):
+            service.events().list(calendarId='primary').execute()
+            execute_with_backoff(service.events().get(calendarId='primary', eventId='e1'), baseDelay=0)
+        with self.assertRaises(HttpError):
+            service.events().delete(calendarId='primary', eventId='e2').execute()
+        rows = {row['method']: row for row in api_metrics.summary()}
+        self.assertEqual(rows['calendar.events.get']['calls'], 2)
+        self.assertEqual(rows['calendar.events.get']['errors'], 1)
+        self.assertEqual(rows['calendar.events.get']['retries'], 1)
+        self.assertEqual(rows['calendar.events.list']['bytes'], 13)
+        self.assertEqual(rows['calendar.events.delete']['errors'], 1)
+        self.assertEqual(api_metrics.actions(), {"View events": 3, "other": 1})
+
+        # TC2: a batch counts once, and so does each request in it; pool workers keep the caller's action
+        mock_api = MagicMock()
+        self.mock_import_batches(mock_api, failing=("uid1",))
+        api_metrics.reset()
+        with api_action("Import events"):
+            ImportEngine(mock_api, concurrency=2, batchSize=2, requestsPerSecond=1000, retries=0).run(self.make_export(4))
+        self.assertEqual(api_metrics.actions(), {"Import events": 6})
+        self.assertEqual(api_metrics.requests[("Import events", 'calendar.events.import', 400)], 1)
+        self.assertEqual(api_metrics.requests[("Import events", 'calendar.events.import', 200)], 3)
+        self.assertEqual(api_metrics.requests[("Import events", 'batch', 200)], 2)
+
+        # TC3: Prometheus text format, with cumulative buckets and escaped labels
+        api_metrics.reset()
+        with api_action('Say "hi"'):
+            api_metrics.record('calendar.events.list', 200, 0.03, 2000)
+            api_metrics.record('calendar.events.list', 200, 20, 100)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'api_metrics.prom')
+            api_metrics.dump(path)
+            with open(path) as file:
+                lines = file.read().splitlines()
+        self.assertIn('myeventmanager_api_requests_total{action="Say \\"hi\\"",method="calendar.events.list",status="200"} 2', lines)
+        self.assertIn('myeventmanager_api_request_duration_seconds_bucket{method="calendar.events.list",le="0.05"} 1', lines)
+        self.assertIn('myeventmanager_api_request_duration_seconds_bucket{method="calendar.events.list",le="10"} 1', lines)
+        self.assertIn('myeventmanager_api_request_duration_seconds_bucket{method="calendar.events.list",le="+Inf"} 2', lines)
+        self.assertIn('myeventmanager_api_response_size_bytes_sum{method="calendar.events.list"} 2100', lines)
+        self.assertIn('# TYPE myeventmanager_api_request_duration_seconds histogram', lines)
+        self.assertEqual(api_metrics.summary()[0]['p95'], 20)
+        api_metrics.reset()
+        self.assertEqual(api_metrics.summary(), [])
+
+    def test_profiler(self):
+        """ Tests the profiling mode: profiled calls write a profile, an allocation snapshot and a summary. """
+        import pstats
+        events = [{'summary': 'Event ' + str(n)} for n in range(100)]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'export.json')
+            profiles = os.path.join(directory, 'profiles')
+            try:
+                # TC1: profiling off -> nothing written
+                export_event(events, path)
+                self.assertFalse(os.path.exists(profiles))
+
+                # TC2: profiling on -> one profile per call, named after the function
+                profiler.enable(profiles)
+                export_event(events, path)
+                files = sorted(os.listdir(profiles))
+                self.assertEqual([os.path.splitext(name)[1] for name in files], ['.prof', '.snapshot', '.txt'])
+                self.assertTrue(files[0].endswith('-export_event.prof'))
+                stats = pstats.Stats(os.path.join(profiles, files[0]))
+                self.assertIn('write_events', [function for filename, line, function in stats.stats])
+                tracemalloc.Snapshot.load(os.path.join(profiles, files[1]))
+                with open(os.path.join(profiles, files[2])) as file:
+                    self.assertTrue(file.read().startswith('export_event: '))
+                self.assertFalse(tracemalloc.is_tracing())
+
+                # TC3: calls inside a profiled action are part of its profile; calls on other threads
+                # meanwhile are not profiled, since only one profiler can run at a time
+                with profiler.profile('Export Events'):
+                    export_event(events, path)
+                    thread = threading.Thread(target=export_event, args=(events, os.path.join(directory, 'other')))
+                    thread.start()
+                    thread.join()
+                summaries = [name for name in os.listdir(profiles) if name.endswith('.txt')]
+                self.assertEqual(len(summaries), 2)
+                self.assertEqual(len([name for name in summaries if name.endswith('-Export_Events.txt')]), 1)
+                self.assertFalse(tracemalloc.is_tracing())
+
+                # TC4: another profiling tool already active -> the call runs unprofiled
+                error = ValueError("Another profiling tool is already active")
+                with patch('cProfile.Profile.enable', side_effect=error):
+                    export_event(events, path)
+                    # an error of the action is not chained to the profiler's own
+                    with self.assertRaises(KeyError) as context:
+                        with profiler.profile('Fail'):
+                            raise KeyError('summary')
+                    self.assertIsNone(context.exception.__context__)
+                self.assertEqual(len(os.listdir(profiles)), 6)
+                export_event(events, path)
+                self.assertEqual(len(os.listdir(profiles)), 9)
+
+                # TC5: toggled off at runtime -> nothing more written
+                profiler.disable()
+                export_event(events, path)
+                self.assertEqual(len(os.listdir(profiles)), 9)
+
+                # TC6: switched on by the environment, 1 meaning the default directory
+                with patch.dict(os.environ, {'MYEVENTMANAGER_PROFILE': '1'}):
+                    self.assertTrue(configure_profiler())
+                self.assertEqual(profiler.directory, PROFILE_PATH)
+                profiler.disable()
+                with patch.dict(os.environ, {'MYEVENTMANAGER_PROFILE': ''}):
+                    self.assertFalse(configure_profiler())
+            finally:
+                profiler.disable()
+                profiler.directory = PROFILE_PATH
+
+    def test_cli(self):
+        """ Tests MyEventManagerCLI against FakeCalendarService: every command, its output formats and exit status. """
+        import subprocess
+        import sys
+        import MyEventManagerCLI
+
+        # TC1: the command line never loads Qt
+        loaded = subprocess.run([sys.executable, '-c', "import sys, MyEventManagerCLI; "
+                                 "print(any(name.startswith('PyQt5') for name in sys.modules))"],
+                                cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True)
+        self.assertEqual(loaded.stdout.strip(), 'False')
+
+        events = [{'summary': 'Standup ' + str(n), 'description': 'Online Meeting', 'location': 'Online',
+                   'organizer': {'email': 'me@example.com'}, 'status': 'confirmed', 'iCalUID': 'cli' + str(n),
+                   'start': {'dateTime': '2022-10-%02dT08:00:00Z' % (n + 1)},
+                   'end': {'dateTime': '2022-10-%02dT09:00:00Z' % (n + 1)},
+                   'attendees': [{'email': 'jsmith@gmail.com'}] if n % 2 else []} for n in range(10)]
+        service = FakeCalendarService(events)
+        ids = [event['id'] for event in iter_events(service)]
+        event_cache.clear()
+
+        def run(*argv):
+            out = io.StringIO()
+            with patch('sys.stderr', new_callable=io.StringIO) as err:
+                status = MyEventManagerCLI.main(list(argv), out)
+            return status, out.getvalue(), err.getvalue()
+
+        with patch.object(MyEventManager, 'global_api', service), \
+                patch.object(MyEventManager, 'event_store', EventStore(':memory:')), \
+                patch.dict(MyEventManager.event_indexes, clear=True), \
+                tempfile.TemporaryDirectory() as directory:
+            # TC2: list and search, as a JSON array or one event per line
+            status, out, err = run('list')
+            self.assertEqual((status, len(json.loads(out))), (0, 10))
+            requests = service.stats['requests']
+            run('list')
+            self.assertEqual(service.stats['requests'] - requests, 1)
+            status, out, err = run('list', '--from', '2022-10-03', '--to', '2022-10-05T00:00:00Z', '--output', 'ndjson')
+            self.assertEqual([json.loads(line)['summary'] for line in out.splitlines()], ['Standup 2', 'Standup 3'])
+            status, out, err = run('search', '--title', 'standup', '--day', '07', '--month', '10', '--year', '2022')
+            self.assertEqual([event['summary'] for event in json.loads(out)], ['Standup 6'])
+            status, out, err = run('search', '--day', '31', '--month', '02', '--year', '2022')
+            self.assertEqual((status, json.loads(out)), (0, []))
+
+            # TC3: export then import into another calendar; progress goes to stderr, not the results
+            path = os.path.join(directory, 'events.ndjson')
+            status, out, err = run('export', path, '--from', '2022-10-06')
+            self.assertEqual(json.loads(out), {'path': path, 'exported': 5})
+            with patch.object(MyEventManager, 'global_api', FakeCalendarService()):
+                status, out, err = run('import', path)
+            self.assertEqual((status, json.loads(out)['succeeded']), (0, 5))
+            self.assertIn('Import finished', err)
+
+            # TC4: attendees are listed, added, replaced and removed; by default on every event they are invited to
+            status, out, err = run('attendees', 'add', 'new@gmail.com', '--event', ids[0], '--event', ids[1])
+            self.assertEqual(json.loads(out)['succeeded'], 2)
+            status, out, err = run('attendees', 'list', ids[1], '--output', 'ndjson')
+            self.assertEqual([json.loads(line)['email'] for line in out.splitlines()], ['jsmith@gmail.com', 'new@gmail.com'])
+            status, out, err = run('attendees', 'replace', 'jsmith@gmail.com', 'john@gmail.com')
+            self.assertEqual(json.loads(out)['succeeded'], 5)
+            status, out, err = run('attendees', 'remove', 'new@gmail.com', '--output', 'ndjson')
+            self.assertEqual(sorted(json.loads(line)['id'] for line in out.splitlines()), sorted(ids[:2]))
+            self.assertEqual(run('attendees', 'add', 'new@gmail.com')[0], 1)
+
+            # TC5: cancel reports each event, with exit status 1 if any failed
+            status, out, err = run('cancel', ids[9], 'missingevent0000000000000')
+            report = json.loads(out)
+            self.assertEqual((status, report['succeeded'], report['items'][1]['ok']), (1, 1, False))
+            self.assertNotIn(ids[9], [event['id'] for event in iter_events(service)])
+
+            # TC6: invalid arguments
+            with patch('sys.stderr', new_callable=io.StringIO):
+                with self.assertRaises(SystemExit) as context:
+                    MyEventManagerCLI.main(['list', '--from', 'yesterday'])
+            self.assertEqual(context.exception.code, 2)
+
+    def test_benchmark(self):
+        """ Tests the benchmark suite on a small calendar: the generator, every operation and the baseline comparison. """
+        import MyEventManagerBenchmark
+
+        # TC1: generated events are valid, varied and repeatable, and streamed to the dataset file
+        events = list(MyEventManagerBenchmark.generate_events(300, seed=2))
+        self.assertEqual(events, list(MyEventManagerBenchmark.generate_events(300, seed=2)))
+        self.assertEqual(len({event['id'] for event in events}), 300)
+        self.assertTrue(all(len(event['attendees']) <= 20 for event in events))
+        self.assertGreater(len({event['start'].get('dateTime', event['start'].get('date'))[:4] for event in events}), 1)
+        self.assertTrue(all(validateDateFormat(event['start'].get('dateTime', event['start'].get('date'))[:10])
+                            for event in events))
+        self.assertTrue(all(to_timestamp(event['end']) > to_timestamp(event['start']) for event in events))
+        allDay = [event for event in events if 'date' in event['start']]
+        self.assertGreater(len(allDay), 0)
+        self.assertTrue(all(to_timestamp(event['end']) - to_timestamp(event['start']) == 86400 for event in allDay))
+        with tempfile.TemporaryDirectory() as directory:
+            path = MyEventManagerBenchmark.write_dataset(os.path.join(directory, 'events.ndjson'), 300, seed=2)
+            self.assertEqual(list(iter_import_events(path)), events)
+            queries = MyEventManagerBenchmark.search_queries(iter_import_events(path))
+        self.assertEqual(len(queries), 20)
+
+        # TC2: every operation runs and reports its measurements
+        with patch.object(MyEventManager, 'global_api'), patch.object(MyEventManager, 'event_store'), \
+                patch.dict(MyEventManager.event_indexes, clear=True):
+            results = MyEventManagerBenchmark.run_benchmarks([50], list(MyEventManagerBenchmark.BENCHMARKS),
+                                                             repeat=2, report=lambda line: None)
+        for operation in MyEventManagerBenchmark.BENCHMARKS:
+            result = results[operation]['50']
+            self.assertLessEqual(result['p50'], result['p95'])
+            self.assertLessEqual(result['p95'], result['max'])
+            self.assertGreater(result['throughput'], 0)
+
+        # TC3: saved baselines are merged, and only slowdowns beyond the tolerance and noise are flagged
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baselines.json')
+            self.assertEqual(MyEventManagerBenchmark.load_baselines(path), {})
+            MyEventManagerBenchmark.save_baselines({'list': {'50': {'p50': 0.5, 'peakMemory': 10 ** 7}}}, path)
+            MyEventManagerBenchmark.save_baselines({'list': {'100': {'p50': 1.0, 'peakMemory': 10 ** 7}}}, path)
+            baselines = MyEventManagerBenchmark.load_baselines(path)
+        self.assertEqual(sorted(baselines['list']), ['100', '50'])
+        slower = {'list': {'50': {'p50': 0.7, 'peakMemory': 10 ** 7}, '100': {'p50': 1.1, 'peakMemory': 10 ** 7},
+                           '200': {'p50': 9.0, 'peakMemory': 10 ** 7}}}
+        regressions = MyEventManagerBenchmark.compare(slower, baselines, tolerance=0.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn('list at 50 events', regressions[0])
+        noisy = {'list': {'50': {'p50': 0.5, 'peakMemory': 10 ** 7 + 1000}}}
+        self.assertEqual(MyEventManagerBenchmark.compare(noisy, {'list': {'50': {'p50': 0.5, 'peakMemory': 10 ** 7 - 1000}}}, 0), [])
+
+    def test_event_cache(self):
+        """ Tests EventCache. Cached events are revalidated with their etag and reused on 304. """
+        cache = EventCache(maxSize=2)
+        mock_api = MagicMock()
+        requests = []
+        current = {'etag': '"1"', 'attendees': [{'email': 'me@gmail.com'}]}
+
+        # the server answers 304 when If-None-Match matches the current etag
+        def make_request(calendarId, eventId, fields):
+            request = MagicMock()
+            request.headers = {}
+
+            def execute():
+                if request.headers.get('If-None-Match') == current['etag']:
+                    raise HttpError(MagicMock(status=304), b'')
+                return json.loads(json.dumps(current))
+            request.execute.side_effect = execute
+            requests.append(request)
+            return request
+        mock_api.events.return_value.get.side_effect = make_request
+
+        # TC1: first read -> full response, no precondition
+        event = cache.get(mock_api, 'a', 'attendees')
+        self.assertEqual(event, current)
+        self.assertNotIn('If-None-Match', requests[0].headers)
+
+        # TC2: unchanged -> 304, cached copy returned and safe to change
+        event['attendees'].append({'email': 'other@gmail.com'})
+        event = cache.get(mock_api, 'a', 'attendees')
+        self.assertEqual(requests[1].headers['If-None-Match'], '"1"')
+        self.assertEqual(event, current)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # TC3: changed on the server -> new copy
+        current = {'etag': '"2"', 'attendees': []}
+        self.assertEqual(cache.get(mock_api, 'a', 'attendees'), current)
+        self.assertEqual(cache.misses, 2)
+
+        # TC4: discard and size limit
+        cache.discard('a')
+        cache.get(mock_api, 'a', 'attendees')
+        self.assertNotIn('If-None-Match', requests[-1].headers)
+        cache.get(mock_api, 'b', 'attendees')
+        cache.get(mock_api, 'c', 'attendees')
+        self.assertEqual([key[0] for key in cache.entries], ['b', 'c'])
+
+        # TC5: other errors are raised
+        mock_api.events.return_value.get.side_effect = None
+        mock_api.events.return_value.get.return_value.execute.side_effect = HttpError(MagicMock(status=404), b'')
+        with self.assertRaises(HttpError):
+            cache.get(mock_api, 'b', 'attendees')
+
+    def mock_versioned_event(self, mock_api, attendees):
+        """ Makes get and patch behave like the server for one event: every write changes the etag,
+        and a patch whose If-Match is not the current etag fails with 412. Returns the server state. """
+        server = {'etag': '"1"', 'attendees': attendees, 'before_patch': None}
+        lock = threading.Lock()
+
+        def make_get(calendarId, eventId, fields):
+            request = MagicMock()
+            request.headers = {}
+
+            def execute():
+                with lock:
+                    if request.headers.get('If-None-Match') == server['etag']:
+                        raise HttpError(MagicMock(status=304), b'')
+                    return {'etag': server['etag'], 'attendees': json.loads(json.dumps(server['attendees']))}
+            request.execute.side_effect = execute
+            return request
+
+        def make_patch(calendarId, eventId, sendUpdates, body):
+            request = MagicMock()
+            request.headers = {}
+
+            def execute():
+                # lets a test change the event just before a write arrives
+                if server['before_patch'] is not None:
+                    server['before_patch']()
+                with lock:
+                    if request.headers.get('If-Match') != server['etag']:
+                        raise HttpError(MagicMock(status=412), b'')
+                    server['attendees'] = body['attendees']
+                    server['etag'] = '"' + str(int(server['etag'].strip('"')) + 1) + '"'
+                    return {'id': eventId, 'etag': server['etag'], 'attendees': body['attendees']}
+            request.execute.side_effect = execute
+            return request
+
+        mock_api.events.return_value.get.side_effect = make_get
+        mock_api.events.return_value.patch.side_effect = make_patch
+        self.mock_batches(mock_api)
+        return server
+
+    def test_conditional_attendee_writes(self):
+        """ Tests update_attendees. Writes are conditional on the etag read, and are redone when
+        the event changed in between, so concurrent edits are not lost. """
+        event_cache.clear()
+        mock_api = MagicMock()
+        server = self.mock_versioned_event(mock_api, [{'email': 'me@gmail.com'}])
+        realEvent = Calendar("A real event",'Official Meeting','10-OCT-2022','08:00','10-OCT-2022','08:00',
+                          '123 Fake Street Clayton VIC 3400','confirmed',[])
+        EVENT_ID = "conditionalwritesevent0001"
+        stats = (attendee_write_stats.writes, attendee_write_stats.retries, attendee_write_stats.failures)
+
+        # TC1: someone else adds an attendee between our read and our write -> ours is redone on top
+        def other_operator():
+            server['before_patch'] = None
+            server['attendees'] = server['attendees'] + [{'email': 'other@gmail.com'}]
+            server['etag'] = '"100"'
+        server['before_patch'] = other_operator
+        realEvent.add_attendee(mock_api, EVENT_ID, "new@gmail.com", "New")
+
+        self.assertEqual([attendee['email'] for attendee in server['attendees']],
+                         ['me@gmail.com', 'other@gmail.com', 'new@gmail.com'])
+        first_patch = mock_api.events.return_value.patch.call_args_list[0]
+        self.assertEqual(first_patch[1]['body']['attendees'][-1]['email'], 'new@gmail.com')
+        self.assertEqual(attendee_write_stats.retries - stats[1], 1)
+        self.assertEqual(attendee_write_stats.writes - stats[0], 1)
+
+        # TC2: parallel edits of the same event all survive. Each lost race means another write went
+        # through, so with as many retries as writers every write is sure to land
+        def add_guest(email):
+            update_attendees(mock_api, EVENT_ID, lambda attendees: attendees + [{'email': email}], retries=8)
+        threads = [threading.Thread(target=add_guest, args=("guest" + str(n) + "@gmail.com",)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        emails = [attendee['email'] for attendee in server['attendees']]
+        self.assertEqual(sorted(email for email in emails if email.startswith('guest')),
+                         sorted("guest" + str(n) + "@gmail.com" for n in range(8)))
+
+        # TC3: the event keeps changing -> gives up after the retries
+        def always_changing():
+            server['etag'] = '"' + str(int(server['etag'].strip('"')) + 1) + '"'
+        server['before_patch'] = always_changing
+        with self.assertRaises(HttpError):
+            update_attendees(mock_api, EVENT_ID, lambda attendees: attendees, retries=2)
+        self.assertEqual(attendee_write_stats.failures - stats[2], 1)
+
+        # TC4: bulk edits retry only the events that lost the race
+        server['before_patch'] = other_operator
+        report = bulk_remove_attendee(mock_api, [EVENT_ID], 'me@gmail.com', batchSize=1)
+        self.assertEqual(report.succeeded, [EVENT_ID])
+        self.assertEqual(report.retries, 1)
+        self.assertNotIn('me@gmail.com', [attendee['email'] for attendee in server['attendees']])
+        self.assertIn('other@gmail.com', [attendee['email'] for attendee in server['attendees']])
+
+    def make_export(self, count):
+        """ Builds a list of exported events for the import tests. """
+        return [{"summary": "Event " + str(n), "location": "123 Fake Street Clayton VIC 3400",
+                 "organizer": {"email": "me@gmail.com"},
+                 "start": {"dateTime": "2022-10-10T08:00:00Z"}, "end": {"dateTime": "2022-10-10T09:00:00Z"},
+                 "description": "Official Meeting", "status": "confirmed", "attendees": [],
+                 "iCalUID": "uid" + str(n)} for n in range(count)]
+
+    def mock_request(self, execute, methodId=None):
+        """ Builds a request whose execute() returns what execute returns, or raises what it raises. """
+        request = MagicMock(methodId=methodId)
+        request.headers = {}
+        request.execute.side_effect = lambda http=None: execute()
+        return request
+
+    def mock_batches(self, mock_api, before=None):
+        """ Makes new_batch_http_request return batches that execute the requests added to them one
+        after the other, passing each response or HttpError to the callback. before, if given, is
+        called with the requests of a batch as it is executed. Returns the list of batches executed,
+        each a list of its requests. """
+        batches = []
+
+        def new_batch(callback):
+            batch = MagicMock()
+            added = []
+            batch.add.side_effect = lambda request, request_id: added.append((request_id, request))
+
+            def execute(http=None):
+                batches.append([request for requestId, request in added])
+                if before is not None:
+                    before(batches[-1])
+                for requestId, request in added:
+                    try:
+                        callback(requestId, request.execute(), None)
+                    except HttpError as error:
+                        callback(requestId, None, error)
+            batch.execute.side_effect = execute
+            return batch
+
+        mock_api.new_batch_http_request.side_effect = new_batch
+        return batches
+
+    def mock_import_batches(self, mock_api, failing=(), status=400):
+        """ Makes imports go through mock_batches. Imports of the iCalUIDs in failing are answered
+        with an error of the given status. Returns the batches executed. """
+        def make_import(calendarId, body):
+            def execute():
+                if body['iCalUID'] in failing:
+                    raise HttpError(MagicMock(status=status), b'')
+                return {'iCalUID': body['iCalUID']}
+            return self.mock_request(execute, 'calendar.events.import')
+
+        mock_api.events.return_value.import_.side_effect = make_import
+        return self.mock_batches(mock_api)
+
+    def test_import_batches(self):
+        """ Tests the batching of ImportEngine. Imports are grouped into batches of at most 50. """
+        mock_api = MagicMock()
+        batches = self.mock_import_batches(mock_api, failing=("uid1", "uid51", "uid101"))
+
+        # TC1: 120 events -> batches of 50, 50 and 20
+        report = ImportEngine(mock_api, concurrency=1, requestsPerSecond=1000).run(self.make_export(120))
+
+        self.assertEqual([len(batch) for batch in batches], [50, 50, 20])
+        self.assertEqual(mock_api.events.return_value.import_.call_count, 120)
+
+        # the second event of every batch failed and is reported by iCalUID
+        self.assertEqual(len(report.succeeded), 117)
+        self.assertEqual([uid for uid, error in report.failed], ["uid1", "uid51", "uid101"])
+
+        # TC2: custom batch size
+        del batches[:]
+        ImportEngine(mock_api, concurrency=1, batchSize=2, requestsPerSecond=1000).run(self.make_export(5))
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+
+        # TC3, TC4: batch size outside 1 to 50
+        with self.assertRaises(ValueError):
+            ImportEngine(mock_api, batchSize=0)
+        with self.assertRaises(ValueError):
+            ImportEngine(mock_api, batchSize=51)
+
+        # TC5: from a file
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "events.json")
+            with open(path, "w") as file:
+                json.dump(self.make_export(3), file)
+            report = import_file(mock_api, path)
+        self.assertEqual(sorted(report.succeeded), ["uid0", "uid2"])
+
+        # TC6: empty fields Google leaves out are optional; an event without a start is reported, not sent
+        events = self.make_export(4)
+        for field in ("location", "description", "attendees"):
+            del events[2][field]
+        del events[3]["start"]
+        del batches[:]
+        report = ImportEngine(mock_api, concurrency=1, requestsPerSecond=1000).run(events)
+        self.assertEqual([len(batch) for batch in batches], [3])
+        self.assertEqual(report.succeeded, ["uid0", "uid2"])
+        self.assertEqual([uid for uid, error in report.failed], ["uid1", "uid3"])
+        self.assertIsInstance(report.failed[1][1], InvalidEvent)
+
+    def test_is_retryable(self):
+        """ Tests is_retryable and is_rejected. Only rate limit and server errors are retried. """
+        # TC1 - TC3: retryable statuses
+        for status in [429, 500, 503]:
+            self.assertTrue(is_retryable(HttpError(MagicMock(status=status), b'')))
+
+        # TC4: 403 caused by rate limiting
+        content = b'{"error": {"errors": [{"reason": "rateLimitExceeded"}]}}'
+        self.assertTrue(is_retryable(HttpError(MagicMock(status=403), content)))
+
+        # TC5: other 403 (permission denied)
+        content = b'{"error": {"errors": [{"reason": "forbidden"}]}}'
+        self.assertFalse(is_retryable(HttpError(MagicMock(status=403), content)))
+
+        # TC6, TC7: client errors and non http errors
+        self.assertFalse(is_retryable(HttpError(MagicMock(status=400), b'')))
+        self.assertFalse(is_retryable(ValueError()))
+
+        # TC8 - TC10: is_rejected only accepts errors caused by the request itself
+        self.assertTrue(is_rejected(HttpError(MagicMock(status=400), b'')))
+        self.assertTrue(is_rejected(InvalidEvent("no start")))
+        content = b'{"error": {"errors": [{"reason": "dailyLimitExceeded"}]}}'
+        self.assertFalse(is_rejected(HttpError(MagicMock(status=403), content)))
+        self.assertFalse(is_rejected(HttpError(MagicMock(status=503), b'')))
+
+    def test_import_engine(self):
+        """ Tests ImportEngine. Events are imported concurrently and rate limited requests are retried. """
+        attempts = {}
+
+        # every request fails once with 429, "uid3" is rejected with 400
+        def make_request(calendarId, body):
+            request = MagicMock()
+
+            def execute():
+                uid = body['iCalUID']
+                attempts[uid] = attempts.get(uid, 0) + 1
+                if uid == "uid3":
+                    raise HttpError(MagicMock(status=400), b'')
+                if attempts[uid] == 1:
+                    raise HttpError(MagicMock(status=429), b'')
+                return body
+            request.execute.side_effect = execute
+            return request
+
+        mock_api = MagicMock()
+        mock_api.events.return_value.import_.side_effect = make_request
+
+        # TC1: single requests over three workers
+        engine = ImportEngine(mock_api, concurrency=3, batchSize=1, requestsPerSecond=1000, baseDelay=0)
+        report = engine.run(self.make_export(10))
+
+        self.assertEqual(sorted(report.succeeded), sorted("uid" + str(n) for n in range(10) if n != 3))
+        self.assertEqual([uid for uid, error in report.failed], ["uid3"])
+        self.assertEqual(report.retries, 9)
+        self.assertEqual(attempts["uid3"], 1)
+        self.assertGreater(report.throughput(), 0)
+
+        # TC2: batches resend only the events that failed with a retryable error
+        mock_api = MagicMock()
+        batches = self.mock_import_batches(mock_api, failing=("uid1",), status=503)
+        engine = ImportEngine(mock_api, concurrency=2, batchSize=5, requestsPerSecond=1000,
+                              retries=2, baseDelay=0)
+        report = engine.run(self.make_export(5))
+
+        # the failing event is resent alone until the retries run out
+        self.assertEqual([len(batch) for batch in batches], [5, 1, 1])
+        self.assertEqual(len(report.succeeded), 4)
+        self.assertEqual([uid for uid, error in report.failed], ["uid1"])
+        self.assertEqual(report.retries, 2)
+
+        # TC3: invalid concurrency
+        with self.assertRaises(ValueError):
+            ImportEngine(mock_api, concurrency=0)
+
+        # TC4: batches failing as a whole are sent again, and the retries are counted
+        service = FakeCalendarService(batchErrorRate=0.5, seed=1)
+        api_metrics.reset()
+        report = ImportEngine(service, concurrency=1, requestsPerSecond=1000, retries=8, baseDelay=0).run(self.make_export(120))
+        self.assertEqual(len(report.succeeded), 120)
+        self.assertEqual(len(service.uids), 120)
+        self.assertGreater(service.stats['errors'], 0)
+        self.assertEqual(report.retries, service.stats['errors'])
+        # the metrics count every event sent again
+        self.assertGreaterEqual(sum(api_metrics.retries.values()), report.retries)
+        self.assertEqual([method for action, method in api_metrics.retries], ['calendar.events.import'])
+
+        # TC5: a dropped connection is retried too, a batch rejected as a whole is not
+        mock_api = MagicMock()
+        failures = [ConnectionError("Network unreachable"), HttpError(MagicMock(status=401), b'')]
+
+        def fail(requests):
+            if failures:
+                raise failures.pop(0)
+        self.mock_batches(mock_api, before=fail)
+        mock_api.events.return_value.import_.side_effect = lambda calendarId, body: self.mock_request(lambda: body)
+        engine = ImportEngine(mock_api, concurrency=1, batchSize=5, requestsPerSecond=1000, baseDelay=0)
+        with self.assertRaises(HttpError):
+            engine.run(self.make_export(5))
+        self.assertEqual(failures, [])
+        api_metrics.reset()
+
+    def test_token_bucket(self):
+        """ Tests TokenBucket. Requests beyond the burst capacity wait for the bucket to refill. """
+        bucket = TokenBucket(rate=100, capacity=2)
+
+        # TC1: the burst is served immediately
+        started = time.monotonic()
+        bucket.acquire()
+        bucket.acquire()
+        self.assertLess(time.monotonic() - started, 0.01)
+
+        # TC2: the next request waits about 1 / rate seconds
+        bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.005)
+
+        # TC3: invalid rate
+        with self.assertRaises(ValueError):
+            TokenBucket(0)
+
+        # TC4: a request larger than the capacity (a whole batch) is served once the bucket is full,
+        # and the following request waits for the debt to be repaid
+        bucket = TokenBucket(rate=1000, capacity=2)
+        bucket.acquire(10)
+        started = time.monotonic()
+        bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.008)
+
+    def test_iter_json_array(self):
+        """ Tests iter_json_array. Items are parsed incrementally, across chunk boundaries. """
+        items = [{"summary": "a, [b] \\\"c\\\"", "n": 1}, {"summary": "caf\u00e9 \u2615"}, [], 42]
+        data = json.dumps(items, indent=4, ensure_ascii=False).encode('utf-8')
+
+        # TC1: tiny chunks split strings, numbers and multi-byte characters
+        records = list(iter_json_array(io.BytesIO(data), chunkSize=3))
+        self.assertEqual([item for offset, item in records], items)
+
+        # TC2: resuming from an item's offset yields only the items after it
+        offset = records[1][0]
+        resumed = list(iter_json_array(io.BytesIO(data), offset, chunkSize=5))
+        self.assertEqual([item for offset, item in resumed], items[2:])
+
+        # TC3: empty array
+        self.assertEqual(list(iter_json_array(io.BytesIO(b' [ ] '))), [])
+
+        # TC4: not an array
+        with self.assertRaises(ValueError):
+            list(iter_json_array(io.BytesIO(b'{"summary": "a"}')))
+
+        # TC5: truncated file
+        with self.assertRaises(ValueError):
+            list(iter_json_array(io.BytesIO(data[:-10])))
+
+        # TC6: missing separator
+        with self.assertRaises(ValueError):
+            list(iter_json_array(io.BytesIO(b'[{} {}]')))
+
+        # TC7: numbers split across chunks are not cut short
+        for data, expected in [(b'[1.5, 2]', [1.5, 2]), (b'[1e5,-20, 3.25E-2]', [1e5, -20, 0.0325]),
+                               (b'[12345678, true, null]', [12345678, True, None])]:
+            for chunkSize in (1, 2, 3):
+                self.assertEqual([item for offset, item in iter_json_array(io.BytesIO(data), chunkSize=chunkSize)],
+                                 expected)
+
+    def test_iter_import_file(self):
+        """ Tests iter_import_file. json and ndjson files are streamed, other extensions are rejected. """
+        events = self.make_export(3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            # TC1: json array
+            path = os.path.join(directory, "events.json")
+            with open(path, "w") as file:
+                json.dump(events, file)
+            self.assertEqual(list(iter_import_events(path)), events)
+
+            # TC2: ndjson, blank lines are skipped
+            path = os.path.join(directory, "events.ndjson")
+            with open(path, "w") as file:
+                file.write("\n".join(json.dumps(event) for event in events) + "\n\n")
+            records = list(iter_import_file(path))
+            self.assertEqual([event for offset, event in records], events)
+
+            # resuming after the first line
+            resumed = list(iter_import_file(path, records[0][0]))
+            self.assertEqual([event for offset, event in resumed], events[1:])
+
+            # TC3: empty array
+            path = os.path.join(directory, "empty.json")
+            with open(path, "w") as file:
+                file.write("[]")
+            with self.assertRaises(Exception):
+                list(iter_import_events(path))
+
+        # TC4: unsupported extension is rejected before the file is read
+        with self.assertRaises(Exception):
+            iter_import_file("events.txt")
+
+
+    def test_export_formats(self):
+        """ Tests export_event. Events are streamed to the chosen path in each supported format. """
+        events = self.make_export(3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            # TC1: default format is identical to the previous json.dumps(eventList, indent=4)
+            path = os.path.join(directory, "export.json")
+            self.assertEqual(export_event(events, path), 3)
+            with open(path) as file:
+                self.assertEqual(file.read(), json.dumps(events, indent=4))
+
+            # TC2: compact json from a generator
+            export_event((event for event in events), path, 'compact')
+            with open(path) as file:
+                self.assertEqual(json.load(file), events)
+
+            # TC3: gzip compressed ndjson
+            path = os.path.join(directory, "export.ndjson.gz")
+            format, compress = export_format(path)
+            self.assertEqual((format, compress), ('ndjson', True))
+            export_event(events, path, format, compress)
+            with gzip.open(path, 'rt') as file:
+                self.assertEqual([json.loads(line) for line in file], events)
+
+            # TC4: empty generator
+            with self.assertRaises(Exception):
+                export_event(iter([]), path)
+
+            # TC5: unknown format
+            with self.assertRaises(ValueError):
+                export_event(events, path, 'xml')
+
+            # TC6: exporting the calendar reads it through the paginated listing
+            mock_api = MagicMock()
+            mock_api.events.return_value.list.return_value.execute.side_effect = [
+                {'items': events[:2], 'nextPageToken': 'p2'}, {'items': events[2:]}]
+            path = os.path.join(directory, "calendar.ndjson")
+            self.assertEqual(export_calendar(mock_api, path, 'ndjson'), 3)
+            with open(path) as file:
+                self.assertEqual([json.loads(line) for line in file], events)
+
+
+    def test_resumable_import(self):
+        """ Tests import_file with ImportJournal. An interrupted import resumes where it stopped. """
+        imported = []
+        broken = [True]
+
+        # the connection drops when uid3 is sent, until broken is cleared
+        def make_request(calendarId, body):
+            request = MagicMock()
+
+            def execute(http=None):
+                if body['iCalUID'] == "uid3" and broken[0]:
+                    raise ConnectionError("Network unreachable")
+                imported.append(body['iCalUID'])
+                return body
+            request.execute.side_effect = execute
+            return request
+
+        mock_api = MagicMock()
+        mock_api.events.return_value.import_.side_effect = make_request
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "events.ndjson")
+            with open(path, "w") as file:
+                file.write("".join(json.dumps(event) + "\n" for event in self.make_export(10)))
+
+            # TC1: interrupted import keeps its journal
+            with self.assertRaises(ConnectionError):
+                import_file(mock_api, path, concurrency=1, batchSize=1)
+            self.assertTrue(os.path.exists(path + JOURNAL_SUFFIX))
+            self.assertEqual(imported[:3], ["uid0", "uid1", "uid2"])
+
+            # TC2: rerun starts after the confirmed events and removes the journal when finished
+            first_run = list(imported)
+            del imported[:]
+            broken[0] = False
+            report = import_file(mock_api, path, concurrency=1, batchSize=1)
+
+            self.assertFalse(os.path.exists(path + JOURNAL_SUFFIX))
+            self.assertEqual(imported[0], "uid3")
+            self.assertEqual(set(imported) & {"uid0", "uid1", "uid2"}, set())
+            self.assertEqual(set(first_run) | set(imported), set("uid" + str(n) for n in range(10)))
+
+            # TC3: journal of a file that has since changed
+            with open(path + JOURNAL_SUFFIX, "w") as file:
+                file.write(json.dumps({"file": path, "size": 1}) + "\n")
+            with self.assertRaises(Exception):
+                import_file(mock_api, path)
+
+
+    def test_import_quota_resume(self):
+        """ Tests import_file running out of quota part way through. The rerun only sends what was not imported. """
+        service = FakeCalendarService(dailyLimit=120)
+
+        with tempfile.TemporaryDirectory() as directory, patch.object(TokenBucket, 'acquire'):
+            path = os.path.join(directory, "events.ndjson")
+            with open(path, "w") as file:
+                file.write("".join(json.dumps(event) + "\n" for event in self.make_export(300)))
+
+            # TC1: the daily quota runs out -> failed events reported, journal kept
+            report = import_file(service, path)
+            self.assertEqual(len(report.succeeded), 120)
+            self.assertEqual(len(report.failed), 180)
+            self.assertTrue(os.path.exists(path + JOURNAL_SUFFIX))
+
+            # only the confirmed events beyond the checkpoint are remembered
+            journal = ImportJournal(path + JOURNAL_SUFFIX, path)
+            self.assertTrue(all(end > journal.offset for end in journal.confirmed.values()))
+            journal.close()
+
+            # TC2: rerun the next day -> only the 180 failed events are sent, journal removed
+            service.dailyLimit = None
+            requests = service.stats['requests']
+            report = import_file(service, path)
+            self.assertEqual(len(report.succeeded), 180)
+            self.assertEqual(report.failed, [])
+            self.assertEqual(service.stats['requests'] - requests, 180)
+            self.assertEqual(len(service.uids), 300)
+            self.assertFalse(os.path.exists(path + JOURNAL_SUFFIX))
+
+            # TC3: an event that cannot be imported is rejected for good, so the checkpoint moves past it
+            # and the rerun finishes instead of failing on it again
+            events = self.make_export(120)
+            del events[60]["start"]
+            with open(path, "w") as file:
+                file.write("".join(json.dumps(event) + "\n" for event in events))
+            report = import_file(service, path)
+            self.assertEqual(len(report.succeeded), 119)
+            self.assertEqual([uid for uid, error in report.failed], ["uid60"])
+            self.assertTrue(os.path.exists(path + JOURNAL_SUFFIX))
+            requests = service.stats['requests']
+            report = import_file(service, path)
+            self.assertEqual((report.succeeded, report.failed), ([], []))
+            self.assertEqual(service.stats['requests'], requests)
+            self.assertFalse(os.path.exists(path + JOURNAL_SUFFIX))
+
+
+    def test_get_global_api(self):
+        """ Tests get_global_api. The client is built once, on first use, even with concurrent callers. """
+        # TC1: importing the module did not build the client
+        self.assertIsNone(MyEventManager.global_api)
+
+        built = []
+
+        def slow_build():
+            time.sleep(0.01)
+            built.append(MagicMock())
+            return built[-1]
+
+        with patch('MyEventManager.get_calendar_api', side_effect=slow_build):
+            # TC2: concurrent first calls share one client
+            results = []
+            threads = [threading.Thread(target=lambda: results.append(get_global_api())) for n in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(len(built), 1)
+            self.assertTrue(all(result is built[0] for result in results))
+
+            # TC3: later calls reuse it
+            self.assertIs(get_global_api(), built[0])
+            self.assertEqual(len(built), 1)
+
+        MyEventManager.global_api = None
+
+
+    def test_discovery_cache(self):
+        """ Tests load_discovery_document. The discovery document is only fetched when the cache is not usable. """
+        document = json.loads(discovery_cache.get_static_doc('calendar', 'v3'))
+
+        with tempfile.TemporaryDirectory() as directory, \
+                patch('MyEventManager.fetch_discovery_document', return_value=document) as fetch:
+            path = os.path.join(directory, "discovery.json")
+
+            # TC1: no cache -> fetched and written
+            self.assertEqual(load_discovery_document(path), document)
+            self.assertEqual(fetch.call_count, 1)
+            self.assertTrue(os.path.exists(path))
+
+            # TC2: cache present -> read locally
+            self.assertEqual(load_discovery_document(path), document)
+            self.assertEqual(fetch.call_count, 1)
+
+            # TC3: explicit refresh
+            load_discovery_document(path, refresh=True)
+            self.assertEqual(fetch.call_count, 2)
+
+            # TC4: cache written by another client library version
+            with open(path) as file:
+                cached = json.load(file)
+            cached['clientVersion'] = '0.0.0'
+            with open(path, 'w') as file:
+                json.dump(cached, file)
+            load_discovery_document(path)
+            self.assertEqual(fetch.call_count, 3)
+
+            # TC5: corrupt cache
+            with open(path, 'w') as file:
+                file.write('{"version": 1, "clien')
+            load_discovery_document(path)
+            self.assertEqual(fetch.call_count, 4)
+
+            # TC6: the client is built from the cache without any request
+            service = build_calendar_service(MagicMock(), path)
+            self.assertEqual(fetch.call_count, 4)
+            self.assertTrue(hasattr(service.events(), 'import_'))
+
+
+    def test_event_cell(self):
+        """ Tests event_cell. Returns the text of one table column for an event. """
+        event = {'id': 'abc', 'summary': 'An event', 'location': '123 Fake Street Clayton VIC 3400',
+                 'attendees': [{'displayName': 'John', 'email': 'jsmith@gmail.com'},
+                               {'email': 'noname@gmail.com'}, {'displayName': 'Me'}],
+                 'start': {'dateTime': '2022-10-10T08:00:00Z'}, 'end': {'dateTime': '2022-10-10T09:00:00Z'}}
+
+        # TC1: every column
+        self.assertEqual([event_cell(event, column) for column in range(len(EVENT_COLUMNS))],
+                         ['abc', 'An event', '123 Fake Street Clayton VIC 3400', 'John, Me',
+                          '2022-10-10T08:00:00Z', '2022-10-10T09:00:00Z'])
+
+        # TC2: missing fields (e.g. all day events) are shown empty
+        self.assertEqual([event_cell({}, column) for column in range(len(EVENT_COLUMNS))], [''] * 6)
+
+        # TC3: column out of range
+        with self.assertRaises(IndexError):
+            event_cell(event, len(EVENT_COLUMNS))
+
+    def test_cancel_import(self):
+        """ Tests import_file with progress and cancel. A cancelled import stops early and can be resumed. """
+        imported = []
+        counts = []
+        cancel = threading.Event()
+
+        def make_request(calendarId, body):
+            request = MagicMock()
+
+            def execute(http=None):
+                imported.append(body['iCalUID'])
+                return body
+            request.execute.side_effect = execute
+            return request
+
+        mock_api = MagicMock()
+        mock_api.events.return_value.import_.side_effect = make_request
+
+        # cancel as soon as the first progress report arrives
+        def progress(count):
+            counts.append(count)
+            cancel.set()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "events.ndjson")
+            with open(path, "w") as file:
+                file.write("".join(json.dumps(event) + "\n" for event in self.make_export(10)))
+
+            # TC1: cancelled import raises OperationCancelled and keeps its journal
+            with self.assertRaises(OperationCancelled):
+                import_file(mock_api, path, concurrency=1, batchSize=1, progress=progress, cancel=cancel)
+            self.assertLess(len(imported), 10)
+            self.assertEqual(counts, sorted(counts))
+            self.assertTrue(os.path.exists(path + JOURNAL_SUFFIX))
+
+            # TC2: importing again finishes the rest without sending events twice
+            first_run = list(imported)
+            del imported[:]
+            report = import_file(mock_api, path, concurrency=1, batchSize=1)
+            self.assertEqual(set(first_run) & set(imported), set())
+            self.assertEqual(len(report.succeeded), 10 - len(first_run))
+            self.assertFalse(os.path.exists(path + JOURNAL_SUFFIX))
+
+        # TC3: cancelled sync keeps the old sync token
+        store = EventStore(':memory:')
+        list_call = mock_api.events.return_value.list
+        list_call.return_value.execute.side_effect = [
+            {'items': [{'id': 'a', 'start': {'dateTime': '2022-10-11T08:00:00Z'}}], 'nextPageToken': 'p2'},
+            {'items': [{'id': 'b', 'start': {'dateTime': '2022-10-10T08:00:00Z'}}], 'nextSyncToken': 's1'},
+        ]
+        cancel = threading.Event()
+        cancel.set()
+        with self.assertRaises(OperationCancelled):
+            store.sync(mock_api, progress=counts.append, cancel=cancel)
+        self.assertIsNone(store.get_sync_token())
+
+    def test_delete_past_event(self):
+        """ Tests delete_past_event. Only events that have already ended are deleted. """
+        mock_api = MagicMock()
+        get_call = mock_api.events.return_value.get
+
+        # TC1: past event is deleted
+        get_call.return_value.execute.return_value = {'id': 'abc', 'end': {'dateTime': '2020-10-10T09:00:00Z'}}
+        delete_past_event(mock_api, 'abc')
+        mock_api.events.return_value.delete.assert_called_once_with(calendarId='primary', eventId='abc')
+
+        # TC2: future event
+        get_call.return_value.execute.return_value = {'id': 'abc', 'end': {'dateTime': '2099-10-10T09:00:00Z'}}
+        with self.assertRaises(Exception):
+            delete_past_event(mock_api, 'abc')
+
+        # TC3: no event
+        get_call.return_value.execute.return_value = {}
+        with self.assertRaises(Exception):
+            delete_past_event(mock_api, 'abc')
+        self.assertEqual(mock_api.events.return_value.delete.call_count, 1)
+
+    def test_event_index(self):
+        """ Tests EventIndex. Searches are answered from the index, which follows every change to the store. """
+        store = EventStore(':memory:')
+        store.apply_changes([
+            {'id': 'a', 'summary': 'Team meeting', 'description': 'Official Meeting', 'location': 'Clayton campus',
+             'start': {'dateTime': '2022-10-10T08:00:00Z'}, 'end': {'dateTime': '2022-10-10T09:00:00Z'}},
+            {'id': 'b', 'summary': 'Lunch', 'description': 'Casual', 'location': 'Online',
+             'start': {'dateTime': '2022-11-01T12:00:00Z'}, 'end': {'dateTime': '2022-11-02T13:00:00Z'}},
+            {'id': 'c', 'summary': 'Holiday', 'description': 'Casual', 'location': 'Beach',
+             'start': {'date': '2022-12-25'}, 'end': {'date': '2022-12-26'}},
+        ])
+        index = store.attach(EventIndex())
+
+        def ids(**criteria):
+            return [event['id'] for event in index.search(**criteria)]
+
+        # TC1: built from the store, events without a start time are left out
+        self.assertEqual(len(index), 2)
+        self.assertEqual(ids(), ['a', 'b'])
+
+        # TC2: words and word prefixes, in any case
+        self.assertEqual(ids(title='team'), ['a'])
+        self.assertEqual(ids(title='Meet', eventType='Official', location='Clay'), ['a'])
+        self.assertEqual(ids(title='Team lunch'), [])
+
+        # TC3: date matches the start or the end, day and month may be given without a leading zero
+        self.assertEqual(ids(day='2', month='11', year='2022'), ['b'])
+        self.assertEqual(ids(day='01', month='11'), ['b'])
+        self.assertEqual(ids(year='2022', title='Lunch'), ['b'])
+        self.assertEqual(ids(year='2021'), [])
+
+        # TC4: changes from a sync update the index
+        store.apply_changes([
+            {'id': 'a', 'status': 'cancelled'},
+            {'id': 'b', 'summary': 'Dinner', 'description': 'Casual', 'location': 'Online',
+             'start': {'dateTime': '2022-11-01T18:00:00Z'}, 'end': {'dateTime': '2022-11-01T20:00:00Z'}},
+        ], 's1')
+        self.assertEqual(ids(), ['b'])
+        self.assertEqual(ids(title='Lunch'), [])
+        self.assertEqual(ids(title='Dinner'), ['b'])
+        self.assertEqual(ids(day='02'), [])
+        self.assertNotIn(('title', 'lunch'), index.postings)
+
+        # TC5: clearing the store clears the index
+        store.clear()
+        self.assertEqual(len(index), 0)
+        self.assertEqual(ids(), [])
+
+    def test_interval_index(self):
+        """ Tests IntervalIndex. Range, point and overlap queries return the right events in start order. """
+        def event(eventId, start, end, summary='Event'):
+            return {'id': eventId, 'summary': summary, 'description': 'Casual', 'location': 'Online',
+                    'start': {'dateTime': start}, 'end': {'dateTime': end}}
+
+        store = EventStore(':memory:')
+        store.apply_changes([
+            event('a', '2022-10-10T08:00:00Z', '2022-10-10T10:00:00Z', 'Breakfast'),
+            event('b', '2022-10-10T09:00:00Z', '2022-10-12T09:00:00Z', 'Conference'),
+            event('c', '2022-10-11T12:00:00Z', '2022-10-11T12:00:00Z', 'Reminder'),
+            event('d', '2022-10-11T10:00:00+10:00', '2022-10-11T11:00:00+10:00', 'Call'),
+            {'id': 'e', 'start': {'date': '2022-10-12'}, 'end': {'date': '2022-10-13'}},
+        ])
+        index = store.attach(IntervalIndex())
+
+        def ids(events):
+            return [event['id'] for event in events]
+
+        # TC1: overlap with a window, the end of the window is excluded
+        self.assertEqual(ids(index.overlapping('2022-10-10T09:30:00Z', '2022-10-11T00:00:00Z')), ['a', 'b'])
+        self.assertEqual(ids(index.overlapping('2022-10-10T00:00:00Z', '2022-10-10T08:00:00Z')), [])
+        self.assertEqual(ids(index.overlapping('2022-10-11T12:00:00Z', '2022-10-12T00:00:00Z')), ['b', 'c'])
+
+        # TC2: point query, an event ending at the instant is over and an event with no length (c) is never in progress
+        self.assertEqual(ids(index.at('2022-10-10T10:00:00Z')), ['b'])
+        self.assertEqual(ids(index.at(datetime.datetime(2022, 10, 11, 12))), ['b'])
+        self.assertEqual(ids(index.at('2022-10-11T11:59:59Z')), ['b'])
+
+        # TC3: events starting in a range, all day events included
+        self.assertEqual(ids(index.starting_between('2022-10-11T00:00:00Z', '2022-10-13T00:00:00Z')), ['d', 'c', 'e'])
+
+        # TC4: changes from a sync update the index
+        store.apply_changes([{'id': 'b', 'status': 'cancelled'},
+                             event('a', '2022-10-11T08:00:00Z', '2022-10-11T09:00:00Z')], 's1')
+        self.assertEqual(ids(index.at('2022-10-11T08:30:00Z')), ['a'])
+        self.assertEqual(ids(index.at('2022-10-10T09:30:00Z')), [])
+
+        # TC5: search_calendar uses the window for a full date and the date keys otherwise. Both read
+        # dates in the event's own time zone (f is on the 12th there, but the 11th in UTC), whatever
+        # the time zone of the machine
+        store.apply_changes([event('f', '2022-10-12T01:00:00+10:00', '2022-10-12T02:00:00+10:00')], 's2')
+        with patch.dict(MyEventManager.event_indexes, {IntervalIndex: index, EventIndex: store.attach(EventIndex())}):
+            for zone in ['Pacific/Honolulu', 'Australia/Melbourne']:
+                with patch.dict(os.environ, {'TZ': zone}):
+                    time.tzset()
+                    self.assertEqual(ids(search_calendar(day='11', month='10', year='2022')), ['d', 'a', 'c'])
+                    self.assertEqual(ids(search_calendar(day='12', month='10', year='2022')), ['f'])
+                    self.assertEqual(ids(search_calendar(title='call', month='10', year='2022')), ['d'])
+                    self.assertEqual(ids(search_calendar(day='11')), ['a', 'd', 'c'])
+                    self.assertEqual(ids(search_calendar(day='12')), ['f'])
+            time.tzset()
+
+            # TC6: dates that do not exist match nothing
+            for day, month, year in [('0', '10', '2022'), ('31', '02', '2022'), ('', '13', '2022'),
+                                     ('', '', 'abc'), ('', '', '0'), ('0', '', '')]:
+                self.assertEqual(search_calendar(day=day, month=month, year=year), [])
+
+            # TC7: an event over several days is found on each of them with or without a year, but not
+            # on the day it ends at midnight
+            store.apply_changes([event('g', '2022-10-20T22:00:00+10:00', '2022-10-22T00:00:00+10:00')], 's3')
+            for year in ['2022', '']:
+                self.assertEqual(ids(search_calendar(day='20', month='10', year=year)), ['g'])
+                self.assertEqual(ids(search_calendar(day='21', month='10', year=year)), ['g'])
+                self.assertEqual(ids(search_calendar(day='22', month='10', year=year)), [])
+            self.assertEqual(ids(search_calendar(day='21', year='2022')), ['g'])
+            self.assertEqual(ids(search_calendar(day='21', month='09')), [])
         
 def main():
     # Create the test suite from the cases above.
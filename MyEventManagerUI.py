@@ -0,0 +1,949 @@
+# Desktop windows of MyEventManager. The calendar logic is in MyEventManager.py, which does not
+# import Qt, so it can also be used headless (see MyEventManagerCLI.py).
+import argparse
+import datetime
+import itertools
+import os
+import sys
+import threading
+from PyQt5 import QtCore, QtGui, QtWidgets as qtw
+from MyEventManager import *
+
+class WorkerSignals(QtCore.QObject):
+    """ Signals of a Worker. They are delivered on the GUI thread, so slots may update widgets. """
+    progress = QtCore.pyqtSignal(int)
+    partial = QtCore.pyqtSignal(object)
+    result = QtCore.pyqtSignal(object)
+    error = QtCore.pyqtSignal(object)
+    finished = QtCore.pyqtSignal()
+
+class Worker(QtCore.QRunnable):
+    """ Runs a function on the global QThreadPool, keeping network calls off the GUI thread.
+    With reportsProgress the function is also given progress= and cancel= keyword arguments, and
+    with streams it is given emit= (for partial results) and cancel=. The API requests it makes are
+    counted under action in api_metrics, and it is profiled as action while the profiler is on. """
+    def __init__(self, fn, *args, reportsProgress=False, streams=False, action=None, **kwargs): #pragma: no cover
+        super().__init__()
+        self.fn = fn
+        self.action = action
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self.cancelEvent = threading.Event()
+        if reportsProgress:
+            self.kwargs['progress'] = self.signals.progress.emit
+            self.kwargs['cancel'] = self.cancelEvent
+        if streams:
+            self.kwargs['emit'] = self.signals.partial.emit
+            self.kwargs['cancel'] = self.cancelEvent
+
+    def run(self): #pragma: no cover
+        try:
+            with api_action(self.action), profiler.profile(self.action):
+                result = self.fn(*self.args, **self.kwargs)
+        except Exception as error:
+            self.signals.error.emit(error)
+        else:
+            self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+    def cancel(self): #pragma: no cover
+        self.cancelEvent.set()
+
+def run_in_background(owner, fn, *args, action, onResult=None, onError=None, onProgress=None, onPartial=None, **kwargs): #pragma: no cover
+    """ Starts fn(*args) on a Worker. Errors are shown in a message box on owner unless onError is given.
+    Running workers are kept on owner so they are not garbage collected, and their API requests are
+    counted under action, the name of the user action they carry out. """
+    worker = Worker(fn, *args, reportsProgress=onProgress is not None, streams=onPartial is not None,
+                    action=action, **kwargs)
+    if onPartial is not None:
+        worker.signals.partial.connect(onPartial)
+    if onResult is not None:
+        worker.signals.result.connect(onResult)
+    if onProgress is not None:
+        worker.signals.progress.connect(onProgress)
+    if onError is not None:
+        worker.signals.error.connect(onError)
+    else:
+        worker.signals.error.connect(lambda error: qtw.QMessageBox.warning(owner, "Error", str(error)))
+    if not hasattr(owner, 'workers'):
+        owner.workers = set()
+    owner.workers.add(worker)
+    worker.signals.finished.connect(lambda: owner.workers.discard(worker))
+    QtCore.QThreadPool.globalInstance().start(worker)
+    return worker
+
+class WorkerProgress(qtw.QProgressDialog):
+    """ Progress dialog for a Worker whose total is unknown; Cancel cancels the worker. """
+    def __init__(self, owner, worker, label): #pragma: no cover
+        super().__init__(label, "Cancel", 0, 0, owner)
+        self.label = label
+        self.setWindowTitle(owner.windowTitle())
+        self.setMinimumDuration(500)
+        self.canceled.connect(worker.cancel)
+        worker.signals.progress.connect(self.showProgress)
+        worker.signals.finished.connect(self.close)
+
+    def showProgress(self, count): #pragma: no cover
+        self.setLabelText(self.label + " (" + str(count) + " so far)")
+
+class addAttendees_UI(qtw.QWidget):
+    def __init__(self): #pragma: no cover
+        super().__init__()
+        self.attendeesList = []
+        self.setWindowTitle('Add Attendees')
+        self.setGeometry(0, 0, 400, 300)
+
+        self.name = qtw.QLabel("Full Name : ",self)
+        self.name.setFont(QtGui.QFont('Arial',9))
+        self.name.move(85, 20)
+        self.name.resize(80,20)
+
+        self.name_field = qtw.QLineEdit(self)
+        self.name_field.move(170,20)
+        self.name_field.resize(150,20)
+
+        self.email = qtw.QLabel("Email Address:",self)
+        self.email.setFont(QtGui.QFont('Arial',9))
+        self.email.move(85, 50)
+        self.email.resize(80,20)
+
+        self.email_field = qtw.QLineEdit(self)
+        self.email_field.move(170,50)
+        self.email_field.resize(150,20)
+
+        self.comments = qtw.QLabel("Comments:",self)
+        self.comments.setFont(QtGui.QFont('Arial',9))
+        self.comments.move(85, 80)
+        self.comments.resize(80,20)
+
+        self.comments_field = qtw.QLineEdit(self)
+        self.comments_field.move(170,80)
+        self.comments_field.resize(150,20)
+
+        self.attendeesButton = qtw.QPushButton("Add Attendees", self)
+        self.attendeesButton.move(105,110)
+        self.attendeesButton.resize(90,35)
+        self.attendeesButton.clicked.connect(self.addAttendees)
+
+    def addAttendees(self): #pragma: no cover
+        attendees = Attendees(self.name_field.text(),self.email_field.text(),self.comments_field.text())
+        self.attendeesList.append(attendees)
+
+        msgBox = qtw.QMessageBox()
+        msgBox.setIcon(qtw.QMessageBox.Information)
+        msgBox.setText("Add more attendees?")
+        msgBox.setWindowTitle("Add Attendees")
+        msgBox.setStandardButtons(qtw.QMessageBox.Yes | qtw.QMessageBox.No)
+
+        returnValue = msgBox.exec()
+        if returnValue == qtw.QMessageBox.Yes:
+            self.name_field.setText("")
+            self.email_field.setText("")
+            self.comments_field.setText("")
+        else:
+            self.close()
+
+#All the UI and operation for creation of new event
+class createEvent_UI(qtw.QWidget): 
+    def __init__(self): #pragma: no cover
+        super().__init__()
+        self.setWindowTitle('Add an event')
+        self.setGeometry(0, 0, 400, 300)
+
+        self.title = qtw.QLabel("Event Title:",self)
+        self.title.setFont(QtGui.QFont('Arial',9))
+        self.title.move(85, 20)
+        self.title.resize(80,20)
+
+        self.title_field = qtw.QLineEdit(self)
+        self.title_field.move(170,20)
+        self.title_field.resize(150,20)
+
+        self.title = qtw.QLabel("Event Type:",self)
+        self.title.setFont(QtGui.QFont('Arial',9))
+        self.title.move(85, 50)
+        self.title.resize(80,20)
+
+        self.type_field = qtw.QComboBox(self)
+        self.type_field.addItems(["Official Meeting","Online Meeting","Physical Event"])
+        self.type_field.move(170,50)
+        self.type_field.resize(150,20)
+
+        self.startDate = qtw.QLabel("Start Date:",self)
+        self.startDate.setFont(QtGui.QFont('Arial',9))
+        self.startDate.move(85, 80)
+        self.startDate.resize(80,20)
+
+        self.startField = qtw.QLineEdit(self)
+        self.startField.move(170,80)
+        self.startField.setPlaceholderText("YYYY-mm-dd or dd-Mon-YYYY")
+        self.startField.resize(150,20)
+
+        self.startTime = qtw.QLabel("Start Time:", self)
+        self.startTime.setFont(QtGui.QFont('Arial',9))
+        self.startTime.move(85, 110)
+        self.startTime.resize(80,20)
+
+        self.startHour = qtw.QLineEdit(self)
+        self.startHour.move(170,110)
+        self.startHour.setPlaceholderText("Hour")
+        self.startHour.resize(50,20)
+
+        self.startMinute = qtw.QLineEdit(self)
+        self.startMinute.move(230,110)
+        self.startMinute.setPlaceholderText("Minute")
+        self.startMinute.resize(50,20)
+
+        self.timeField = qtw.QComboBox(self)
+        self.timeField.addItems(["AM","PM"])
+        self.timeField.move(290,110)
+        self.timeField.resize(50,20)
+
+        self.endDate = qtw.QLabel("End Date:",self)
+        self.endDate.setFont(QtGui.QFont('Arial',9))
+        self.endDate.move(85, 140)
+        self.endDate.resize(80,20)
+
+        self.endField = qtw.QLineEdit(self)
+        self.endField.move(170,140)
+        self.endField.setPlaceholderText("YYYY-mm-dd or dd-Mon-YYYY")
+        self.endField.resize(150,20)
+
+        self.endTime = qtw.QLabel("End Time:", self)
+        self.endTime.setFont(QtGui.QFont('Arial',9))
+        self.endTime.move(85, 170)
+        self.endTime.resize(80,20)
+
+        self.endHour = qtw.QLineEdit(self)
+        self.endHour.move(170,170)
+        self.endHour.setPlaceholderText("Hour")
+        self.endHour.resize(50,20)
+
+        self.endMinute = qtw.QLineEdit(self)
+        self.endMinute.move(230,170)
+        self.endMinute.setPlaceholderText("Minute")
+        self.endMinute.resize(50,20)
+
+        self.timeField2 = qtw.QComboBox(self)
+        self.timeField2.addItems(["AM","PM"])
+        self.timeField2.move(290,170)
+        self.timeField2.resize(50,20)
+
+        self.lblLocation = qtw.QLabel("Venue : ",self)
+        self.lblLocation.setFont(QtGui.QFont('Arial',9))
+        self.lblLocation.move(85, 200)
+        self.lblLocation.resize(80,20)
+
+        self.locationField = qtw.QLineEdit(self)
+        self.locationField.move(170,200)
+        self.locationField.setPlaceholderText("Address of Venue")
+        self.locationField.resize(150,20)
+
+        self.attendeesButton = qtw.QPushButton("Add Attendees", self)
+        self.attendeesButton.move(105,230)
+        self.attendeesButton.resize(100,35)
+        self.attendeesButton.clicked.connect(self.addAttendees)
+
+        self.createButton = qtw.QPushButton("Create Event", self)
+        self.createButton.move(210,230)
+        self.createButton.resize(100,35)
+        self.createButton.clicked.connect(self.createEvent)
+
+    def addAttendees(self): #pragma: no cover
+        self.attendeesWindow = addAttendees_UI()
+        self.attendeesWindow.show()
+    
+    def createEvent(self): #pragma: no cover
+        try:
+            attendeesList = self.attendeesWindow.attendeesList
+        except AttributeError:
+            qtw.QMessageBox.about(self, "Empty Attendees Record", "Please Add Attendees to the event.")
+            return
+
+        if(self.validateTime(self.startHour.text(),self.startMinute.text()) and self.validateTime(self.endHour.text(),self.endMinute.text())):
+
+            startHour = self.startHour.text()
+            endHour = self.endHour.text()
+        else:
+            qtw.QMessageBox.about(self, "Invalid Event Time", "Please enter Valid Event Time.")
+            return
+
+        if(self.timeField.currentText() == "AM" and startHour == "12"):
+            startHour = "00"
+        if(self.timeField.currentText() == "AM" and endHour == "12"):
+            endHour = "00"
+
+        startTime = startHour + ":" + self.startMinute.text()
+        endTime = endHour + ":" + self.endMinute.text()
+        
+        if(self.timeField.currentText() == 'PM'):
+            if (self.startHour.text() != "12"):
+                startHour = int(self.startHour.text()) + 12
+            
+            startTime = str(startHour) + ":" + self.startMinute.text()
+        if(self.timeField2.currentText() == 'PM' and self.endHour.text() != "12"):
+            endHour = int(self.endHour.text()) + 12
+            endTime = str(endHour) + ":" + self.endMinute.text()
+        
+        calendar = Calendar(self.title_field.text(),self.type_field.currentText(),self.startField.text(), startTime,
+        self.endField.text(), endTime ,self.locationField.text(),"confirmed",attendeesList)
+
+        self.addEvent(calendar, True)
+
+    def addEvent(self, calendar, checkConflicts): #pragma: no cover
+        self.createButton.setEnabled(False)
+        worker = run_in_background(self, lambda: calendar.add_event(get_global_api(), checkConflicts), action="Add event",
+                                   onResult=lambda event: qtw.QMessageBox.about(self, "Event Added", "Event Added Successfully."),
+                                   onError=lambda error: self.addFailed(calendar, error))
+        worker.signals.finished.connect(lambda: self.createButton.setEnabled(True))
+
+    def addFailed(self, calendar, error): #pragma: no cover
+        if not isinstance(error, EventConflict):
+            qtw.QMessageBox.warning(self, "Error", str(error))
+            return
+        busy = "\n".join(busyCalendar + ": " + ", ".join(period['start'] + " - " + period['end'] for period in periods)
+                         for busyCalendar, periods in error.conflicts.items())
+        answer = qtw.QMessageBox.question(self, "Scheduling Conflict", "Already busy during this event:\n" + busy + "\n\nAdd the event anyway?")
+        if answer == qtw.QMessageBox.Yes:
+            self.addEvent(calendar, False)
+    
+    def validateTime(self, hour, minute): #pragma: no cover
+        valid = False
+        hourValidate = QtGui.QIntValidator()
+        hourValidate.setRange(0,12)
+        hourValidate.validate(hour,0)
+
+        minuteValidate = QtGui.QIntValidator()
+        minuteValidate.setRange(0,60)
+
+        if(minuteValidate.validate(minute,0)[0] == QtGui.QValidator.State.Acceptable
+        and hourValidate.validate(hour,0)[0] == QtGui.QValidator.State.Acceptable):
+            valid = True
+        
+        if not valid: #if the format is not valid raise error
+            raise ValueError("Incorrect Time format")
+
+        return valid
+
+class EventTableModel(QtCore.QAbstractTableModel):
+    """ Table model over an iterable of events. Rows are pulled a page at a time as the view scrolls
+    (fetchMore) and cell text is only worked out when a cell is painted. """
+    def __init__(self, events=(), pageSize=200, parent=None): #pragma: no cover
+        super().__init__(parent)
+        self.events = []
+        self.source = iter(events)
+        self.exhausted = False
+        self.pageSize = pageSize
+
+    def rowCount(self, parent=QtCore.QModelIndex()): #pragma: no cover
+        return 0 if parent.isValid() else len(self.events)
+
+    def columnCount(self, parent=QtCore.QModelIndex()): #pragma: no cover
+        return 0 if parent.isValid() else len(EVENT_COLUMNS)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole): #pragma: no cover
+        if index.isValid() and role == QtCore.Qt.DisplayRole:
+            return event_cell(self.events[index.row()], index.column())
+        return None
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole): #pragma: no cover
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return EVENT_COLUMNS[section]
+        return None
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()): #pragma: no cover
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QtCore.QModelIndex()): #pragma: no cover
+        page = list(itertools.islice(self.source, self.pageSize))
+        if len(page) < self.pageSize:
+            self.exhausted = True
+        self.appendEvents(page)
+
+    def setSource(self, events): #pragma: no cover
+        """ Replaces the rows with a new iterable of events. """
+        self.beginResetModel()
+        self.events = []
+        self.source = iter(events)
+        self.exhausted = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def appendEvents(self, events): #pragma: no cover
+        if len(events) == 0:
+            return
+        self.beginInsertRows(QtCore.QModelIndex(), len(self.events), len(self.events) + len(events) - 1)
+        self.events.extend(events)
+        self.endInsertRows()
+
+class EventTableView(qtw.QWidget):
+    """ Event table shared by the view and search result windows, with sorting and a filter box. """
+    def __init__(self, events=()): #pragma: no cover
+        super().__init__()
+        self.model = EventTableModel(events, parent=self)
+        self.model.fetchMore()
+
+        # sorting and filtering happen in the proxy, the model's rows are never rebuilt
+        self.proxy = QtCore.QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setFilterKeyColumn(-1)
+        self.proxy.setFilterCaseSensitivity(QtCore.Qt.CaseInsensitive)
+
+        self.filterField = qtw.QLineEdit(self)
+        self.filterField.setPlaceholderText("Filter events")
+        self.filterField.textChanged.connect(self.proxy.setFilterFixedString)
+
+        self.tableView = qtw.QTableView(self)
+        self.tableView.setModel(self.proxy)
+        self.tableView.setSortingEnabled(True)
+        self.tableView.sortByColumn(4, QtCore.Qt.AscendingOrder)
+        self.resizeTable()
+
+        self.layout = qtw.QVBoxLayout()
+        self.layout.setContentsMargins(0, 0, 0, 0)
+        self.layout.addWidget(self.filterField)
+        self.layout.addWidget(self.tableView)
+        self.setLayout(self.layout)
+
+    def resizeTable(self): #pragma: no cover
+        #Fixed sizes, so nothing has to measure every row (ResizeToContents does)
+        header = self.tableView.horizontalHeader()
+        header.setSectionResizeMode(qtw.QHeaderView.ResizeMode.Interactive)
+        header.setDefaultSectionSize(140)
+        header.setStretchLastSection(True)
+        self.tableView.verticalHeader().setSectionResizeMode(qtw.QHeaderView.ResizeMode.Fixed)
+
+class viewEvent_UI(qtw.QWidget):
+    def __init__(self): #pragma: no cover
+        super().__init__()
+        self.setWindowTitle('View event')
+        self.setGeometry(0, 0, 900, 300)
+        self.createTable()
+
+        # date range shown, empty until "Show" is pressed
+        self.fromField = qtw.QDateEdit(QtCore.QDate.currentDate(), self)
+        self.fromField.setCalendarPopup(True)
+        self.toField = qtw.QDateEdit(QtCore.QDate.currentDate().addDays(7), self)
+        self.toField.setCalendarPopup(True)
+        self.rangeButton = qtw.QPushButton("Show", self)
+        self.rangeButton.clicked.connect(self.showRange)
+        self.allButton = qtw.QPushButton("Show All", self)
+        self.allButton.clicked.connect(lambda: self.showEvents(get_event_store()))
+
+        self.rangeLayout = qtw.QHBoxLayout()
+        self.rangeLayout.addWidget(qtw.QLabel("From:", self))
+        self.rangeLayout.addWidget(self.fromField)
+        self.rangeLayout.addWidget(qtw.QLabel("To:", self))
+        self.rangeLayout.addWidget(self.toField)
+        self.rangeLayout.addWidget(self.rangeButton)
+        self.rangeLayout.addWidget(self.allButton)
+        self.rangeLayout.addStretch()
+
+        # Add box layout, add table to box layout and add box layout to widget
+        self.layout = qtw.QVBoxLayout()
+        self.layout.addLayout(self.rangeLayout)
+        self.layout.addWidget(self.tableWidget) 
+        self.setLayout(self.layout) 
+
+        # Show widget
+        self.show()
+
+    def createTable(self): #pragma: no cover
+        #The table starts empty and is filled from the local store once it has synced;
+        #rows are then read from the store as the table is scrolled
+        self.tableWidget = EventTableView()
+        worker = run_in_background(self, sync_event_store, action="View events", onResult=self.showEvents,
+                                   onProgress=lambda count: self.setWindowTitle('View event (syncing, ' + str(count) + ')'))
+        worker.signals.finished.connect(lambda: self.setWindowTitle('View event'))
+
+    def showEvents(self, store): #pragma: no cover
+        self.tableWidget.model.setSource(store.iter_events())
+
+    def showRange(self): #pragma: no cover
+        #events overlapping the chosen days, in local time
+        start = datetime.datetime.combine(self.fromField.date().toPyDate(), datetime.time()).astimezone()
+        end = datetime.datetime.combine(self.toField.date().addDays(1).toPyDate(), datetime.time()).astimezone()
+        run_in_background(self, lambda: get_interval_index().overlapping(start, end), action="View events by date",
+                          onResult=self.tableWidget.model.setSource)
+
+class searchResult_UI(qtw.QWidget):
+    def __init__(self): #pragma: no cover
+        super().__init__()
+        self.setWindowTitle('View event')
+        self.setGeometry(0, 0, 900, 300)
+        self.events = []
+        
+
+    def createTable(self):#pragma: no cover
+        self.tableWidget = EventTableView(self.events)
+
+        # Add box layout, add table to box layout and add box layout to widget
+        self.layout = qtw.QVBoxLayout()
+        self.layout.addWidget(self.tableWidget) 
+        self.setLayout(self.layout) 
+
+class searchEvent_UI(qtw.QWidget):
+    def __init__(self): #pragma: no cover
+        super().__init__()
+        self.setWindowTitle('Search event')
+        self.setGeometry(0, 0, 400, 300)
+        self.filtered_event = []
+        # bring the index up to date with the calendar while the form is filled in; searches use the
+        # events already stored if this fails
+        run_in_background(self, refresh_event_index, action="Refresh search index",
+                          onError=lambda error: qtw.QMessageBox.about(self, "Search Index Not Refreshed",
+                                                                      "Searching the events already stored. " + str(error)))
+
+        self.title = qtw.QLabel("Event Title:",self)
+        self.title.setFont(QtGui.QFont('Arial',9))
+        self.title.move(85, 20)
+        self.title.resize(80,20)
+
+        self.title_field = qtw.QLineEdit(self)
+        self.title_field.move(170,20)
+        self.title_field.resize(150,20)
+
+        self.title = qtw.QLabel("Event Type:",self)
+        self.title.setFont(QtGui.QFont('Arial',9))
+        self.title.move(85, 50)
+        self.title.resize(80,20)
+
+        self.type_field = qtw.QComboBox(self)
+        self.type_field.addItems(["","Official Meeting","Online Meeting","Physical Event"])
+        self.type_field.move(170,50)
+        self.type_field.resize(150,20)
+
+        self.year = qtw.QLabel("Year:",self)
+        self.year.setFont(QtGui.QFont('Arial',9))
+        self.year.move(85, 80)
+        self.year.resize(80,20)
+
+        self.yearField = qtw.QLineEdit(self)
+        self.yearField.move(170,80)
+        self.yearField.setPlaceholderText("YYYY")
+        self.yearField.resize(150,20)
+
+        self.month = qtw.QLabel("Month:",self)
+        self.month.setFont(QtGui.QFont('Arial',9))
+        self.month.move(85, 110)
+        self.month.resize(80,20)
+
+        self.MonthField = qtw.QComboBox(self)
+        self.MonthField.move(170,110)
+        self.MonthField.addItems(["","01","02","03","04","05","06","07","08","09","10","11","12"])
+        self.MonthField.resize(80,20)
+
+        self.day = qtw.QLabel("Day: ",self)
+        self.day.setFont(QtGui.QFont('Arial',9))
+        self.day.move(85, 140)
+        self.day.resize(80,20)
+
+        self.dayField = qtw.QLineEdit(self)
+        self.dayField.move(170,140)
+        self.dayField.setPlaceholderText("Day")
+        self.dayField.resize(150,20)
+
+        self.lblLocation = qtw.QLabel("Venue : ",self)
+        self.lblLocation.setFont(QtGui.QFont('Arial',9))
+        self.lblLocation.move(85, 170)
+        self.lblLocation.resize(80,20)
+
+        self.locationField = qtw.QLineEdit(self)
+        self.locationField.move(170,170)
+        self.locationField.setPlaceholderText("Address of Venue")
+        self.locationField.resize(150,20)
+
+        self.searchButton = qtw.QPushButton("Search Records", self)
+        self.searchButton.move(190,200)
+        self.searchButton.resize(100,35)
+        self.searchButton.clicked.connect(self.searchEvent)
+
+        self.exportButton = qtw.QPushButton("Export Event", self)
+        self.exportButton.move(85,200)
+        self.exportButton.resize(100,35)
+        self.exportButton.clicked.connect(self.exportEvent)
+
+        #Live search: any edit restarts the timer, and the search runs once typing pauses
+        self.liveBox = qtw.QCheckBox("Search as you type", self)
+        self.liveBox.move(140,245)
+        self.liveBox.resize(150,20)
+        self.liveBox.toggled.connect(self.scheduleSearch)
+        self.searchTimer = QtCore.QTimer(self)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(250)
+        self.searchTimer.timeout.connect(self.liveSearch)
+        for field in [self.title_field, self.yearField, self.dayField, self.locationField]:
+            field.textChanged.connect(self.scheduleSearch)
+        for field in [self.type_field, self.MonthField]:
+            field.currentTextChanged.connect(self.scheduleSearch)
+        self.generation = 0
+        self.liveWorker = None
+        self.searchResult = None
+
+    def criteria(self): # pragma: no cover
+        #read the fields here, widgets must not be touched from the worker thread
+        return {
+            'title': self.title_field.text(),
+            'eventType': self.type_field.currentText(),
+            'location': self.locationField.text(),
+            'day': self.dayField.text(),
+            'month': self.MonthField.currentText(),
+            'year': self.yearField.text(),
+        }
+
+    def searchEvent(self): # pragma: no cover
+        criteria = self.criteria()
+        self.searchButton.setEnabled(False)
+        #searches only read the in-memory index, they never wait on the network
+        worker = run_in_background(self, lambda: search_calendar(**criteria), action="Search events",
+                                   onResult=self.showResults)
+        worker.signals.finished.connect(lambda: self.searchButton.setEnabled(True))
+
+    def scheduleSearch(self): # pragma: no cover
+        if self.liveBox.isChecked():
+            self.searchTimer.start()
+
+    def liveSearch(self): # pragma: no cover
+        #abandon the search still running, its results are out of date
+        self.generation += 1
+        generation = self.generation
+        if self.liveWorker is not None:
+            self.liveWorker.cancel()
+        self.filtered_event = []
+
+        if self.searchResult is None or not self.searchResult.isVisible():
+            self.searchResult = searchResult_UI()
+            self.searchResult.createTable()
+            self.searchResult.show()
+        self.searchResult.tableWidget.model.setSource([])
+
+        criteria = self.criteria()
+        self.liveWorker = run_in_background(self, lambda emit, cancel: stream_search(emit, cancel, **criteria),
+                                            action="Search as you type",
+                                            onPartial=lambda events: self.appendResults(generation, events),
+                                            onError=self.liveSearchFailed)
+
+    def liveSearchFailed(self, error): # pragma: no cover
+        if not isinstance(error, OperationCancelled):
+            qtw.QMessageBox.warning(self, "Error", str(error))
+
+    def appendResults(self, generation, events): # pragma: no cover
+        #chunks from a search that has since been replaced may still be queued
+        if generation != self.generation:
+            return
+        self.filtered_event.extend(events)
+        self.searchResult.tableWidget.model.appendEvents(events)
+
+    def showResults(self, events): # pragma: no cover
+        self.filtered_event = list(events)
+        self.searchResult = searchResult_UI()
+        self.searchResult.events = self.filtered_event
+        self.searchResult.createTable()
+        
+        self.searchResult.show()
+    
+    def exportEvent(self): #pragma: no cover
+        eventList = self.filtered_event
+        if len(eventList) != 0:
+            path = qtw.QFileDialog.getSaveFileName(self, 'Export events', 'export.json',
+                                                   'Events (*.json *.ndjson *.json.gz *.ndjson.gz)')[0]
+            if not path:
+                return
+            format, compress = export_format(path)
+            export_event(eventList, path, format, compress)
+            qtw.QMessageBox.about(self, "Export Done", "Event Exported Successfully.")
+        else:
+            qtw.QMessageBox.about(self, "No records", "Search for a event First.")
+
+class deleteEvent_UI(qtw.QWidget):
+    def __init__(self): #pragma: no cover
+        super().__init__()
+        self.setWindowTitle('Delete an event')
+        self.setGeometry(0, 0, 400, 300)
+
+        self.searchLbl = qtw.QLabel("Enter Event ID:",self)
+        self.searchLbl.setFont(QtGui.QFont('Arial',9))
+        self.searchLbl.move(85, 20)
+        self.searchLbl.resize(80,20)
+
+        self.id_field = qtw.QLineEdit(self)
+        self.id_field.move(170,20)
+        self.id_field.resize(150,20)
+
+        self.deleteBtn = qtw.QPushButton("Delete Event", self)
+        self.deleteBtn.move(165,70)
+        self.deleteBtn.resize(70,25)
+        self.deleteBtn.clicked.connect(self.deleteEvent)
+
+    def deleteEvent(self): #pragma: no cover
+        evt_ID = self.id_field.text()
+        self.deleteBtn.setEnabled(False)
+        worker = run_in_background(self, lambda: delete_past_event(get_global_api(), evt_ID), action="Delete event",
+                                   onResult=lambda result: qtw.QMessageBox.about(self, "Event Deleted", "Event Deleted Successfully."),
+                                   onError=lambda error: qtw.QMessageBox.about(self, "Deletion Failed", str(error)))
+        worker.signals.finished.connect(lambda: self.deleteBtn.setEnabled(True))
+
+
+class importEvent_UI(qtw.QWidget):
+    def __init__(self): #pragma: no cover
+        super().__init__()
+        self.setWindowTitle('Import events')
+        self.setGeometry(0, 0, 400, 300)
+        self.filepath = ""
+
+        self.File = qtw.QLabel("File Name:",self)
+        self.File.setFont(QtGui.QFont('Arial',9))
+        self.File.move(85, 20)
+        self.File.resize(80,20)
+
+        self.name_field = qtw.QLineEdit(self)
+        self.name_field.move(170,20)
+        self.name_field.resize(150,20)
+
+        self.fileBtn = qtw.QPushButton("Select File", self)
+        self.fileBtn.move(125,70)
+        self.fileBtn.resize(70,25)
+        self.fileBtn.clicked.connect(self.selectFile)
+
+        self.importBtn = qtw.QPushButton("Import File", self)
+        self.importBtn.move(200,70)
+        self.importBtn.resize(70,25)
+        self.importBtn.clicked.connect(self.importFile)
+
+    def selectFile(self): #pragma: no cover
+        self.filepath = qtw.QFileDialog.getOpenFileName(self, 'Open file')
+        self.name_field.setText(self.filepath[0])
+        txt = self.filepath[0]
+
+    def importFile(self): #pragma: no cover
+        if len(self.filepath) != 0:
+            self.importBtn.setEnabled(False)
+            worker = run_in_background(self, lambda progress, cancel: import_file(
+                                           get_global_api(), self.filepath[0], progress=progress, cancel=cancel),
+                                       action="Import events", onResult=self.importDone, onError=self.importFailed,
+                                       onProgress=lambda count: None)
+            worker.signals.finished.connect(lambda: self.importBtn.setEnabled(True))
+            self.progress = WorkerProgress(self, worker, "Importing events")
+        else:
+            qtw.QMessageBox.about(self, "No Records", "No Event Records Found. Please Check Again")
+
+    def importDone(self, report): #pragma: no cover
+        if len(report.failed) == 0:
+            qtw.QMessageBox.about(self, "Import Done", "Imported Successfully.")
+        else:
+            qtw.QMessageBox.about(self, "Import Done", "Import finished: " + report.summary() + ".")
+
+    def importFailed(self, error): #pragma: no cover
+        if isinstance(error, OperationCancelled):
+            qtw.QMessageBox.about(self, "Import Cancelled", "Import cancelled. Importing the same file again resumes it.")
+        else:
+            qtw.QMessageBox.about(self, "Import Failed", str(error))
+
+
+#Controlling UI for the whole program
+class apiStats_UI(qtw.QWidget):
+    """ Live view of api_metrics: requests per API method and per UI action. """
+    def __init__(self): #pragma: no cover
+        super().__init__()
+        self.setWindowTitle('API Stats')
+        self.setGeometry(0, 0, 700, 500)
+
+        self.methodTable = qtw.QTableWidget(0, 7)
+        self.methodTable.setHorizontalHeaderLabels(["Method", "Calls", "Errors", "Retries", "Mean (ms)", "p95 (ms)", "KiB"])
+        self.methodTable.horizontalHeader().setSectionResizeMode(0, qtw.QHeaderView.Stretch)
+        self.actionTable = qtw.QTableWidget(0, 2)
+        self.actionTable.setHorizontalHeaderLabels(["Action", "API Calls"])
+        self.actionTable.horizontalHeader().setSectionResizeMode(0, qtw.QHeaderView.Stretch)
+
+        self.resetButton = qtw.QPushButton("Reset")
+        self.resetButton.clicked.connect(self.resetStats)
+        self.saveButton = qtw.QPushButton("Save Metrics")
+        self.saveButton.clicked.connect(self.saveStats)
+        buttons = qtw.QHBoxLayout()
+        buttons.addStretch()
+        buttons.addWidget(self.resetButton)
+        buttons.addWidget(self.saveButton)
+
+        layout = qtw.QVBoxLayout(self)
+        layout.addWidget(qtw.QLabel("Requests by API method"))
+        layout.addWidget(self.methodTable, 2)
+        layout.addWidget(qtw.QLabel("Requests by action"))
+        layout.addWidget(self.actionTable, 1)
+        layout.addLayout(buttons)
+
+        # refresh while the window is open
+        self.timer = QtCore.QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(1000)
+        self.refresh()
+
+    def refresh(self): #pragma: no cover
+        rows = api_metrics.summary()
+        self.methodTable.setRowCount(len(rows))
+        for number, row in enumerate(rows):
+            cells = [row['method'], row['calls'], row['errors'], row['retries'], round(row['mean'] * 1000, 1),
+                     round(row['p95'] * 1000, 1), round(row['bytes'] / 1024, 1)]
+            for column, value in enumerate(cells):
+                self.methodTable.setItem(number, column, qtw.QTableWidgetItem(str(value)))
+
+        actions = sorted(api_metrics.actions().items(), key=lambda item: -item[1])
+        self.actionTable.setRowCount(len(actions))
+        for number, (action, calls) in enumerate(actions):
+            self.actionTable.setItem(number, 0, qtw.QTableWidgetItem(action))
+            self.actionTable.setItem(number, 1, qtw.QTableWidgetItem(str(calls)))
+
+    def resetStats(self): #pragma: no cover
+        api_metrics.reset()
+        self.refresh()
+
+    def saveStats(self): #pragma: no cover
+        path, _ = qtw.QFileDialog.getSaveFileName(self, "Save Metrics", METRICS_PATH, "Prometheus Metrics (*.prom)")
+        if path:
+            api_metrics.dump(path)
+            qtw.QMessageBox.about(self, "Metrics Saved", "Metrics saved to " + path)
+
+class Main_UI(qtw.QWidget): 
+    def __init__(self): #pragma: no cover
+        super().__init__()
+        self.setWindowTitle('Main UI')
+        self.email = ""
+        self.setGeometry(0, 0, 300, 400)
+
+        self.createButton = qtw.QPushButton("Add Event", self)
+        self.createButton.move(105,60)
+        self.createButton.resize(90,35)
+        self.createButton.clicked.connect(self.addEvent)
+
+        self.viewButton = qtw.QPushButton("View Events", self)
+        self.viewButton.move(105,100)
+        self.viewButton.resize(90,35)
+        self.viewButton.clicked.connect(self.viewEvent)
+
+        self.searchButton = qtw.QPushButton("Search Events", self)
+        self.searchButton.move(105,140)
+        self.searchButton.resize(90,35)
+        self.searchButton.clicked.connect(self.searchEvent)
+
+        self.deleteButton = qtw.QPushButton("Delete Events", self)
+        self.deleteButton.move(105,180)
+        self.deleteButton.resize(90,35)
+        self.deleteButton.clicked.connect(self.deleteEvent)
+
+        self.importButton = qtw.QPushButton("Import Events", self)
+        self.importButton.move(105,220)
+        self.importButton.resize(90,35)
+        self.importButton.clicked.connect(self.importEvent)
+
+        self.statsButton = qtw.QPushButton("API Stats", self)
+        self.statsButton.move(105,260)
+        self.statsButton.resize(90,35)
+        self.statsButton.clicked.connect(self.apiStats)
+
+        # profiling can be switched on and off while the app runs
+        self.profileBox = qtw.QCheckBox("Profile actions", self)
+        self.profileBox.move(100,310)
+        self.profileBox.setChecked(profiler.enabled)
+        self.profileBox.setToolTip("Writes a profile of each action to " + os.path.abspath(profiler.directory))
+        self.profileBox.toggled.connect(self.setProfiling)
+
+        self.show()
+
+    def addEvent(self): #pragma: no cover
+        self.createWindow = createEvent_UI()
+        self.createWindow.show()
+    
+    def viewEvent(self): #pragma: no cover
+        self.createWindow = viewEvent_UI()
+        self.createWindow.show()
+    
+    def searchEvent(self): #pragma: no cover
+        self.createWindow = searchEvent_UI()
+        self.createWindow.show()
+     
+    def deleteEvent(self): #pragma: no cover
+        self.createWindow = deleteEvent_UI()
+        self.createWindow.show()
+    
+    def importEvent(self): #pragma: no cover
+        self.createWindow = importEvent_UI()
+        self.createWindow.show()
+
+    def apiStats(self): #pragma: no cover
+        self.createWindow = apiStats_UI()
+        self.createWindow.show()
+
+    def setProfiling(self, enabled): #pragma: no cover
+        if enabled:
+            profiler.enable()
+        else:
+            profiler.disable()
+
+#Login page for email to verify event organizer either true/false
+class Login_UI(qtw.QWidget):
+    def __init__(self): #pragma: no cover
+        super().__init__()
+        self.setWindowTitle('Login UI')
+        self.setGeometry(0, 0, 600, 300)
+          
+
+        self.label_1 = qtw.QLabel("Email:",self)
+        
+        self.label_1.setFont(QtGui.QFont('Helvetica',12))
+        self.label_1.move(180, 100)
+
+        self.email_field = qtw.QLineEdit(self)
+        self.email_field.move(260,100)
+        self.email_field.resize(150,20)
+        self.login = qtw.QPushButton("Login", self)
+        self.login.move(250,220)
+        self.login.resize(100,40)
+        self.login.clicked.connect(self.openMainWindow)
+
+        self.show()
+
+    def openMainWindow(self): #pragma: no cover
+        self.close()
+        self.MainWindow = Main_UI()
+        self.MainWindow.email = self.email_field.text()
+        self.MainWindow.show()
+
+    def openMainWindow(self): #pragma: no cover
+        self.close()
+        self.MainWindow = Main_UI()
+        self.MainWindow.email = self.email_field.text()
+        self.MainWindow.show()
+
+def main(argv=None): #pragma: no cover
+    parser = argparse.ArgumentParser(description="Manage your Google Calendar events.")
+    parser.add_argument('--profile', nargs='?', const=PROFILE_PATH, metavar='DIR',
+                        help="profile each action into DIR (default " + PROFILE_PATH + ")")
+    args, qtArgs = parser.parse_known_args(argv)
+    if configure_profiler(args.profile):
+        print('Profiling actions into ' + os.path.abspath(profiler.directory))
+
+    api = get_global_api()
+    
+    time_now = datetime.datetime.utcnow().isoformat() + 'Z'  # 'Z' indicates UTC time
+    
+    events = get_upcoming_events(api, time_now, 10)
+    
+    # display upcoming events
+    if not events:
+        print('No upcoming events found.')
+    for event in events:
+        start = event['start'].get('dateTime', event['start'].get('date'))
+        print(start, event['summary'], event['status'], ',Event ID : ' + event['id'])
+    
+    # launch UI
+    app = qtw.QApplication(sys.argv[:1] + qtArgs)
+    UI = Main_UI()
+    app.exec_()
+
+    # leave the API metrics for a textfile collector, if asked to
+    if os.environ.get(METRICS_ENV):
+        api_metrics.dump(os.environ[METRICS_ENV])
+
+if __name__ == "__main__":  # Prevents the main() function from being called by the test suite runner
+    main()